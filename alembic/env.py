@@ -2,7 +2,7 @@ import os
 import sys
 from logging.config import fileConfig
 from dotenv import load_dotenv
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import engine_from_config, pool, text
 from alembic import context
 
 # Load .env early so DATABASE_URL is in os.environ
@@ -27,6 +27,9 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# Advisory lock key held while migrating
+MIGRATION_LOCK_ID = 724150318
+
 
 def run_migrations_offline():
     """Run migrations in 'offline' mode."""
@@ -51,6 +54,11 @@ def run_migrations_online():
     )
 
     with connectable.connect() as connection:
+        # One migrator at a time: with MIGRATION_MODE=deferred several containers may
+        # start `alembic upgrade head` together. Session level, so it outlives the
+        # commits of the online helpers (database/migration_utils.py)
+        connection.execute(text("SELECT pg_advisory_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+        connection.commit()
         context.configure(connection=connection, target_metadata=target_metadata)
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,36 @@
+"""add idempotency key heartbeat
+
+Revision ID: 0b6e4d2f9a17
+Revises: f5a0c7d3e8b1
+Create Date: 2026-10-20 16:04:51.203877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e4d2f9a17'
+down_revision: Union[str, Sequence[str], None] = 'f5a0c7d3e8b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # The process working on a key, and when it last said it still is (IdempotencyStore)
+    op.add_column("idempotency_keys", sa.Column("owner", sa.Text(), nullable=True))
+    op.add_column("idempotency_keys", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+    # Keys in progress before this revision have no owner to beat for them: taken over once stale
+    op.execute("UPDATE idempotency_keys SET heartbeat_at = started_at")
+    op.alter_column("idempotency_keys", "heartbeat_at", nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_column("idempotency_keys", "heartbeat_at")
+    op.drop_column("idempotency_keys", "owner")
@@ -0,0 +1,79 @@
+"""add tombstones
+
+Revision ID: 3f8a6d2c91b4
+Revises: 7c3e9b15f0d2
+Create Date: 2026-10-19 22:48:12.603517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from database.migration_utils import (
+    create_index_concurrently, drop_index_concurrently, execute_with_lock_retries, rename_index)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a6d2c91b4'
+down_revision: Union[str, Sequence[str], None] = '7c3e9b15f0d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> GIN indexed columns as (column, trigram), i.e. ix_<table>_search_vector
+# and ix_<table>_<column>_trgm; they are rebuilt without the tombstoned rows
+GIN_INDEXES = {
+    "articles": [("search_vector", False)],
+    "budgets_union": [("search_vector", False), ("circular_no_key", True)],
+    "ce": [("search_vector", False), ("circular_no_key", True), ("case_no_key", True), ("order_no_key", True), ("eq_citation_key", True)],
+    "cgst": [("search_vector", False), ("circular_no_key", True)],
+    "cu": [("search_vector", False), ("circular_no_key", True), ("case_no_key", True), ("order_no_key", True), ("eq_citation_key", True)],
+    "dgft": [("search_vector", False), ("circular_no_key", True)],
+    "features": [("search_vector", False)],
+    "sgst": [("search_vector", False), ("circular_no_key", True), ("case_no_key", True), ("order_no_key", True), ("eq_citation_key", True)],
+    "st": [("search_vector", False), ("circular_no_key", True), ("case_no_key", True), ("order_no_key", True), ("eq_citation_key", True)],
+    "vat": [("search_vector", False), ("circular_no_key", True), ("case_no_key", True), ("order_no_key", True), ("eq_citation_key", True)],
+}
+
+
+def _index_name(table: str, column: str, trigram: bool) -> str:
+    return f"ix_{table}_{column}_trgm" if trigram else f"ix_{table}_{column}"
+
+
+def _rebuild_gin_index(table: str, column: str, trigram: bool, where):
+    """
+    Swaps a GIN index for one with the given WHERE clause, without blocking writes:
+    the new index is built concurrently under a temporary name, the old one dropped
+    and the new one renamed (with its partitions' indexes, on partitioned tables).
+    """
+    name = _index_name(table, column, trigram)
+    temporary_name = f"{name}_new"
+    # An earlier rebuild may have left the partitions' indexes under the temporary name
+    rename_index(name, name)
+    create_index_concurrently(temporary_name, table, [f"{column} gin_trgm_ops" if trigram else column],
+                              using="gin", where=where)
+    drop_index_concurrently(name)
+    rename_index(temporary_name, name)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # Online: the GIN indexes are rebuilt concurrently (see database/migration_utils.py)
+    for table, indexes in GIN_INDEXES.items():
+        with op.get_context().autocommit_block():
+            execute_with_lock_retries(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS deleted_at timestamp")
+        for column, trigram in indexes:
+            _rebuild_gin_index(table, column, trigram, "deleted_at IS NULL")
+        create_index_concurrently(f"ix_{table}_deleted_at", table, ["deleted_at"], where="deleted_at IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    # Tombstoned rows come back as live rows: purge them first if that is not wanted
+    for table, indexes in GIN_INDEXES.items():
+        drop_index_concurrently(f"ix_{table}_deleted_at")
+        for column, trigram in indexes:
+            _rebuild_gin_index(table, column, trigram, None)
+        with op.get_context().autocommit_block():
+            execute_with_lock_retries(f"ALTER TABLE {table} DROP COLUMN IF EXISTS deleted_at")
@@ -0,0 +1,228 @@
+"""partition case tables by date
+
+Revision ID: 4e9a1c7d2b60
+Revises: b07a3bd6dd7b
+Create Date: 2026-10-19 16:32:08.221907
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e9a1c7d2b60'
+down_revision: Union[str, Sequence[str], None] = 'b07a3bd6dd7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> identifier columns with a trigram lookup key (see b3ea33f4c807)
+PARTITIONED_TABLES = {
+    "ce": ["circular_no", "case_no", "order_no", "eq_citation"],
+    "cgst": ["circular_no"],
+    "cu": ["circular_no", "case_no", "order_no", "eq_citation"],
+    "sgst": ["circular_no", "case_no", "order_no", "eq_citation"],
+}
+
+PK_COLUMN = "case_id"
+
+# Columns that must stay unique across all partitions; enforced through <table>_keys
+KEY_COLUMNS = ["universal_id", "vil_id", "circular_no", "html_file_path"]
+
+# Plain (non-unique) b-tree indexes on the partitioned parent, cascaded to every partition
+INDEXED_COLUMNS = ["universal_id", "vil_id", "circular_no", "html_file_path", "circular_date", "ingestion_dt"]
+
+ENSURE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION vil_ensure_year_partition(parent regclass, value timestamp)
+RETURNS text AS $$
+DECLARE
+    lower_bound timestamp := date_trunc('year', value);
+    upper_bound timestamp := date_trunc('year', value) + interval '1 year';
+    parent_name text := (SELECT relname FROM pg_class WHERE oid = parent);
+    partition_name text := parent_name || '_y' || to_char(date_trunc('year', value), 'YYYY');
+    default_has_rows boolean;
+BEGIN
+    IF to_regclass(quote_ident(partition_name)) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    -- Serialize concurrent callers for the same table
+    PERFORM pg_advisory_xact_lock(parent::oid::bigint);
+    IF to_regclass(quote_ident(partition_name)) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    -- Rows of this year already in the default partition would violate the new bounds
+    EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I WHERE partition_dt >= $1 AND partition_dt < $2)',
+                   parent_name || '_default')
+        INTO default_has_rows USING lower_bound, upper_bound;
+    IF default_has_rows THEN
+        RETURN NULL;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+                   partition_name, parent, lower_bound, upper_bound);
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def _data_columns(bind, table: str):
+    """Stored (non-generated) columns of a table, in table order."""
+    return bind.execute(sa.text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table AND is_generated = 'NEVER' "
+        "ORDER BY ordinal_position"), {"table": table}).scalars().all()
+
+
+def _create_lookup_indexes(table: str, lookup_columns):
+    op.create_index(op.f(f"ix_{table}_search_vector"), table, ["search_vector"], unique=False,
+                    postgresql_using="gin")
+    for column in lookup_columns:
+        key_column = f"{column}_key"
+        op.create_index(op.f(f"ix_{table}_{key_column}_trgm"), table, [key_column], unique=False,
+                        postgresql_using="gin", postgresql_ops={key_column: "gin_trgm_ops"})
+
+
+def _require_online():
+    # The partitions, column lists and sequence are read from the database
+    if context.is_offline_mode():
+        raise RuntimeError(f"Revision {revision} reads the tables it partitions and cannot generate "
+                           f"offline SQL (--sql): run it online, or generate the script in two parts "
+                           f"around it.")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    _require_online()
+    # This rewrites the four tables inside the migration transaction: run it in a
+    # maintenance window (writes to these tables block until it commits).
+    bind = op.get_bind()
+    op.execute(ENSURE_PARTITION_FUNCTION)
+    current_year = datetime.now(timezone.utc).year
+
+    for table, lookup_columns in PARTITIONED_TABLES.items():
+        new_table = f"{table}_partitioned"
+        columns = ", ".join(_data_columns(bind, table))
+
+        # 1. Partitioned copy of the table: same columns, defaults (the id sequence) and
+        #    generated columns, plus the partition key. The primary key must include it.
+        op.execute(f"""
+            CREATE TABLE {new_table} (
+                LIKE {table} INCLUDING DEFAULTS INCLUDING GENERATED,
+                partition_dt timestamp NOT NULL,
+                CONSTRAINT {new_table}_pkey PRIMARY KEY ({PK_COLUMN}, partition_dt)
+            ) PARTITION BY RANGE (partition_dt)""")
+
+        # 2. One partition per year that has data (plus this year and the next), and a
+        #    default partition for anything outside them
+        years = set(bind.execute(sa.text(
+            f"SELECT DISTINCT extract(year FROM coalesce(circular_date, ingestion_dt))::int FROM {table}")).scalars())
+        years.update({current_year, current_year + 1})
+        for year in sorted(years):
+            op.execute(f"CREATE TABLE {table}_y{year:04d} PARTITION OF {new_table} "
+                       f"FOR VALUES FROM ('{year:04d}-01-01') TO ('{year + 1:04d}-01-01')")
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {new_table} DEFAULT")
+
+        # 3. Copy the rows; generated columns are recomputed
+        op.execute(f"""
+            INSERT INTO {new_table} ({columns}, partition_dt)
+            SELECT {columns}, coalesce(circular_date, ingestion_dt) FROM {table}""")
+
+        # 4. Global uniqueness: unique indexes on a partitioned table must contain the
+        #    partition key, so the unique columns live (uniquely) in a side table
+        op.execute(f"""
+            CREATE TABLE {table}_keys (
+                universal_id uuid PRIMARY KEY,
+                vil_id bigint NOT NULL UNIQUE,
+                circular_no text NOT NULL UNIQUE,
+                html_file_path text NOT NULL UNIQUE
+            )""")
+        op.execute(f"INSERT INTO {table}_keys ({', '.join(KEY_COLUMNS)}) "
+                   f"SELECT {', '.join(KEY_COLUMNS)} FROM {table}")
+
+        # 5. Swap: keep the id sequence, drop the old table, take over its name
+        sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence(:table, :column)"),
+                                {"table": table, "column": PK_COLUMN}).scalar()
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {new_table}.{PK_COLUMN}")
+        op.execute(f"DROP TABLE {table}")
+        op.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+        op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {new_table}_pkey TO {table}_pkey")
+
+        # 6. Indexes on the parent are created on every partition. Not built
+        #    concurrently, on purpose: the new table is only visible to other sessions
+        #    once the swap commits (they wait on the dropped table's lock until then),
+        #    and committing before its indexes and key triggers exist would expose a
+        #    table whose lookups are sequential scans and whose keys are not checked.
+        for column in INDEXED_COLUMNS:
+            op.create_index(op.f(f"ix_{table}_{column}"), table, [column], unique=False)
+        _create_lookup_indexes(table, lookup_columns)
+
+        # 7. Keep <table>_keys in step with the table. A duplicate key raises a
+        #    unique_violation from the INSERT, exactly as the old unique constraints did.
+        #    A row moving between partitions fires DELETE + INSERT, not UPDATE.
+        key_list = ", ".join(KEY_COLUMNS)
+        new_values = ", ".join(f"NEW.{column}" for column in KEY_COLUMNS)
+        changed = " OR ".join(f"OLD.{column} IS DISTINCT FROM NEW.{column}" for column in KEY_COLUMNS)
+        op.execute(f"""
+            CREATE FUNCTION {table}_sync_keys() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    DELETE FROM {table}_keys WHERE universal_id = OLD.universal_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO {table}_keys ({key_list}) VALUES ({new_values});
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql""")
+        op.execute(f"CREATE TRIGGER {table}_sync_keys AFTER INSERT OR DELETE ON {table} "
+                   f"FOR EACH ROW EXECUTE FUNCTION {table}_sync_keys()")
+        op.execute(f"CREATE TRIGGER {table}_sync_keys_on_update AFTER UPDATE ON {table} "
+                   f"FOR EACH ROW WHEN ({changed}) EXECUTE FUNCTION {table}_sync_keys()")
+
+        op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    _require_online()
+    bind = op.get_bind()
+
+    for table, lookup_columns in PARTITIONED_TABLES.items():
+        new_table = f"{table}_unpartitioned"
+        columns = ", ".join(column for column in _data_columns(bind, table) if column != "partition_dt")
+
+        op.execute(f"""
+            CREATE TABLE {new_table} (
+                LIKE {table} INCLUDING DEFAULTS INCLUDING GENERATED,
+                CONSTRAINT {new_table}_pkey PRIMARY KEY ({PK_COLUMN})
+            )""")
+        op.execute(f"ALTER TABLE {new_table} DROP COLUMN partition_dt")
+        op.execute(f"INSERT INTO {new_table} ({columns}) SELECT {columns} FROM {table}")
+
+        sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence(:table, :column)"),
+                                {"table": table, "column": PK_COLUMN}).scalar()
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {new_table}.{PK_COLUMN}")
+        op.execute(f"DROP TABLE {table}")
+        op.execute(f"DROP FUNCTION {table}_sync_keys()")
+        op.execute(f"DROP TABLE {table}_keys")
+        op.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+        op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {new_table}_pkey TO {table}_pkey")
+
+        # Unique constraints / indexes as they were before the upgrade; in the
+        # transaction, for the same reason as the upgrade's step 6
+        op.create_index(op.f(f"ix_{table}_universal_id"), table, ["universal_id"], unique=True)
+        op.create_index(op.f(f"ix_{table}_circular_no"), table, ["circular_no"], unique=True)
+        op.create_unique_constraint(f"{table}_vil_id_key", table, ["vil_id"])
+        op.create_unique_constraint(f"{table}_html_file_path_key", table, ["html_file_path"])
+        op.create_index(op.f(f"ix_{table}_circular_date"), table, ["circular_date"], unique=False)
+        op.create_index(op.f(f"ix_{table}_ingestion_dt"), table, ["ingestion_dt"], unique=False)
+        _create_lookup_indexes(table, lookup_columns)
+
+    op.execute("DROP FUNCTION vil_ensure_year_partition(regclass, timestamp)")
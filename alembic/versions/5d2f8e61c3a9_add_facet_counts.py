@@ -0,0 +1,67 @@
+"""add facet counts
+
+Revision ID: 5d2f8e61c3a9
+Revises: 4e9a1c7d2b60
+Create Date: 2026-10-19 19:24:51.308114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f8e61c3a9'
+down_revision: Union[str, Sequence[str], None] = '4e9a1c7d2b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# facet -> SQL for its value; must match app.services.facets.FACETS ('' = no value)
+FACET_VALUES = {
+    "prod_name": "coalesce(prod_name, '')",
+    "state_id": "coalesce(state_id, '')",
+    "sub_prod_name": "coalesce(sub_prod_name, '')",
+    "circular_month": "coalesce(to_char(circular_date, 'YYYY-MM'), '')",
+}
+
+# table -> facets (those whose column the table has)
+TABLE_FACETS = {
+    "budgets_union": ["circular_month"],
+    "ce": ["prod_name", "sub_prod_name", "circular_month"],
+    "cgst": ["prod_name", "sub_prod_name", "circular_month"],
+    "cu": ["prod_name", "sub_prod_name", "circular_month"],
+    "dgft": ["prod_name", "state_id", "sub_prod_name", "circular_month"],
+    "sgst": ["prod_name", "state_id", "sub_prod_name", "circular_month"],
+    "st": ["prod_name", "sub_prod_name", "circular_month"],
+    "vat": ["prod_name", "state_id", "sub_prod_name", "circular_month"],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_table(
+        "facet_counts",
+        sa.Column("table_name", sa.Text(), nullable=False),
+        sa.Column("facet", sa.Text(), nullable=False),
+        sa.Column("value", sa.Text(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("table_name", "facet", "value"),
+    )
+
+    # One-off backfill; from here on the ingestion services keep the counts in step.
+    # Run it while no uploads are in progress, or rows written meanwhile are not counted.
+    for table, facets in TABLE_FACETS.items():
+        for facet in facets:
+            op.execute(f"""
+                INSERT INTO facet_counts (table_name, facet, value, count)
+                SELECT '{table}', '{facet}', {FACET_VALUES[facet]}, count(*)
+                FROM {table}
+                GROUP BY 3""")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_table("facet_counts")
@@ -0,0 +1,64 @@
+"""add full text search vectors
+
+Revision ID: 69ecd6108efc
+Revises: 1b5b6c738ae4
+Create Date: 2026-10-19 09:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from database.migration_utils import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '69ecd6108efc'
+down_revision: Union[str, Sequence[str], None] = '1b5b6c738ae4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> text column the search vector is generated from
+SEARCH_SOURCES = {
+    "articles": "summary",
+    "budgets_union": "cir_subject",
+    "ce": "cir_subject",
+    "cgst": "cir_subject",
+    "cu": "cir_subject",
+    "dgft": "cir_subject",
+    "features": "summary",
+    "sgst": "cir_subject",
+    "st": "cir_subject",
+    "vat": "cir_subject",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    for table, source in SEARCH_SOURCES.items():
+        # 1. Generated (STORED) tsvector column, kept in sync by Postgres on every write.
+        #    Adding it rewrites the table under an exclusive lock: that part blocks
+        #    reads and writes of this table until it is done.
+        op.add_column(
+            table,
+            sa.Column(
+                "search_vector",
+                postgresql.TSVECTOR(),
+                sa.Computed(f"to_tsvector('english', coalesce({source}, ''))", persisted=True),
+                nullable=True))
+
+        # 2. GIN index so '@@' matches are index lookups instead of sequential scans.
+        #    Built concurrently, after the rewrite is committed, so the table takes
+        #    writes again while it is built.
+        create_index_concurrently(f"ix_{table}_search_vector", table, ["search_vector"], using="gin")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    for table in SEARCH_SOURCES:
+        drop_index_concurrently(f"ix_{table}_search_vector")
+        op.drop_column(table, "search_vector")
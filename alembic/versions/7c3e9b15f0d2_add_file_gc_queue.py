@@ -0,0 +1,42 @@
+"""add file gc queue
+
+Revision ID: 7c3e9b15f0d2
+Revises: e2b7d40a9c15
+Create Date: 2026-10-19 22:05:41.274903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e9b15f0d2'
+down_revision: Union[str, Sequence[str], None] = 'e2b7d40a9c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_table(
+        "file_gc_queue",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("table_name", sa.Text(), nullable=False),
+        sa.Column("file_path", sa.Text(), nullable=False),
+        sa.Column("enqueued_at", sa.DateTime(), nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # A re-uploaded record takes its file path off the queue
+    op.create_index(op.f("ix_file_gc_queue_file_path"), "file_gc_queue", ["file_path"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index(op.f("ix_file_gc_queue_file_path"), table_name="file_gc_queue")
+    op.drop_table("file_gc_queue")
@@ -0,0 +1,62 @@
+"""add product hierarchy
+
+Revision ID: 9a41c6e0d7f3
+Revises: 5d2f8e61c3a9
+Create Date: 2026-10-19 20:02:14.775631
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a41c6e0d7f3'
+down_revision: Union[str, Sequence[str], None] = '5d2f8e61c3a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables with prod_id / sub_prod_id / sub_subprod_id and their names
+TABLES = [
+    "ce",
+    "cgst",
+    "cu",
+    "dgft",
+    "sgst",
+    "st",
+    "vat",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_table(
+        "product_hierarchy",
+        sa.Column("table_name", sa.Text(), nullable=False),
+        sa.Column("prod_id", sa.Text(), nullable=False),
+        sa.Column("sub_prod_id", sa.Text(), nullable=False),
+        sa.Column("sub_subprod_id", sa.Text(), nullable=False),
+        sa.Column("prod_name", sa.Text(), nullable=True),
+        sa.Column("sub_prod_name", sa.Text(), nullable=True),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("table_name", "prod_id", "sub_prod_id", "sub_subprod_id"),
+    )
+
+    # One-off backfill ('' = no id, as in app.services.hierarchy); from here on the
+    # ingestion services keep it in step. Run it while no uploads are in progress.
+    for table in TABLES:
+        op.execute(f"""
+            INSERT INTO product_hierarchy
+                (table_name, prod_id, sub_prod_id, sub_subprod_id, prod_name, sub_prod_name, count)
+            SELECT '{table}', coalesce(prod_id, ''), coalesce(sub_prod_id, ''), coalesce(sub_subprod_id, ''),
+                   max(prod_name), max(sub_prod_name), count(*)
+            FROM {table}
+            GROUP BY 2, 3, 4""")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_table("product_hierarchy")
@@ -0,0 +1,42 @@
+"""add change outbox
+
+Revision ID: a6d19e4c3b58
+Revises: 3f8a6d2c91b4
+Create Date: 2026-10-19 23:31:07.418265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d19e4c3b58'
+down_revision: Union[str, Sequence[str], None] = '3f8a6d2c91b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_table(
+        "change_outbox",
+        sa.Column("seq", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("table_name", sa.Text(), nullable=False),
+        sa.Column("universal_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("operation", sa.Text(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("seq"),
+    )
+    # Old rows are pruned by age
+    op.create_index(op.f("ix_change_outbox_changed_at"), "change_outbox", ["changed_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index(op.f("ix_change_outbox_changed_at"), table_name="change_outbox")
+    op.drop_table("change_outbox")
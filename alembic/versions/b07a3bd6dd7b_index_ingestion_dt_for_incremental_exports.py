@@ -0,0 +1,50 @@
+"""index ingestion_dt for incremental exports
+
+Revision ID: b07a3bd6dd7b
+Revises: b3ea33f4c807
+Create Date: 2026-10-19 14:05:27.663410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from database.migration_utils import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b07a3bd6dd7b'
+down_revision: Union[str, Sequence[str], None] = 'b3ea33f4c807'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = [
+    "articles",
+    "budgets_union",
+    "ce",
+    "cgst",
+    "cu",
+    "dgft",
+    "features",
+    "sgst",
+    "st",
+    "vat",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # ingestion_dt is set on every create and update, so a range on it selects
+    # exactly the rows written since the last export. Built concurrently: the
+    # tables keep taking writes while their index is built.
+    for table in TABLES:
+        create_index_concurrently(f"ix_{table}_ingestion_dt", table, ["ingestion_dt"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    for table in TABLES:
+        drop_index_concurrently(f"ix_{table}_ingestion_dt")
@@ -0,0 +1,70 @@
+"""add trigram lookup keys
+
+Revision ID: b3ea33f4c807
+Revises: 69ecd6108efc
+Create Date: 2026-10-19 11:40:03.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from database.migration_utils import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3ea33f4c807'
+down_revision: Union[str, Sequence[str], None] = '69ecd6108efc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> identifier columns that get a normalized lookup key
+LOOKUP_COLUMNS = {
+    "budgets_union": ["circular_no"],
+    "ce": ["circular_no", "case_no", "order_no", "eq_citation"],
+    "cgst": ["circular_no"],
+    "cu": ["circular_no", "case_no", "order_no", "eq_citation"],
+    "dgft": ["circular_no"],
+    "sgst": ["circular_no", "case_no", "order_no", "eq_citation"],
+    "st": ["circular_no", "case_no", "order_no", "eq_citation"],
+    "vat": ["circular_no", "case_no", "order_no", "eq_citation"],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table, columns in LOOKUP_COLUMNS.items():
+        for column in columns:
+            key_column = f"{column}_key"
+
+            # 1. Normalized key: lower-case, punctuation and spaces stripped
+            #    ("Circular No. 12/2019-Cus" -> "circularno122019cus"). Adding the
+            #    generated column rewrites the table under an exclusive lock.
+            op.add_column(
+                table,
+                sa.Column(
+                    key_column,
+                    sa.Text(),
+                    sa.Computed(f"lower(regexp_replace({column}, '[^[:alnum:]]+', '', 'g'))", persisted=True),
+                    nullable=True))
+
+            # 2. Trigram GIN index: serves '=', LIKE 'prefix%', '%' and '<%'. Built
+            #    concurrently, after the rewrite is committed.
+            create_index_concurrently(f"ix_{table}_{key_column}_trgm", table, [f"{key_column} gin_trgm_ops"],
+                                      using="gin")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    for table, columns in LOOKUP_COLUMNS.items():
+        for column in columns:
+            key_column = f"{column}_key"
+            drop_index_concurrently(f"ix_{table}_{key_column}_trgm")
+            op.drop_column(table, key_column)
+
+    # pg_trgm is left installed: other objects may depend on it
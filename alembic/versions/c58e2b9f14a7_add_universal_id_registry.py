@@ -0,0 +1,59 @@
+"""add universal id registry
+
+Revision ID: c58e2b9f14a7
+Revises: 9a41c6e0d7f3
+Create Date: 2026-10-19 20:41:37.902218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58e2b9f14a7'
+down_revision: Union[str, Sequence[str], None] = '9a41c6e0d7f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> primary key column
+TABLES = {
+    "articles": "article_id",
+    "budgets_union": "circular_id",
+    "ce": "case_id",
+    "cgst": "case_id",
+    "cu": "case_id",
+    "dgft": "case_id",
+    "features": "feature_id",
+    "sgst": "case_id",
+    "st": "case_id",
+    "vat": "case_id",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_table(
+        "universal_id_registry",
+        sa.Column("universal_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("table_name", sa.Text(), nullable=False),
+        sa.Column("record_pk", sa.BigInteger(), nullable=False),
+        sa.Column("vil_id", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("universal_id", "table_name"),
+    )
+
+    # One-off backfill; from here on the ingestion services keep it in step.
+    # Run it while no uploads are in progress.
+    for table, pk_column in TABLES.items():
+        op.execute(f"""
+            INSERT INTO universal_id_registry (universal_id, table_name, record_pk, vil_id)
+            SELECT universal_id, '{table}', {pk_column}, vil_id FROM {table}""")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_table("universal_id_registry")
@@ -0,0 +1,46 @@
+"""notify changes from trigger
+
+Revision ID: d84b2e6f07a3
+Revises: a6d19e4c3b58
+Create Date: 2026-10-19 23:58:42.106377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd84b2e6f07a3'
+down_revision: Union[str, Sequence[str], None] = 'a6d19e4c3b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# CHANGES_CHANNEL of database/crud/change_crud.py at the time of this revision
+CHANGES_CHANNEL = "vil_changes"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # Once per INSERT statement, not per row: the writers no longer send a separate
+    # SELECT pg_notify(...) after writing their change rows
+    op.execute(f"""
+        CREATE FUNCTION change_outbox_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{CHANGES_CHANNEL}', changed.table_name)
+            FROM (SELECT DISTINCT table_name FROM inserted) AS changed;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("CREATE TRIGGER change_outbox_notify AFTER INSERT ON change_outbox "
+               "REFERENCING NEW TABLE AS inserted FOR EACH STATEMENT EXECUTE FUNCTION change_outbox_notify()")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.execute("DROP TRIGGER IF EXISTS change_outbox_notify ON change_outbox")
+    op.execute("DROP FUNCTION IF EXISTS change_outbox_notify()")
@@ -0,0 +1,43 @@
+"""add idempotency keys
+
+Revision ID: e2b7d40a9c15
+Revises: c58e2b9f14a7
+Create Date: 2026-10-19 21:17:03.448190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7d40a9c15'
+down_revision: Union[str, Sequence[str], None] = 'c58e2b9f14a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("scope", sa.Text(), nullable=False),
+        sa.Column("key", sa.Text(), nullable=False),
+        sa.Column("fingerprint", sa.Text(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("response_body", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("scope", "key"),
+    )
+    # Expired records are purged by completed_at
+    op.create_index(op.f("ix_idempotency_keys_completed_at"), "idempotency_keys", ["completed_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index(op.f("ix_idempotency_keys_completed_at"), table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
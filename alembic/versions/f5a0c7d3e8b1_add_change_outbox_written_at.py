@@ -0,0 +1,48 @@
+"""add change outbox written_at
+
+Revision ID: f5a0c7d3e8b1
+Revises: d84b2e6f07a3
+Create Date: 2026-10-20 10:12:37.550912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a0c7d3e8b1'
+down_revision: Union[str, Sequence[str], None] = 'd84b2e6f07a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # Nullable without a default: no table rewrite. Rows written before this revision
+    # keep NULL and fall back to CHANGES_GAP_GRACE_SECONDS (see ChangeFeed.read)
+    op.add_column("change_outbox", sa.Column("written_at", sa.DateTime(timezone=True), nullable=True))
+
+    # Set by the database clock after the row's seq was taken (a BEFORE trigger runs
+    # after the column defaults), so every transaction holding a smaller seq started
+    # before it; pg_stat_activity.xact_start is read from the same clock
+    op.execute("""
+        CREATE FUNCTION change_outbox_written_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.written_at := clock_timestamp();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("CREATE TRIGGER change_outbox_written_at BEFORE INSERT ON change_outbox "
+               "FOR EACH ROW EXECUTE FUNCTION change_outbox_written_at()")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.execute("DROP TRIGGER IF EXISTS change_outbox_written_at ON change_outbox")
+    op.execute("DROP FUNCTION IF EXISTS change_outbox_written_at()")
+    op.drop_column("change_outbox", "written_at")
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a batch cannot be admitted: the wait queue is full or the wait timed out.
+    """
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("table", "future", "loop", "granted")
+
+    def __init__(self, table: str):
+        self.table = table
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+        self.granted = False
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    """
+    Bounds the ingestion batches running at once, in total and per table, so
+    concurrent dumps queue here instead of exhausting the connection pool and
+    hanging in pool checkout.
+
+    A batch that cannot start waits in a FIFO queue of at most `max_queue`
+    batches; a waiter whose table is at its limit does not hold up waiters for
+    other tables. A batch is rejected (AdmissionRejected, i.e. 429) when the queue
+    is full or it waited longer than `queue_timeout` seconds. Works across event
+    loops (e.g. /dump worker threads), so it is guarded by a thread lock.
+    """
+    def __init__(self, max_in_flight: int, max_per_table: int, max_queue: int,
+                 queue_timeout: float, retry_after: int):
+        self.max_in_flight = max_in_flight
+        self.max_per_table = max_per_table
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._in_flight = 0
+        self._in_flight_by_table: Dict[str, int] = {}
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    def _can_start(self, table: str) -> bool:
+        return (self._in_flight < self.max_in_flight
+                and self._in_flight_by_table.get(table, 0) < self.max_per_table)
+
+    def _start(self, table: str):
+        self._in_flight += 1
+        self._in_flight_by_table[table] = self._in_flight_by_table.get(table, 0) + 1
+
+    def _grant_waiters(self):
+        # Called with the lock held: start every queued batch that now fits, oldest first
+        for waiter in list(self._waiters):
+            if self._in_flight >= self.max_in_flight:
+                break
+            if self._can_start(waiter.table):
+                self._waiters.remove(waiter)
+                self._start(waiter.table)
+                waiter.granted = True
+                waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+
+    async def acquire(self, table: str):
+        with self._lock:
+            # Queued batches are granted as soon as they fit, so none of them could start now either
+            if self._can_start(table):
+                self._start(table)
+                return
+            if len(self._waiters) >= self.max_queue:
+                raise AdmissionRejected(
+                    f"Too many ingestion batches in progress ({self._in_flight} running, "
+                    f"{len(self._waiters)} waiting).", self.retry_after)
+            waiter = _Waiter(table)
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                if waiter.granted:
+                    # Granted just as the wait ended: give the slot back
+                    self._release_locked(table)
+                else:
+                    self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise AdmissionRejected(
+                f"Waited {self.queue_timeout:g}s for an ingestion slot for '{table}'.", self.retry_after)
+
+    def _release_locked(self, table: str):
+        self._in_flight -= 1
+        self._in_flight_by_table[table] -= 1
+        if not self._in_flight_by_table[table]:
+            del self._in_flight_by_table[table]
+        self._grant_waiters()
+
+    def release(self, table: str):
+        with self._lock:
+            self._release_locked(table)
+
+    @asynccontextmanager
+    async def admit(self, table: str):
+        await self.acquire(table)
+        try:
+            yield
+        finally:
+            self.release(table)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Snapshot of running and queued batches, for /health/admission.
+        """
+        with self._lock:
+            return {
+                "max_in_flight": self.max_in_flight,
+                "max_per_table": self.max_per_table,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "in_flight_by_table": dict(self._in_flight_by_table),
+                "queued": len(self._waiters),
+            }
+
+
+admission = AdmissionController(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    max_per_table=settings.ADMISSION_MAX_IN_FLIGHT_PER_TABLE,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS)
+
+
+def too_many_requests(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=e.reason,
+        headers={"Retry-After": str(e.retry_after)})
+
+
+def admission_for(table: str):
+    """
+    FastAPI dependency that holds one of `table`'s ingestion slots for the request,
+    or answers 429 with Retry-After when none frees up in time.
+    """
+    async def admitted():
+        try:
+            await admission.acquire(table)
+        except AdmissionRejected as e:
+            raise too_many_requests(e)
+        try:
+            yield
+        finally:
+            admission.release(table)
+
+    return admitted
@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -11,6 +12,117 @@ class Settings(BaseSettings):
     STORAGE_PATH: str = "storage"
     LOGS_DIR: str = "logs"
 
+    # Rows fetched per round trip from the server-side cursor in /export
+    EXPORT_BATCH_SIZE: int = 2000
+
+    # In-memory universal_id filter used to reject re-sent rows on /upload before any file I/O
+    ID_FILTER_ENABLED: bool = True
+    ID_FILTER_ERROR_RATE: float = 0.01
+    ID_FILTER_MIN_CAPACITY: int = 100_000
+
+    # Which copy is kept when one payload has several items with the same unique key
+    # (universal_id, vil_id, circular_no, ...); overridable per request with ?on_duplicate=
+    PAYLOAD_DUPLICATE_POLICY: Literal["last_wins", "first_wins"] = "last_wins"
+
+    # /dump: tables processed at once (each holds one pooled connection), the largest
+    # request body accepted (streamed to a temporary file, 413 past it) and the largest
+    # archive accepted, in uncompressed bytes
+    DUMP_MAX_PARALLEL_TABLES: int = 4
+    DUMP_MAX_BODY_BYTES: int = 256 * 1024 ** 2
+    DUMP_MAX_ARCHIVE_BYTES: int = 2 * 1024 ** 3
+
+    # Longest wait for the table lock when a yearly partition is created on demand, and how
+    # long a year whose partition could not be created is not retried (its rows go to
+    # <table>_default meanwhile; see app/services/partitioning.py)
+    PARTITION_LOCK_TIMEOUT_MS: int = 2000
+    PARTITION_RETRY_SECONDS: float = 60.0
+
+    # Longest a cached /hierarchy tree is served without re-reading it; writes through
+    # this process invalidate it at once, the TTL covers writes from other processes
+    HIERARCHY_CACHE_TTL_SECONDS: int = 300
+
+    # Most universal_ids accepted by one POST /resolve
+    RESOLVE_MAX_BATCH: int = 10_000
+
+    # Idempotency-Key on the write endpoints: how long a recorded response is replayed,
+    # how often a process marks the keys it is working on as alive, and after how long
+    # without that heartbeat a key still in progress is taken over (its process died)
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_HEARTBEAT_SECONDS: float = 10.0
+    IDEMPOTENCY_STALE_SECONDS: int = 60
+
+    # Database connection pool (SQLAlchemy QueuePool): connections kept open, extra ones
+    # opened under load, seconds to wait for a free one, liveness check on checkout and
+    # age (seconds) after which a connection is replaced
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+
+    # Admission control for the ingestion endpoints (/upload, /update, /delete, /dump tables):
+    # batches running at once in total and per table, batches allowed to wait for a slot and
+    # for how long, and the Retry-After sent with the 429 when they cannot. Keep
+    # ADMISSION_MAX_IN_FLIGHT below DB_POOL_SIZE + DB_MAX_OVERFLOW so reads still get connections.
+    ADMISSION_MAX_IN_FLIGHT: int = 8
+    ADMISSION_MAX_IN_FLIGHT_PER_TABLE: int = 2
+    ADMISSION_MAX_QUEUE: int = 32
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 10
+
+    # Durable spool for accepted /upload, /update and /dump batches (under STORAGE_PATH/spool):
+    # items per chunk file. Batches interrupted by a restart resume from their checkpoint.
+    SPOOL_ENABLED: bool = True
+    SPOOL_CHUNK_ITEMS: int = 5000
+
+    # Resumable chunked uploads (/<table>/uploads): sessions untouched for this long are
+    # purged, and the largest chunk and whole upload accepted, in bytes. Finalize parses
+    # the whole upload in memory (the bytes, then the decoded JSON, several times larger),
+    # so keep UPLOAD_MAX_BYTES well below the memory of a worker
+    UPLOAD_SESSION_TTL_HOURS: int = 24
+    UPLOAD_MAX_CHUNK_BYTES: int = 64 * 1024 ** 2
+    UPLOAD_MAX_BYTES: int = 256 * 1024 ** 2
+
+    # Background collector unlinking the JSON files of deleted records (queued in
+    # file_gc_queue by /delete): seconds between runs, files per batch, and failed
+    # unlink attempts before an entry is given up on
+    FILE_GC_ENABLED: bool = True
+    FILE_GC_INTERVAL_SECONDS: float = 30.0
+    FILE_GC_BATCH_SIZE: int = 500
+    FILE_GC_MAX_ATTEMPTS: int = 5
+
+    # "hard" deletes rows one by one; "tombstone" makes /delete mark them with one bulk
+    # UPDATE (deleted_at) and leaves the removal of rows and files to a background purge
+    # of the tombstones older than TOMBSTONE_RETENTION_DAYS (0 disables the purge)
+    DELETE_MODE: Literal["hard", "tombstone"] = "hard"
+    TOMBSTONE_RETENTION_DAYS: float = 30
+    TOMBSTONE_PURGE_INTERVAL_SECONDS: float = 3600.0
+    TOMBSTONE_PURGE_BATCH_SIZE: int = 1000
+
+    # Change feed: every create/update/delete writes a row to change_outbox in its own
+    # transaction and NOTIFYs; /changes serves the rows by sequence number. Rows are kept
+    # CHANGES_RETENTION_DAYS. Waiting consumers re-read every CHANGES_POLL_SECONDS while
+    # the LISTEN connection is down. A gap in the sequence is waited for until the
+    # transactions that may fill it have ended (see ChangeFeed.read); only for rows
+    # without written_at (written before migration f5a0c7d3e8b1) is it passed once
+    # older than CHANGES_GAP_GRACE_SECONDS, which can skip a change committed later still
+    CHANGES_ENABLED: bool = True
+    CHANGES_RETENTION_DAYS: float = 7
+    CHANGES_MAX_WAIT_SECONDS: float = 30.0
+    CHANGES_POLL_SECONDS: float = 5.0
+    CHANGES_GAP_GRACE_SECONDS: float = 5.0
+    CHANGES_MAX_BATCH: int = 1000
+
+    # How entrypoint.sh migrates (blocking, deferred or skip); with "deferred" the
+    # application runs `alembic upgrade head` itself. Either way the background workers
+    # (spool recovery, id filter warm-up, file GC, tombstone purge, change feed) start
+    # once the database is at head, checked every MIGRATION_POLL_SECONDS
+    MIGRATION_MODE: Literal["blocking", "deferred", "skip"] = "blocking"
+    MIGRATION_POLL_SECONDS: float = 5.0
+
+    # Count the SQL statements of each request and report them in the X-SQL-Statements header
+    SQL_STATEMENT_COUNTER_ENABLED: bool = True
+
     model_config = SettingsConfigDict(env_file=".env", extra="allow")
 
 # Create a single, globally accessible instance of the settings.
@@ -0,0 +1,90 @@
+import gzip
+import json
+import tarfile
+import zipfile
+from typing import Any, BinaryIO, Dict, List
+
+from app.core.config import settings
+
+ZIP_MAGIC = b"PK\x03\x04"
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def read_dump_sections(body: BinaryIO) -> List[Dict[str, Any]]:
+    """
+    Returns the `{name, data}` table sections of a /dump request body (a binary
+    file, positioned at its start), which may be:
+    - JSON: one section, a list of sections, or a whole phpMyAdmin export (whose
+      header/database entries are skipped);
+    - a zip, tar or tar.gz archive of such JSON files;
+    - a gzip-compressed JSON document.
+    Raises ValueError for anything else or for archives larger than DUMP_MAX_ARCHIVE_BYTES
+    once uncompressed.
+    """
+    head = body.read(262)
+    body.seek(0)
+    if head.startswith(ZIP_MAGIC):
+        return _read_zip(body)
+    if head.startswith(GZIP_MAGIC) or _is_plain_tar(head):
+        try:
+            return _read_tar(body)
+        except tarfile.ReadError:
+            body.seek(0)
+            return _sections_from_document(_load_json(_gunzip(body), "request body"), "request body")
+    return _sections_from_document(_load_json(body.read(), "request body"), "request body")
+
+
+def _is_plain_tar(head: bytes) -> bool:
+    return head[257:262] == b"ustar"
+
+
+def _gunzip(body: BinaryIO) -> bytes:
+    with gzip.GzipFile(fileobj=body) as f:
+        content = f.read(settings.DUMP_MAX_ARCHIVE_BYTES + 1)
+    if len(content) > settings.DUMP_MAX_ARCHIVE_BYTES:
+        raise ValueError(f"Dump is larger than {settings.DUMP_MAX_ARCHIVE_BYTES} bytes once uncompressed.")
+    return content
+
+
+def _read_zip(body: BinaryIO) -> List[Dict[str, Any]]:
+    sections = []
+    try:
+        with zipfile.ZipFile(body) as archive:
+            members = [info for info in archive.infolist() if not info.is_dir() and info.filename.endswith(".json")]
+            _check_size(sum(info.file_size for info in members))
+            for info in members:
+                sections += _sections_from_document(_load_json(archive.read(info), info.filename), info.filename)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Invalid zip archive: {e}") from e
+    return sections
+
+
+def _read_tar(body: BinaryIO) -> List[Dict[str, Any]]:
+    sections = []
+    with tarfile.open(fileobj=body, mode="r:*") as archive:
+        members = [member for member in archive.getmembers() if member.isfile() and member.name.endswith(".json")]
+        _check_size(sum(member.size for member in members))
+        for member in members:
+            content = archive.extractfile(member).read()
+            sections += _sections_from_document(_load_json(content, member.name), member.name)
+    return sections
+
+
+def _check_size(total_size: int):
+    if total_size > settings.DUMP_MAX_ARCHIVE_BYTES:
+        raise ValueError(f"Archive is larger than {settings.DUMP_MAX_ARCHIVE_BYTES} bytes once uncompressed.")
+
+
+def _load_json(content: bytes, source: str) -> Any:
+    try:
+        return json.loads(content)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"{source} is not valid JSON: {e}") from e
+
+
+def _sections_from_document(document: Any, source: str) -> List[Dict[str, Any]]:
+    entries = document if isinstance(document, list) else [document]
+    sections = [entry for entry in entries if isinstance(entry, dict) and "name" in entry and "data" in entry]
+    if not sections:
+        raise ValueError(f"{source} contains no {{name, data}} table sections.")
+    return sections
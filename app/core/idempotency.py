@@ -0,0 +1,203 @@
+import os
+import uuid
+import socket
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Header, Request, status
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+from app.core.request_body import spooled_body
+from database.db_session import SessionLocal
+from database.crud.idempotency_crud import idempotency_keys
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Suggested wait before retrying a key that another process is still working on
+IN_PROGRESS_RETRY_AFTER_SECONDS = 5
+
+
+def idempotency_key_header(
+    idempotency_key: Optional[str] = Header(
+        None, alias=IDEMPOTENCY_HEADER,
+        description=("Any unique string (e.g. a UUID) per logical request. A retry with the same key and "
+                     "body returns the first response instead of processing the payload again."))
+):
+    """
+    Declares the header for the OpenAPI docs; `IdempotentRoute` does the work.
+    """
+    return idempotency_key
+
+
+def _replay(status_code: int, body: bytes) -> Response:
+    return Response(content=body, status_code=status_code, media_type="application/json",
+                    headers={REPLAYED_HEADER: "true"})
+
+
+def _error(status_code: int, detail: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail}, headers=headers)
+
+
+class IdempotencyStore:
+    """
+    Runs a request at most once per (endpoint, Idempotency-Key).
+
+    Completed responses are kept in the idempotency_keys table for
+    IDEMPOTENCY_TTL_HOURS and replayed to retries. A retry that arrives while the
+    first request is still running in this process waits for it and gets the same
+    response; one that arrives at another process gets 409 with Retry-After.
+    Raised errors and responses that ask for a retry (5xx, 429) are not recorded,
+    so the retry processes the request again.
+
+    A key in progress records its owner (this process), which refreshes the keys'
+    heartbeat every IDEMPOTENCY_HEARTBEAT_SECONDS from a thread of its own, so a
+    long batch blocking the event loop still counts as alive. A key whose heartbeat
+    is older than IDEMPOTENCY_STALE_SECONDS was left by a process that died, and
+    the next retry takes it over.
+    """
+    def __init__(self, heartbeat_seconds: float):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.heartbeat_seconds = heartbeat_seconds
+        # (scope, key) -> (fingerprint, future of (status_code, body)) of requests running here
+        self._in_flight: Dict[Tuple[str, str], Tuple[str, asyncio.Future]] = {}
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    async def run(self, scope: str, key: str, fingerprint: str,
+                  produce: Callable[[], Awaitable[Response]]) -> Response:
+        flight_key = (scope, key)
+        if flight_key in self._in_flight:
+            running_fingerprint, future = self._in_flight[flight_key]
+            if running_fingerprint != fingerprint:
+                return self._mismatch()
+            return _replay(*await asyncio.shield(future))
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        expired_before = now - timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+        with SessionLocal() as db:
+            existing = idempotency_keys.claim(
+                db, scope=scope, key=key, fingerprint=fingerprint, owner=self.owner, now=now,
+                stale_before=now - timedelta(seconds=settings.IDEMPOTENCY_STALE_SECONDS),
+                expired_before=expired_before)
+            if existing is None:
+                idempotency_keys.purge_expired(db, expired_before=expired_before)
+
+        if existing is not None:
+            if existing["fingerprint"] != fingerprint:
+                return self._mismatch()
+            if existing["completed_at"] is None:
+                return _error(
+                    status.HTTP_409_CONFLICT,
+                    f"A request with this {IDEMPOTENCY_HEADER} is still being processed.",
+                    headers={"Retry-After": str(IN_PROGRESS_RETRY_AFTER_SECONDS)})
+            return _replay(existing["status_code"], existing["response_body"].encode("utf-8"))
+
+        self._start_heartbeat()
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting: mark a failure as retrieved so it is not logged as lost
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[flight_key] = (fingerprint, future)
+        try:
+            try:
+                response = await produce()
+            except BaseException as e:
+                self._release(scope, key)
+                future.set_exception(e)
+                raise
+
+            if response.status_code >= 500 or response.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+                self._release(scope, key)
+            else:
+                self._complete(scope, key, response)
+            future.set_result((response.status_code, response.body))
+            return response
+        finally:
+            del self._in_flight[flight_key]
+
+    def _start_heartbeat(self):
+        if self._heartbeat_thread is None:
+            self._heartbeat_thread = threading.Thread(target=self._beat, name="idempotency-heartbeat", daemon=True)
+            self._heartbeat_thread.start()
+
+    def _beat(self):
+        while True:
+            time.sleep(self.heartbeat_seconds)
+            if not self._in_flight:
+                continue
+            try:
+                with SessionLocal() as db:
+                    idempotency_keys.heartbeat(db, owner=self.owner, now=datetime.now(timezone.utc).replace(tzinfo=None))
+            except Exception as e:
+                # Missed beats only matter after IDEMPOTENCY_STALE_SECONDS of them
+                logger.error(f"Could not refresh the heartbeat of the {IDEMPOTENCY_HEADER}s in progress: {e}")
+
+    def _mismatch(self) -> JSONResponse:
+        return _error(status.HTTP_422_UNPROCESSABLE_ENTITY,
+                      f"This {IDEMPOTENCY_HEADER} was already used for a different request.")
+
+    def _complete(self, scope: str, key: str, response: Response):
+        try:
+            with SessionLocal() as db:
+                idempotency_keys.complete(
+                    db, scope=scope, key=key, owner=self.owner, now=datetime.now(timezone.utc).replace(tzinfo=None),
+                    status_code=response.status_code, response_body=response.body.decode("utf-8"))
+        except Exception as e:
+            # The request itself succeeded; only its replay is lost
+            logger.error(f"Could not record the response for {IDEMPOTENCY_HEADER} '{key}' ({scope}): {e}")
+
+    def _release(self, scope: str, key: str):
+        try:
+            with SessionLocal() as db:
+                idempotency_keys.release(db, scope=scope, key=key, owner=self.owner)
+        except Exception as e:
+            logger.error(f"Could not release {IDEMPOTENCY_HEADER} '{key}' ({scope}): {e}")
+
+
+idempotency_store = IdempotencyStore(heartbeat_seconds=settings.IDEMPOTENCY_HEARTBEAT_SECONDS)
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Route class for write endpoints: requests with an `Idempotency-Key` header are
+    run through `idempotency_store`, keyed by method and path, and fingerprinted by
+    query string and body.
+
+    The body is read into memory, unless `max_body_bytes` is set: then it is
+    streamed to a temporary file (`spooled_body`) and hashed on the way, for
+    endpoints that read it with `spooled_body` too.
+    """
+    max_body_bytes: Optional[int] = None
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return await handler(request)
+            if len(key) > MAX_KEY_LENGTH:
+                return _error(status.HTTP_400_BAD_REQUEST,
+                              f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters.")
+
+            digest = hashlib.sha256(request.url.query.encode("utf-8"))
+            digest.update(b"\n")
+            scope = f"{request.method} {request.url.path}"
+            if self.max_body_bytes is not None:
+                async with spooled_body(request, self.max_body_bytes, digest):
+                    return await idempotency_store.run(scope, key, digest.hexdigest(), lambda: handler(request))
+
+            # The body is cached on the request, so the handler does not read it again
+            digest.update(await request.body())
+            return await idempotency_store.run(scope, key, digest.hexdigest(), lambda: handler(request))
+
+        return idempotent_handler
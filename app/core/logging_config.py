@@ -1,6 +1,7 @@
 import os
 import logging
 from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
 from .config import settings
 
@@ -8,6 +9,20 @@ logger = logging.getLogger("transaction_logger")
 logger.setLevel(logging.INFO)
 logger.propagate = False
 
+# Log file handler of the transaction running in the current request / task / thread.
+# Concurrent transactions (parallel requests, /dump tables) share one logger, so each
+# handler only accepts records emitted from its own context.
+_active_handler: ContextVar[logging.Handler] = ContextVar("active_transaction_handler", default=None)
+
+
+class _ActiveTransactionFilter(logging.Filter):
+    def __init__(self, handler: logging.Handler):
+        super().__init__()
+        self.handler = handler
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return _active_handler.get() is self.handler
+
 def setup_transaction_logger():
     """
     Ensures the logs directory exists.
@@ -30,9 +45,11 @@ def transaction_logging(table_name: str, operation: str):
     file_handler = logging.FileHandler(log_filepath)
     formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
     file_handler.setFormatter(formatter)
+    file_handler.addFilter(_ActiveTransactionFilter(file_handler))
     
     # 3. Attach Handler
     logger.addHandler(file_handler)
+    context_token = _active_handler.set(file_handler)
     
     try:
         # 4. Log the Start Header automatically
@@ -49,5 +66,6 @@ def transaction_logging(table_name: str, operation: str):
         logger.info("END OF TRANSACTION")
         logger.info("=" * 50)
         
+        _active_handler.reset(context_token)
         logger.removeHandler(file_handler)
         file_handler.close()
@@ -0,0 +1,35 @@
+import re
+from typing import List
+
+# Must match the generated `<column>_key` columns:
+#   lower(regexp_replace(<column>, '[^[:alnum:]]+', '', 'g'))
+_NON_ALNUM = re.compile(r"[\W_]+", re.UNICODE)
+
+# Words users type in front of the actual number ("Circ No 12/2019", "Notfn. No. 5/2017")
+NOISE_WORDS = {
+    "circular", "circ", "cir", "no", "nos", "number", "num", "notification", "notfn", "noti",
+    "order", "case", "appeal", "dated", "dt",
+}
+
+
+def normalize_key(value: str) -> str:
+    """
+    Normalizes an identifier the same way Postgres builds the `<column>_key` columns.
+    """
+    return _NON_ALNUM.sub("", value).lower()
+
+
+def lookup_candidates(query: str) -> List[str]:
+    """
+    Returns the normalized forms of a user query to try against the key columns:
+    the query as typed, and the query with leading noise words ("Circ No") removed.
+    Empty candidates are dropped; order is most specific first.
+    """
+    candidates = [normalize_key(query)]
+
+    words = [word for word in re.split(r"[\s.:#]+", query) if word]
+    while words and words[0].lower() in NOISE_WORDS:
+        words.pop(0)
+    candidates.append(normalize_key(" ".join(words)))
+
+    return [candidate for candidate in dict.fromkeys(candidates) if candidate]
@@ -0,0 +1,29 @@
+import json
+import base64
+from datetime import datetime
+from typing import Any, List
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Encodes the keyset position of the last row of a page into an opaque,
+    URL-safe cursor string. Datetimes are tagged so they round-trip exactly.
+    """
+    encoded = [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(encoded, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """
+    Reverses `encode_cursor`. Raises ValueError for anything that is not a cursor
+    produced by this API.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        decoded = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(decoded, list):
+            raise ValueError("cursor is not a list")
+        return [datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value for value in decoded]
+    except (ValueError, TypeError, KeyError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
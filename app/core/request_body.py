@@ -0,0 +1,40 @@
+import asyncio
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, BinaryIO, Optional
+
+from fastapi import HTTPException, Request, status
+
+
+@asynccontextmanager
+async def spooled_body(request: Request, max_bytes: int, digest=None) -> AsyncIterator[BinaryIO]:
+    """
+    Streams the request body into a temporary file, rewound, instead of holding it
+    in memory, and answers 413 past `max_bytes`. `digest` (a hashlib object) is fed
+    the body on the way. The file is kept on the request: a nested use (the endpoint,
+    after IdempotentRoute hashed the body) gets the same file, and the outermost use
+    closes it.
+    """
+    file: Optional[BinaryIO] = getattr(request.state, "spooled_body", None)
+    if file is not None:
+        file.seek(0)
+        yield file
+        return
+
+    file = tempfile.TemporaryFile()
+    request.state.spooled_body = file
+    try:
+        size = 0
+        async for piece in request.stream():
+            size += len(piece)
+            if size > max_bytes:
+                raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                                    detail=f"Request body exceeds the limit of {max_bytes} bytes.")
+            if digest is not None:
+                digest.update(piece)
+            await asyncio.to_thread(file.write, piece)
+        file.seek(0)
+        yield file
+    finally:
+        del request.state.spooled_body
+        file.close()
@@ -0,0 +1,215 @@
+import os
+import json
+import uuid
+import fcntl
+import shutil
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "meta.json"
+CHECKPOINT_FILE = "checkpoint"
+LOCK_FILE = "lock"
+# A job directory is only renamed to its final name once fully written
+INCOMPLETE_SUFFIX = ".incomplete"
+
+
+def _write_file(path: str, data: bytes, sync: bool):
+    with open(path, "wb") as f:
+        f.write(data)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _sync_dir(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class SpoolJob:
+    """
+    One accepted batch on disk: meta.json, the items in numbered chunk files and
+    a checkpoint holding the index of the last item that was handled (committed
+    or reported as failed). While a process works on the job it holds an
+    exclusive lock on the job's lock file, so another process never resumes it.
+    """
+    def __init__(self, path: str, meta: Dict[str, Any]):
+        self.path = path
+        self.meta = meta
+        self._lock_fd: Optional[int] = None
+
+    @property
+    def job_id(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def table_name(self) -> str:
+        return self.meta["table_name"]
+
+    @property
+    def operation(self) -> str:
+        return self.meta["operation"]
+
+    @property
+    def policy(self) -> str:
+        return self.meta["policy"]
+
+    @property
+    def total(self) -> int:
+        return self.meta["total"]
+
+    def _chunk_path(self, number: int) -> str:
+        return os.path.join(self.path, f"chunk_{number:05d}.json")
+
+    def read_items(self) -> List[Dict[str, Any]]:
+        items = []
+        for number in range(self.meta["chunks"]):
+            with open(self._chunk_path(number), "rb") as f:
+                items.extend(json.loads(f.read()))
+        return items
+
+    def read_checkpoint(self) -> int:
+        """
+        Index of the last handled item, -1 when none was.
+        """
+        try:
+            with open(os.path.join(self.path, CHECKPOINT_FILE)) as f:
+                return int(f.read().strip() or -1)
+        except FileNotFoundError:
+            return -1
+
+    def checkpoint(self, index: int):
+        """
+        Records `index` as the last handled item. Written atomically but not
+        fsynced: it survives a process crash, and after a host crash at worst a
+        few items are handled twice (uploads then report them as duplicates).
+        """
+        temp_path = os.path.join(self.path, CHECKPOINT_FILE + ".tmp")
+        _write_file(temp_path, str(index).encode("ascii"), sync=False)
+        os.replace(temp_path, os.path.join(self.path, CHECKPOINT_FILE))
+
+    def lock(self) -> bool:
+        """
+        Takes the job's lock without waiting; False if another process holds it.
+        """
+        fd = os.open(os.path.join(self.path, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def unlock(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def discard(self):
+        """
+        Deletes the finished job.
+        """
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.unlock()
+
+
+class Spool:
+    """
+    Durable queue of accepted ingestion batches under STORAGE_PATH. A batch is
+    written here before processing starts and deleted once it is done, so
+    batches interrupted by a restart can be resumed from their checkpoint.
+    """
+    def __init__(self, root: str, chunk_items: int):
+        self.root = root
+        self.chunk_items = chunk_items
+
+    def create(self, *, table_name: str, operation: str, policy: str, items: List[Dict[str, Any]]) -> SpoolJob:
+        """
+        Writes and fsyncs a batch and returns it locked by the caller.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        now = datetime.now(timezone.utc)
+        job_id = f"{now:%Y%m%dT%H%M%S%f}_{table_name}_{uuid.uuid4().hex[:8]}"
+        temp_path = os.path.join(self.root, job_id + INCOMPLETE_SUFFIX)
+        os.makedirs(temp_path)
+        job = SpoolJob(temp_path, {})
+        job.lock()
+
+        try:
+            chunks = 0
+            for start in range(0, len(items), self.chunk_items):
+                data = json.dumps(items[start:start + self.chunk_items], default=str).encode("utf-8")
+                _write_file(job._chunk_path(chunks), data, sync=True)
+                chunks += 1
+
+            job.meta = {
+                "table_name": table_name,
+                "operation": operation,
+                "policy": policy,
+                "total": len(items),
+                "chunks": chunks,
+                "accepted_at": now.isoformat(),
+            }
+            _write_file(os.path.join(temp_path, META_FILE), json.dumps(job.meta).encode("utf-8"), sync=True)
+            _sync_dir(temp_path)
+
+            final_path = os.path.join(self.root, job_id)
+            os.rename(temp_path, final_path)
+            _sync_dir(self.root)
+        except BaseException:
+            job.discard()
+            raise
+
+        job.path = final_path
+        return job
+
+    def pending(self) -> List[SpoolJob]:
+        """
+        Unfinished batches, oldest first. Half-written ones (the request that sent
+        them failed) are deleted.
+        """
+        if not os.path.isdir(self.root):
+            return []
+
+        jobs = []
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name)
+            if not os.path.isdir(path):
+                continue
+            if name.endswith(INCOMPLETE_SUFFIX):
+                # Still locked while its request is writing it
+                job = SpoolJob(path, {})
+                if job.lock():
+                    job.discard()
+                continue
+            try:
+                with open(os.path.join(path, META_FILE)) as f:
+                    jobs.append(SpoolJob(path, json.load(f)))
+            except (OSError, ValueError) as e:
+                logger.error(f"Unreadable spooled batch '{name}': {e}")
+        return jobs
+
+    def status(self) -> List[Dict[str, Any]]:
+        """
+        Unfinished batches with their progress, for /health/spool.
+        """
+        return [{
+            "job_id": job.job_id,
+            "table": job.table_name,
+            "operation": job.operation,
+            "accepted_at": job.meta.get("accepted_at"),
+            "total": job.total,
+            "handled": job.read_checkpoint() + 1,
+        } for job in self.pending()]
+
+
+spool = Spool(os.path.join(settings.STORAGE_PATH, "spool"), chunk_items=settings.SPOOL_CHUNK_ITEMS)
@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Response header carrying the number of statements a request sent
+STATEMENT_COUNT_HEADER = "X-SQL-Statements"
+
+
+class StatementCounter:
+    """
+    Number of round trips to the database: every statement sent (an executemany
+    counts once) and every COMMIT.
+    """
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+
+# The counter of the current request. Holding a mutable object (rather than the
+# count itself) lets the copies of the context made for threadpool dependencies,
+# asyncio.to_thread and the endpoint task all add to the same counter.
+_current: ContextVar[Optional[StatementCounter]] = ContextVar("sql_statement_counter", default=None)
+
+
+@contextmanager
+def counting_statements() -> Iterator[StatementCounter]:
+    """
+    Counts the statements sent from the current context (and the tasks and threads
+    started from it) until the block exits.
+    """
+    counter = StatementCounter()
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
+
+
+def _count(*args, **kwargs):
+    counter = _current.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def install(engine: Engine):
+    """
+    Hooks the counter into `engine`. Outside `counting_statements` it costs one
+    context variable lookup per statement.
+    """
+    event.listen(engine, "before_cursor_execute", _count)
+    event.listen(engine, "commit", _count)
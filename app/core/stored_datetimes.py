@@ -0,0 +1,48 @@
+"""
+How the DateTime columns (`timestamp without time zone`) store a datetime.
+
+Postgres stores an aware value converted to the session's TimeZone, then drops
+the offset; a naive one is stored as it is. Other backends (SQLite in the tests)
+drop the offset without converting. To compare a payload or a file with a row,
+its datetimes are put through the same conversion (`as_stored`).
+"""
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, Optional, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# Engine -> its sessions' time zone, read once per process
+_zones: Dict[Engine, Optional[tzinfo]] = {}
+
+
+def session_time_zone(bind: Union[Engine, Connection]) -> Optional[tzinfo]:
+    """
+    The TimeZone of `bind`'s Postgres sessions, or None for other dialects.
+    """
+    engine = bind.engine
+    if engine.dialect.name != "postgresql":
+        return None
+    if engine not in _zones:
+        with engine.connect() as connection:
+            name = connection.execute(text("SHOW TimeZone")).scalar()
+            try:
+                zone = ZoneInfo(name)
+            except (ZoneInfoNotFoundError, ValueError):
+                # A POSIX-style setting (e.g. '<+05>-05'): its current offset
+                offset = connection.execute(text("SELECT extract(timezone FROM now())")).scalar()
+                zone = timezone(timedelta(seconds=int(offset)))
+        _zones[engine] = zone
+    return _zones[engine]
+
+
+def as_stored(value: Any, zone: Optional[tzinfo]) -> Any:
+    """
+    `value` as a `timestamp without time zone` column stores it, given the session
+    time zone `zone` (see `session_time_zone`). Values other than aware datetimes
+    are returned as they are.
+    """
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return (value.astimezone(zone) if zone is not None else value).replace(tzinfo=None)
+    return value
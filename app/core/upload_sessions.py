@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiofiles
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "meta.json"
+FINALIZING_SUFFIX = ".finalizing"
+
+
+class UploadTooLarge(Exception):
+    """
+    Raised when a chunk, or the session as a whole, exceeds its size limit.
+    """
+
+
+class UploadSessionStore:
+    """
+    Resumable uploads: a client opens a session, PUTs the bytes of its payload as
+    numbered chunks in any order (re-sending a chunk replaces it), asks which chunks
+    arrived, and finalizes. Each session is a directory under STORAGE_PATH/uploads;
+    a chunk only becomes visible once fully received, so a dropped connection never
+    leaves a truncated chunk behind. Sessions untouched for `ttl_hours` are purged.
+    """
+    def __init__(self, root: str, ttl_hours: int, max_chunk_bytes: int, max_bytes: int):
+        self.root = root
+        self.ttl_hours = ttl_hours
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_bytes = max_bytes
+
+    def _path(self, upload_id: uuid.UUID) -> str:
+        return os.path.join(self.root, upload_id.hex)
+
+    @staticmethod
+    def _chunk_name(number: int) -> str:
+        return f"chunk_{number:05d}"
+
+    def _read_meta(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def create(self, table_name: str, total_chunks: Optional[int]) -> Dict[str, Any]:
+        self.purge_expired()
+        upload_id = uuid.uuid4()
+        path = self._path(upload_id)
+        os.makedirs(path)
+        meta = {
+            "upload_id": str(upload_id),
+            "table_name": table_name,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "total_chunks": total_chunks,
+        }
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump(meta, f)
+        return self.status(upload_id, table_name)
+
+    def _received(self, path: str) -> Dict[int, int]:
+        """
+        Chunk number -> size in bytes of the chunks received so far.
+        """
+        received = {}
+        for name in os.listdir(path):
+            if name.startswith("chunk_") and name[6:].isdigit():
+                received[int(name[6:])] = os.path.getsize(os.path.join(path, name))
+        return received
+
+    def status(self, upload_id: uuid.UUID, table_name: str) -> Optional[Dict[str, Any]]:
+        """
+        The session and its received chunks, or None if there is no open session
+        `upload_id` for `table_name`.
+        """
+        path = self._path(upload_id)
+        meta = self._read_meta(path)
+        if meta is None or meta["table_name"] != table_name:
+            return None
+
+        try:
+            received = self._received(path)
+            modified = os.path.getmtime(path)
+        except FileNotFoundError:
+            # Finalized or deleted since the meta was read
+            return None
+        expected = meta["total_chunks"] or (max(received) + 1 if received else 0)
+        return {
+            **meta,
+            "received": sorted(received),
+            "missing": [number for number in range(expected) if number not in received],
+            "received_bytes": sum(received.values()),
+            "expires_at": datetime.fromtimestamp(modified + self.ttl_hours * 3600, timezone.utc).isoformat(),
+        }
+
+    async def put_chunk(self, upload_id: uuid.UUID, table_name: str, number: int,
+                        stream: AsyncIterator[bytes]) -> Optional[int]:
+        """
+        Stores chunk `number` from `stream` and returns its size, or None if the
+        session does not exist. Raises UploadTooLarge past the limits.
+        """
+        path = self._path(upload_id)
+        meta = self._read_meta(path)
+        if meta is None or meta["table_name"] != table_name:
+            return None
+        if meta["total_chunks"] is not None and number >= meta["total_chunks"]:
+            raise ValueError(f"Chunk {number} is out of range: the session has {meta['total_chunks']} chunks.")
+
+        chunk_name = self._chunk_name(number)
+        # Unique temp name: two PUTs of the same chunk must not write into one file
+        temp_path = os.path.join(path, f"{chunk_name}.{uuid.uuid4().hex}.part")
+        size = 0
+        try:
+            others = sum(size for received, size in self._received(path).items() if received != number)
+            limit = min(self.max_chunk_bytes, self.max_bytes - others)
+            async with aiofiles.open(temp_path, "wb") as f:
+                async for piece in stream:
+                    size += len(piece)
+                    if size > limit:
+                        raise UploadTooLarge(
+                            f"Chunk {number} exceeds the limit of {self.max_chunk_bytes} bytes per chunk "
+                            f"and {self.max_bytes} bytes per upload.")
+                    await f.write(piece)
+            os.replace(temp_path, os.path.join(path, chunk_name))
+        except FileNotFoundError:
+            # The session was finalized or deleted meanwhile; a part file left in the
+            # finalizing directory is not a chunk and goes with it
+            return None
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return size
+
+    def begin_finalize(self, upload_id: uuid.UUID, table_name: str) -> Optional[bytearray]:
+        """
+        Takes the session out of circulation and returns its assembled bytes, or
+        None if there is no open session (it may be finalizing already). Raises
+        ValueError if chunks are missing.
+        """
+        state = self.status(upload_id, table_name)
+        if state is None:
+            return None
+        if state["missing"] or not state["received"]:
+            raise ValueError(f"Chunks still missing: {state['missing'] or [0]}.")
+
+        path = self._path(upload_id)
+        finalizing_path = path + FINALIZING_SUFFIX
+        try:
+            # Atomic: of two concurrent finalize calls, only one gets the session
+            os.rename(path, finalizing_path)
+        except FileNotFoundError:
+            return None
+
+        # Listed again: a PUT may have replaced a chunk just before the rename, none can after
+        received = self._received(finalizing_path)
+        # One buffer of the final size, read into in place: the payload is held once
+        data = bytearray(sum(received.values()))
+        with memoryview(data) as view:
+            offset = 0
+            for number in sorted(received):
+                with open(os.path.join(finalizing_path, self._chunk_name(number)), "rb") as f:
+                    offset += f.readinto(view[offset:offset + received[number]])
+        return data
+
+    def end_finalize(self, upload_id: uuid.UUID, succeeded: bool):
+        """
+        Deletes a finalized session, or reopens it after a failure so the client
+        can finalize again.
+        """
+        finalizing_path = self._path(upload_id) + FINALIZING_SUFFIX
+        if succeeded:
+            shutil.rmtree(finalizing_path, ignore_errors=True)
+            return
+        try:
+            os.rename(finalizing_path, self._path(upload_id))
+        except OSError as e:
+            logger.warning(f"Could not reopen upload session '{upload_id}': {e}")
+
+    def delete(self, upload_id: uuid.UUID, table_name: str) -> bool:
+        path = self._path(upload_id)
+        meta = self._read_meta(path)
+        if meta is None or meta["table_name"] != table_name:
+            return False
+        shutil.rmtree(path, ignore_errors=True)
+        return True
+
+    def purge_expired(self) -> int:
+        """
+        Deletes the sessions (also stuck finalizing ones) untouched for `ttl_hours`.
+        """
+        if not os.path.isdir(self.root):
+            os.makedirs(self.root, exist_ok=True)
+            return 0
+
+        expired_before = time.time() - self.ttl_hours * 3600
+        purged = 0
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if os.path.getmtime(path) < expired_before:
+                    shutil.rmtree(path)
+                    purged += 1
+            except OSError as e:
+                logger.warning(f"Could not purge upload session '{name}': {e}")
+        return purged
+
+
+upload_sessions = UploadSessionStore(
+    os.path.join(settings.STORAGE_PATH, "uploads"),
+    ttl_hours=settings.UPLOAD_SESSION_TTL_HOURS,
+    max_chunk_bytes=settings.UPLOAD_MAX_CHUNK_BYTES,
+    max_bytes=settings.UPLOAD_MAX_BYTES)
@@ -10,7 +10,8 @@ article_config = RouterConfig(
     service=article_service,
     pk_field_name="article_id",
     entity_name_singular="Article",
-    entity_name_plural="articles"
+    entity_name_plural="articles",
+    sort_field_name="article_date"
 )
 
 # 2. Create the router by calling the factory
@@ -4,7 +4,7 @@ from app.services.budgets_union_service import budgets_union_service
 from app.schemas.budgets_union_schema import BudgetsUnionCreate
 
 
-article_config = RouterConfig(
+budgets_union_config = RouterConfig(
     table_name="budgets_union",
     pydantic_schema=BudgetsUnionCreate,
     service=budgets_union_service,
@@ -14,4 +14,4 @@ article_config = RouterConfig(
 )
 
 # 2. Create the router by calling the factory
-router = create_router(config=article_config)
\ No newline at end of file
+router = create_router(config=budgets_union_config)
\ No newline at end of file
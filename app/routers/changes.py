@@ -0,0 +1,123 @@
+import json
+import time
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+
+from database.db_session import SessionLocal
+from app.core.config import settings
+from app.routers.registry import ROUTER_CONFIGS
+from app.routers.resolve import PREFIXES_BY_TABLE
+from app.services.changes import change_feed
+
+router = APIRouter()
+
+
+def _table_names(tables: Optional[str]) -> Optional[Set[str]]:
+    """
+    Turns a comma-separated list of table prefixes into database table names (None for all).
+    """
+    if not tables:
+        return None
+    requested = [name.strip() for name in tables.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in ROUTER_CONFIGS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown table(s): {', '.join(unknown)}. Available: {', '.join(ROUTER_CONFIGS)}")
+    return {ROUTER_CONFIGS[name].service.crud.model.__tablename__ for name in requested}
+
+
+def _change(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "seq": row["seq"],
+        "table": PREFIXES_BY_TABLE.get(row["table_name"], row["table_name"]),
+        "universal_id": row["universal_id"],
+        "operation": row["operation"],
+        "changed_at": row["changed_at"],
+    }
+
+
+def _read(after: int, table_names: Optional[Set[str]], limit: int) -> Tuple[List[Dict[str, Any]], int]:
+    # A short session per read: waiting consumers must not hold pool connections
+    with SessionLocal() as db:
+        return change_feed.read(db, after_seq=after, table_names=table_names, limit=limit)
+
+
+async def _read_or_wait(after: int, table_names: Optional[Set[str]], limit: int,
+                        wait: float) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Reads the changes after `after`; if there are none, waits up to `wait` seconds
+    for some to be committed.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        # Taken before reading, so a change committed during the read is not waited for
+        version = change_feed.version
+        changes, last_seq = await asyncio.to_thread(_read, after, table_names, limit)
+        if changes:
+            return changes, last_seq
+        after = last_seq
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return changes, last_seq
+        await change_feed.wait(version, remaining)
+
+
+@router.get(
+    "",
+    summary="Read committed changes (long-poll)",
+    description=("Returns the creates, updates and deletes committed after sequence number `after`, in order. "
+                 "Resume with the returned `last_seq`. With `wait`, an empty result is held back up to that "
+                 "many seconds until changes are committed. `tables` is a comma-separated list of table "
+                 "prefixes (default: all).")
+)
+async def read_changes(
+    after: int = Query(0, ge=0, description="Last sequence number already processed"),
+    tables: Optional[str] = Query(None, description="Comma-separated table prefixes, e.g. sgst,cu"),
+    limit: int = Query(500, ge=1, le=settings.CHANGES_MAX_BATCH),
+    wait: float = Query(0, ge=0, le=settings.CHANGES_MAX_WAIT_SECONDS,
+                        description="Seconds to wait for changes when there are none"),
+):
+    table_names = _table_names(tables)
+    changes, last_seq = await _read_or_wait(after, table_names, limit, wait)
+    return JSONResponse(content=jsonable_encoder({
+        "changes": [_change(row) for row in changes],
+        "last_seq": last_seq,
+    }))
+
+
+@router.get(
+    "/stream",
+    summary="Stream committed changes (server-sent events)",
+    description=("Streams changes as server-sent events whose id is the sequence number, starting after `after` "
+                 "or the `Last-Event-ID` header, so a reconnecting EventSource resumes where it stopped. "
+                 "`tables` is a comma-separated list of table prefixes (default: all).")
+)
+async def stream_changes(
+    after: int = Query(0, ge=0, description="Last sequence number already processed"),
+    tables: Optional[str] = Query(None, description="Comma-separated table prefixes, e.g. sgst,cu"),
+    last_event_id: Optional[str] = Header(None),
+):
+    table_names = _table_names(tables)
+    if last_event_id and last_event_id.isdigit():
+        after = max(after, int(last_event_id))
+
+    async def events():
+        position = after
+        while True:
+            changes, last_seq = await _read_or_wait(
+                position, table_names, settings.CHANGES_MAX_BATCH, settings.CHANGES_MAX_WAIT_SECONDS)
+            for row in changes:
+                data = json.dumps(jsonable_encoder(_change(row)))
+                yield f"id: {row['seq']}\nevent: change\ndata: {data}\n\n"
+            if not changes or last_seq != changes[-1]["seq"]:
+                # Keep-alive that also moves the client's Last-Event-ID past filtered out changes
+                yield f"id: {last_seq}\n\n"
+            position = last_seq
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
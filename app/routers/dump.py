@@ -0,0 +1,166 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Literal, Optional
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+
+from database.db_session import SessionLocal
+from app.core.config import settings
+from app.core.dump_archive import read_dump_sections
+from app.core.logging_config import transaction_logging
+from app.core.idempotency import IdempotentRoute, idempotency_key_header
+from app.core.request_body import spooled_body
+from app.core.admission import AdmissionRejected, admission
+from app.routers.router_config import RouterConfig
+from app.routers.registry import ROUTER_CONFIGS
+from app.routers.generic_router_factory import spooled_batch, upload_status_code
+
+transaction_logger = logging.getLogger("transaction_logger")
+
+
+class DumpRoute(IdempotentRoute):
+    # Dumps are large: the body is streamed to a temporary file, not read into memory
+    max_body_bytes = settings.DUMP_MAX_BODY_BYTES
+
+
+# A retried dump (same Idempotency-Key and body) gets the first run's report
+router = APIRouter(route_class=DumpRoute, dependencies=[Depends(idempotency_key_header)])
+
+# VIL table name (the `name` of a dump section) -> router configuration
+CONFIGS_BY_VIL_NAME: Dict[str, RouterConfig] = {config.vil_table_name: config for config in ROUTER_CONFIGS.values()}
+
+
+def _ingest_section(config: RouterConfig, items: List[Dict[str, Any]], policy: str) -> Dict[str, Any]:
+    """
+    Uploads one table section on the calling (worker) thread, with its own session,
+    connection, event loop and transaction log, and returns the table's report.
+    """
+    async def ingest():
+        db = SessionLocal()
+        try:
+            with transaction_logging(table_name=config.table_name, operation="dump") as log_file:
+                start_time = datetime.now(timezone.utc)
+                success_messages, failed_items_list = await spooled_batch(
+                    config, items, db, policy, operation="dump")
+                duration = datetime.now(timezone.utc) - start_time
+
+                transaction_logger.info("PROCESSING SUMMARY")
+                transaction_logger.info(f"Total items: {len(items)}")
+                transaction_logger.info(f"Success: {len(success_messages)}")
+                transaction_logger.info(f"Failed: {len(failed_items_list)}")
+                transaction_logger.info(f"Duration: {duration}")
+
+                return {
+                    "status_code": upload_status_code(len(success_messages), len(failed_items_list)),
+                    "total": len(items),
+                    "success": len(success_messages),
+                    "failed": len(failed_items_list),
+                    "duration_s": round(duration.total_seconds(), 3),
+                    "log_file": log_file,
+                    "failed_items": failed_items_list,
+                }
+        finally:
+            db.close()
+
+    return asyncio.run(ingest())
+
+
+@router.post(
+    "",
+    summary="Upload a multi-table VIL dump",
+    description=("Accepts a whole VIL export in one request: a JSON list of `{name, data}` sections (a raw "
+                 "phpMyAdmin export works as is), or a zip / tar / tar.gz archive of such JSON files. Each "
+                 "section is routed by `name` to its table and inserted exactly like `/<table>/upload`; tables "
+                 "are processed in parallel (up to DUMP_MAX_PARALLEL_TABLES), each with its own database "
+                 "connection. Returns one report per table; only failed items are listed individually. Bodies "
+                 "over DUMP_MAX_BODY_BYTES are refused with 413.")
+)
+async def upload_dump(
+    request: Request,
+    on_duplicate: Optional[Literal["last_wins", "first_wins"]] = Query(
+        None, description="Which copy to keep when a section repeats a unique key (default from settings)")
+):
+    async with spooled_body(request, settings.DUMP_MAX_BODY_BYTES) as body:
+        try:
+            # Parsing a large dump is CPU-bound; keep it off the event loop
+            sections = await asyncio.to_thread(read_dump_sections, body)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Group sections by table; a table split over several sections is processed as one batch
+    items_by_table: Dict[str, List[Dict[str, Any]]] = {}
+    unknown_sections = []
+    for section in sections:
+        name = section["name"]
+        if name not in CONFIGS_BY_VIL_NAME:
+            unknown_sections.append(name)
+            continue
+        if not isinstance(section["data"], list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Section '{name}' has a 'data' value that is not a list.")
+        items_by_table.setdefault(name, []).extend(section["data"])
+
+    items_by_table = {name: items for name, items in items_by_table.items() if items}
+    if not items_by_table:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(f"Dump has no non-empty section for a known table. Unknown sections: {unknown_sections}. "
+                    f"Known: {', '.join(CONFIGS_BY_VIL_NAME)}"))
+
+    policy = on_duplicate or settings.PAYLOAD_DUPLICATE_POLICY
+    limit = asyncio.Semaphore(settings.DUMP_MAX_PARALLEL_TABLES)
+
+    async def run_table(name: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        config = CONFIGS_BY_VIL_NAME[name]
+        async with limit:
+            try:
+                # Each table section takes a slot of its table, like an /upload of it would
+                async with admission.admit(config.table_name):
+                    return await asyncio.to_thread(_ingest_section, config, items, policy)
+            except AdmissionRejected as e:
+                return {
+                    "status_code": status.HTTP_429_TOO_MANY_REQUESTS,
+                    "total": len(items),
+                    "success": 0,
+                    "failed": len(items),
+                    "error": e.reason,
+                    "retry_after": e.retry_after,
+                    "failed_items": [],
+                }
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Dump section '{name}' failed: {e}")
+                return {
+                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    "total": len(items),
+                    "success": 0,
+                    "failed": len(items),
+                    "error": f"Unexpected Server Error: {str(e)}",
+                    "failed_items": [],
+                }
+
+    start_time = datetime.now(timezone.utc)
+    reports = await asyncio.gather(*(run_table(name, items) for name, items in items_by_table.items()))
+    duration = datetime.now(timezone.utc) - start_time
+
+    tables = dict(zip(items_by_table, reports))
+    success_count = sum(report["success"] for report in reports)
+    failure_count = sum(report["failed"] for report in reports)
+
+    content = jsonable_encoder({
+        "message": (f"Dump processed. Tables: {len(tables)}, Success: {success_count}, "
+                    f"Failed: {failure_count}, Duration: {duration}"),
+        "tables": tables,
+        "unknown_sections": unknown_sections,
+    })
+
+    # Sections refused by admission control need the whole dump re-sent later (the tables
+    # that did go through then report their rows as duplicates)
+    rejected = [report for report in reports if report["status_code"] == status.HTTP_429_TOO_MANY_REQUESTS]
+    if rejected:
+        return JSONResponse(status_code=status.HTTP_429_TOO_MANY_REQUESTS, content=content,
+                            headers={"Retry-After": str(max(report["retry_after"] for report in rejected))})
+    return JSONResponse(status_code=upload_status_code(success_count, failure_count), content=content)
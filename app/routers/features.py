@@ -10,7 +10,8 @@ features_config = RouterConfig(
     service=features_service,
     pk_field_name="feature_id",
     entity_name_singular="Feature",
-    entity_name_plural="Features"
+    entity_name_plural="Features",
+    sort_field_name="feature_date"
 )
 
 # 2. Create the router by calling the factory
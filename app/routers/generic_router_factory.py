@@ -1,29 +1,378 @@
+import json
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Awaitable, Callable, Dict, Any, List, Literal, Optional, Tuple
+from uuid import UUID
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Body, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Body, Path, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from pydantic import ValidationError
 
-from database.db_session import get_db
-from app.schemas.common import UploadSuccessResponse
+from database.db_session import get_db, SessionLocal
+from app.schemas.common import UploadSuccessResponse, PageResponse
+from app.core.config import settings
 from app.core.logging_config import transaction_logging
+from app.core.idempotency import IdempotentRoute, idempotency_key_header
+from app.core.admission import admission_for
+from app.core.spool import spool
+from app.core.upload_sessions import UploadTooLarge, upload_sessions
 from app.routers.router_config import RouterConfig
 
 transaction_logger = logging.getLogger("transaction_logger")
 
+DUPLICATE_ERROR_MESSAGE = "Duplicate Error: This record already exists (universal_id or unique constraint violation)."
+DELETED_ERROR_MESSAGE = "Deleted Error: This record was deleted and its universal_id cannot be reused until it is purged."
+DRY_RUN_DESCRIPTION = ("Only report what would be created, updated, left unchanged or rejected, "
+                       "without writing anything")
+
+def upload_status_code(success_count: int, failure_count: int) -> int:
+    """
+    201 when every item was created, 207 for a partial success, 422 when nothing was.
+    """
+    if success_count > 0 and failure_count == 0:
+        return status.HTTP_201_CREATED
+    elif success_count > 0 and failure_count > 0:
+        return status.HTTP_207_MULTI_STATUS
+    else:
+        return status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+async def process_upload_batch(config: RouterConfig, items_to_process: List[Dict[str, Any]], db: Session,
+                               policy: str, start_index: int = 0,
+                               on_item_done: Optional[Callable[[int], None]] = None
+                               ) -> Tuple[List[str], List[Dict[str, str]]]:
+    """
+    Inserts the items of one VIL table section (the body of /upload, shared with /dump)
+    and returns (success messages, failed items). Each item is committed on its own,
+    so one bad item never affects the others. Logs to the transaction log in scope.
+
+    Items before `start_index` were handled by an earlier, interrupted run: they are
+    skipped (but still count for duplicates within the payload). `on_item_done` is
+    called with the index of every item once it is committed or reported as failed.
+    """
+    # 1. Validation Pass (all items first, so the batch can be screened for duplicates at once)
+    success_messages = []
+    failed_items_list = []
+
+    validated_items = {}
+    validation_errors = {}
+    for index, item_dict in enumerate(items_to_process):
+        try:
+            validated_items[index] = config.pydantic_schema(**item_dict)
+        except ValidationError as e:
+            error_msgs = [f"Field '{err['loc'][-1]}': {err['msg']}" for err in e.errors()]
+            validation_errors[index] = f"Schema Validation Error: {'; '.join(error_msgs)}"
+
+    # 2. Duplicates Within the Payload (collapsed by policy, before any file I/O)
+    payload_duplicates = config.service.find_payload_duplicates(
+        validated_items, config.service.unique_field_groups(config.pydantic_schema), policy)
+
+    # Partitions of the batch's years, created before the pre-screen reads the table
+    config.service.ensure_partitions(
+        db, [item for index, item in validated_items.items() if index >= start_index], datetime.now(timezone.utc))
+
+    # 3. Duplicate Pre-screen against stored records (in-memory filter + one batched query)
+    try:
+        existing_ids = config.service.find_existing_ids(
+            db, [item.universal_id for index, item in validated_items.items()
+                 if index >= start_index and index not in payload_duplicates])
+        # Re-sent ids of tombstoned records: only the (usually few) stored ids are checked
+        deleted_ids = config.service.find_deleted_ids(db, list(existing_ids))
+    except SQLAlchemyError as e:
+        # Not fatal: the unique constraint still catches duplicates on insert
+        db.rollback()
+        transaction_logger.warning(f"Duplicate pre-screen failed, relying on insert constraints: {e}")
+        existing_ids = set()
+        deleted_ids = set()
+
+    # 4. Processing Logic
+    for index, item_dict in enumerate(items_to_process):
+        if index < start_index:
+            continue
+        # Every item before this one has been committed or reported as failed
+        if on_item_done is not None and index > start_index:
+            on_item_done(index - 1)
+
+        item_identifier = item_dict.get('universal_id', f'index_{index}')
+
+        if index in validation_errors or index in payload_duplicates:
+            clean_msg = validation_errors.get(index) or payload_duplicates[index]
+
+            transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
+            failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+            continue
+
+        validated_data = validated_items[index]
+
+        if validated_data.universal_id in existing_ids:
+            clean_msg = DELETED_ERROR_MESSAGE if validated_data.universal_id in deleted_ids else DUPLICATE_ERROR_MESSAGE
+
+            transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
+            failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+            continue
+
+        try:
+            request_timestamp = datetime.now(timezone.utc)
+
+            # A. Creation (Insert + File Write)
+            new_db_item = await config.service.process_and_create_item(
+                db=db,
+                item=validated_data,
+                ingestion_time=request_timestamp
+            )
+
+            # B. Success Handling
+            message = f"CREATED: universal_id={new_db_item.universal_id}"
+            success_messages.append(message)
+
+            pk_value = getattr(new_db_item, config.pk_field_name, "N/A")
+            transaction_logger.info(f"SUCCESS: {config.entity_name_singular} '{item_identifier}' ingested. DB ID: {pk_value}")
+
+        except IntegrityError as e:
+            # Rows inserted concurrently after the pre-screen, or other unique constraints
+            clean_msg = DUPLICATE_ERROR_MESSAGE
+
+            transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
+            failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+
+        except (IOError, OSError) as e:
+            clean_msg = f"File System Error: Unable to write JSON file. {e.strerror}"
+
+            transaction_logger.critical(f"Item {item_identifier}: {clean_msg}")
+            failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+
+        except SQLAlchemyError as e:
+            clean_msg = f"Database Error: {str(e.__cause__) or str(e)}"
+
+            transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
+            failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+
+        except Exception as e:
+            clean_msg = f"Unexpected Server Error: {str(e)}"
+
+            transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
+            failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+
+    if on_item_done is not None and len(items_to_process) > start_index:
+        on_item_done(len(items_to_process) - 1)
+
+    return success_messages, failed_items_list
+
+
+async def process_update_batch(config: RouterConfig, items_to_process: List[Dict[str, Any]], db: Session,
+                               policy: str, start_index: int = 0,
+                               on_item_done: Optional[Callable[[int], None]] = None
+                               ) -> Tuple[List[str], List[Dict[str, str]]]:
+    """
+    Updates the stored items of one VIL table section and creates the others (the
+    body of /update), returning (success messages, failed items). Each item is
+    committed on its own. `start_index` and `on_item_done` are as for
+    `process_upload_batch`.
+    """
+    # 1. Validation Pass and Duplicates Within the Payload (collapsed by policy)
+    success_messages = []
+    failed_items_list = []
+
+    validated_items = {}
+    validation_errors = {}
+    for index, item_dict in enumerate(items_to_process):
+        try:
+            validated_items[index] = config.pydantic_schema(**item_dict)
+        except ValidationError as e:
+            error_msgs = [f"Field '{err['loc'][-1]}': {err['msg']}" for err in e.errors()]
+            validation_errors[index] = f"Schema Validation Error: {'; '.join(error_msgs)}"
+
+    payload_duplicates = config.service.find_payload_duplicates(
+        validated_items, config.service.unique_field_groups(config.pydantic_schema), policy)
+
+    config.service.ensure_partitions(
+        db, [item for index, item in validated_items.items() if index >= start_index], datetime.now(timezone.utc))
+
+    # 2. Processing
+    for index, item_dict in enumerate(items_to_process):
+        if index < start_index:
+            continue
+        # Every item before this one has been committed or reported as failed
+        if on_item_done is not None and index > start_index:
+            on_item_done(index - 1)
+
+        item_identifier = item_dict.get('universal_id', f'unknown_{config.entity_name_singular}_at_index_{index}')
+
+        if index in validation_errors or index in payload_duplicates:
+            clean_msg = validation_errors.get(index) or payload_duplicates[index]
+
+            transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
+            failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+            continue
+
+        validated_data = validated_items[index]
+
+        try:
+            request_timestamp = datetime.now(timezone.utc)
+
+            db_item = await config.service.process_update_item(db=db,
+                                                               item=validated_data,
+                                                               ingestion_time=request_timestamp)
+            action_type = "UPDATED"
+            if not db_item:
+                db_item = await config.service.process_and_create_item(db=db,
+                                                                       item=validated_data,
+                                                                       ingestion_time=request_timestamp)
+                action_type = "CREATED"
+
+            # --- SUCCESS HANDLING (Common for both) ---
+            success_messages.append(f"{action_type}: universal_id={db_item.universal_id}")
+
+        except IntegrityError as e:
+            clean_msg = "Database Constraint Error: This record likely already exists or violates a unique constraint."
+
+            transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
+            failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+
+        except (IOError, OSError) as e:
+            clean_msg = f"File System Error: Unable to write JSON file to storage. {e.strerror}"
+
+            transaction_logger.critical(f"Item {item_identifier}: {clean_msg}")
+            failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+
+        except SQLAlchemyError as e:
+            clean_msg = f"Database Error: {str(e.__cause__) or str(e)}"
+
+            transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
+            failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+
+        except Exception as e:
+            clean_msg = f"Unexpected Server Error: {str(e)}"
+
+            transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
+            failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+
+    if on_item_done is not None and len(items_to_process) > start_index:
+        on_item_done(len(items_to_process) - 1)
+
+    return success_messages, failed_items_list
+
+
+def batch_processor(operation: str) -> Callable[..., Awaitable[Tuple[List[str], List[Dict[str, str]]]]]:
+    """
+    What processes a batch of the spool `operation`: /update's batches update,
+    /upload's and /dump's insert.
+    """
+    return process_update_batch if operation == "update" else process_upload_batch
+
+
+async def spooled_batch(config: RouterConfig, items_to_process: List[Dict[str, Any]], db: Session,
+                        policy: str, operation: str) -> Tuple[List[str], List[Dict[str, str]]]:
+    """
+    The batch processor of `operation` (see `batch_processor`), with the items written
+    to the spool first and the spool checkpointed after every item, so a batch cut
+    short by a restart is finished on the next startup instead of being lost (see
+    app.routers.spool_recovery).
+    """
+    process = batch_processor(operation)
+    if not settings.SPOOL_ENABLED:
+        return await process(config, items_to_process, db, policy)
+
+    try:
+        job = await asyncio.to_thread(
+            spool.create, table_name=config.table_name, operation=operation, policy=policy, items=items_to_process)
+    except OSError as e:
+        transaction_logger.critical(f"FAILURE: Could not spool the payload: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Could not spool the payload before processing: {e.strerror or e}")
+
+    try:
+        result = await process(config, items_to_process, db, policy, on_item_done=job.checkpoint)
+    except Exception:
+        # Not an interruption: resuming the batch would most likely fail the same way
+        job.discard()
+        raise
+    # Cancelled (e.g. shutdown) batches skip this and stay spooled
+    job.discard()
+    return result
+
+
+def plan_upload_batch(config: RouterConfig, items_to_process: List[Dict[str, Any]], db: Session,
+                      policy: str, upsert: bool) -> Dict[str, Any]:
+    """
+    The dry run of /upload (upsert=False) or /update (upsert=True): validates every
+    item, collapses payload duplicates and matches the rest against the stored rows
+    with one batched query, then reports what would be created, updated, left
+    unchanged or rejected. Nothing is written and the session is rolled back.
+    """
+    validated_items = {}
+    failed_items_list = []
+    for index, item_dict in enumerate(items_to_process):
+        try:
+            validated_items[index] = config.pydantic_schema(**item_dict)
+        except ValidationError as e:
+            error_msgs = [f"Field '{err['loc'][-1]}': {err['msg']}" for err in e.errors()]
+            failed_items_list.append({"universal_id": str(item_dict.get('universal_id', f'index_{index}')),
+                                      "reason": f"Schema Validation Error: {'; '.join(error_msgs)}"})
+
+    payload_duplicates = config.service.find_payload_duplicates(
+        validated_items, config.service.unique_field_groups(config.pydantic_schema), policy)
+    for index, reason in payload_duplicates.items():
+        failed_items_list.append({"universal_id": str(validated_items[index].universal_id), "reason": reason})
+
+    try:
+        plan = config.service.plan_items(
+            db, {index: item for index, item in validated_items.items() if index not in payload_duplicates},
+            upsert=upsert)
+    finally:
+        db.rollback()
+
+    planned = {"create": [], "update": [], "unchanged": []}
+    for index in sorted(plan):
+        outcome = plan[index]
+        universal_id = str(validated_items[index].universal_id)
+        if outcome in planned:
+            planned[outcome].append(universal_id)
+        else:
+            reason = DELETED_ERROR_MESSAGE if outcome == "deleted" else DUPLICATE_ERROR_MESSAGE
+            failed_items_list.append({"universal_id": universal_id, "reason": reason})
+
+    return {
+        "message": (f"Dry run: would create {len(planned['create'])}, update {len(planned['update'])}, "
+                    f"leave {len(planned['unchanged'])} unchanged, fail {len(failed_items_list)}."),
+        "dry_run": True,
+        "counts": {
+            "would_create": len(planned["create"]),
+            "would_update": len(planned["update"]),
+            "unchanged": len(planned["unchanged"]),
+            "would_fail": len(failed_items_list),
+        },
+        "would_create": planned["create"],
+        "would_update": planned["update"],
+        "unchanged": planned["unchanged"],
+        "would_fail": failed_items_list,
+    }
+
+
 def create_router(config: RouterConfig) -> APIRouter:
     """
     A factory function that creates and configures an APIRouter for a specific data type.
-    It now creates TWO endpoints: /upload (Upsert) and /update (Update-Only).
+    It creates the write endpoints /upload (Upsert), /update (Update-Only) and /delete,
+    the resumable chunked upload endpoints under /uploads,
+    plus the read endpoints GET "" (keyset-paginated listing), GET /search (full-text),
+    GET /lookup (identifier lookup, for tables with lookup keys), GET /export (streamed dump)
+    and GET /{universal_id}.
     """
     router = APIRouter()
 
-    @router.post(
+    # The write endpoints accept an Idempotency-Key header, so an exporter's retry is
+    # answered with the first response instead of processing the payload again, and
+    # pass admission control: a batch waits for (or is refused with 429) a slot of its table
+    write_router = APIRouter(
+        route_class=IdempotentRoute,
+        dependencies=[Depends(idempotency_key_header), Depends(admission_for(config.table_name))])
+
+    @write_router.post(
         "/upload",
         response_model=UploadSuccessResponse,
         summary=f"Endpoint to upload and upsert {config.entity_name_plural.title()}",
@@ -31,8 +380,17 @@ def create_router(config: RouterConfig) -> APIRouter:
     )
     async def upload_from_export(
         payload: Dict[str, Any] = Body(...),
+        on_duplicate: Optional[Literal["last_wins", "first_wins"]] = Query(
+            None, description="Which copy to keep when the payload repeats a unique key (default from settings)"),
+        dry_run: bool = Query(False, description=DRY_RUN_DESCRIPTION),
         db: Session = Depends(get_db)
     ):
+        return await ingest_upload(payload, on_duplicate or settings.PAYLOAD_DUPLICATE_POLICY, db, dry_run=dry_run)
+
+    async def ingest_upload(payload: Dict[str, Any], policy: str, db: Session, dry_run: bool = False) -> JSONResponse:
+        """
+        The body of /upload, shared with the finalize step of chunked uploads.
+        """
         with transaction_logging(table_name=config.table_name, operation="upload") as log_file:
             start_time = datetime.now(timezone.utc)
 
@@ -56,71 +414,16 @@ def create_router(config: RouterConfig) -> APIRouter:
                         "processed_items": [], 
                         "failed_items": []})
 
-            # 2. Processing Logic
-            success_messages = []
-            failed_items_list = []
-            success_count = 0
-            failure_count = 0
-
-            for index, item_dict in enumerate(items_to_process):
-                item_identifier = item_dict.get('universal_id', f'index_{index}')
-                
-                try:
-                    request_timestamp = datetime.now(timezone.utc)
-                    
-                    # A. Validation
-                    validated_data = config.pydantic_schema(**item_dict)
-                    
-                    # B. Creation (Insert + File Write)
-                    new_db_item = await config.service.process_and_create_item(
-                        db=db,
-                        item=validated_data,
-                        ingestion_time=request_timestamp
-                    )
-                    
-                    # C. Success Handling
-                    message = f"CREATED: universal_id={new_db_item.universal_id}"
-                    success_messages.append(message)
-                    
-                    pk_value = getattr(new_db_item, config.pk_field_name, "N/A")
-                    transaction_logger.info(f"SUCCESS: {config.entity_name_singular} '{item_identifier}' ingested. DB ID: {pk_value}")
-                    success_count += 1
-
-                except ValidationError as e:
-                    error_msgs = [f"Field '{err['loc'][-1]}': {err['msg']}" for err in e.errors()]
-                    clean_msg = f"Schema Validation Error: {'; '.join(error_msgs)}"
-                    
-                    failure_count += 1
-                    transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
-                    failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
-
-                except IntegrityError as e:
-                    clean_msg = "Duplicate Error: This record already exists (universal_id or unique constraint violation)."
-                    
-                    failure_count += 1
-                    transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
-                    failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
-
-                except (IOError, OSError) as e:
-                    clean_msg = f"File System Error: Unable to write JSON file. {e.strerror}"
-                    
-                    failure_count += 1
-                    transaction_logger.critical(f"Item {item_identifier}: {clean_msg}")
-                    failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
-
-                except SQLAlchemyError as e:
-                    clean_msg = f"Database Error: {str(e.__cause__) or str(e)}"
-                    
-                    failure_count += 1
-                    transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
-                    failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+            if dry_run:
+                content = plan_upload_batch(config, items_to_process, db, policy, upsert=False)
+                transaction_logger.info(f"DRY RUN: {content['message']}")
+                return JSONResponse(status_code=status.HTTP_200_OK, content=content)
 
-                except Exception as e:
-                    clean_msg = f"Unexpected Server Error: {str(e)}"
-                    
-                    failure_count += 1
-                    transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
-                    failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+            # 2. Processing Logic
+            success_messages, failed_items_list = await spooled_batch(
+                config, items_to_process, db, policy, operation="upload")
+            success_count = len(success_messages)
+            failure_count = len(failed_items_list)
 
             # 3. Log Summary
             end_time = datetime.now(timezone.utc)
@@ -139,18 +442,10 @@ def create_router(config: RouterConfig) -> APIRouter:
             }
 
             content = jsonable_encoder(response_payload)
-
-            if success_count > 0 and failure_count == 0:
-                return JSONResponse(status_code=status.HTTP_201_CREATED, content=content)
-            
-            elif success_count > 0 and failure_count > 0:
-                return JSONResponse(status_code=status.HTTP_207_MULTI_STATUS, content=content)
-            
-            else:
-                return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=content)
+            return JSONResponse(status_code=upload_status_code(success_count, failure_count), content=content)
 
 
-    @router.post(
+    @write_router.post(
         "/update",
         response_model=UploadSuccessResponse,
         summary=f"Endpoint to update existing {config.entity_name_plural.title()}",
@@ -158,6 +453,9 @@ def create_router(config: RouterConfig) -> APIRouter:
     )
     async def update_from_export(
         payload: Dict[str, Any] = Body(...),
+        on_duplicate: Optional[Literal["last_wins", "first_wins"]] = Query(
+            None, description="Which copy to keep when the payload repeats a unique key (default from settings)"),
+        dry_run: bool = Query(False, description=DRY_RUN_DESCRIPTION),
         db: Session = Depends(get_db)
     ):
 
@@ -184,68 +482,17 @@ def create_router(config: RouterConfig) -> APIRouter:
                         "processed_items": [], 
                         "failed_items": []})
 
-            # 2. Processing
-            success_messages = []
-            failed_items_list = []
-            success_count = 0
-            failure_count = 0
-
-            for index, item_dict in enumerate(items_to_process):
-                item_identifier = item_dict.get('universal_id', f'unknown_{config.entity_name_singular}_at_index_{index}')
-                
-                try:
-                    request_timestamp = datetime.now(timezone.utc)
-                    validated_data = config.pydantic_schema(**item_dict)
-
-                    db_item = await config.service.process_update_item(db=db, 
-                                                                       item=validated_data, 
-                                                                       ingestion_time=request_timestamp) 
-                    action_type = "UPDATED"
-                    if not db_item:
-                         db_item = await config.service.process_and_create_item(db=db, 
-                                                                                item=validated_data, 
-                                                                                ingestion_time=request_timestamp)
-                         action_type = "CREATED"
-                    
-                    # --- SUCCESS HANDLING (Common for both) ---
-                    success_messages.append(f"{action_type}: universal_id={db_item.universal_id}")
-                    success_count += 1
-                        
-                except ValidationError as e:
-                    error_msgs = [f"Field '{err['loc'][-1]}': {err['msg']}" for err in e.errors()]
-                    clean_msg = f"Schema Validation Error: {'; '.join(error_msgs)}"
-                    
-                    failure_count += 1
-                    transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
-                    failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
-
-                except IntegrityError as e:
-                    clean_msg = "Database Constraint Error: This record likely already exists or violates a unique constraint."
-                    
-                    failure_count += 1
-                    transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
-                    failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
-
-                except (IOError, OSError) as e:
-                    clean_msg = f"File System Error: Unable to write JSON file to storage. {e.strerror}"
-                    
-                    failure_count += 1
-                    transaction_logger.critical(f"Item {item_identifier}: {clean_msg}")
-                    failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+            if dry_run:
+                content = plan_upload_batch(
+                    config, items_to_process, db, on_duplicate or settings.PAYLOAD_DUPLICATE_POLICY, upsert=True)
+                transaction_logger.info(f"DRY RUN: {content['message']}")
+                return JSONResponse(status_code=status.HTTP_200_OK, content=content)
 
-                except SQLAlchemyError as e:
-                    clean_msg = f"Database Error: {str(e.__cause__) or str(e)}"
-                    
-                    failure_count += 1
-                    transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
-                    failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
-
-                except Exception as e:
-                    clean_msg = f"Unexpected Server Error: {str(e)}"
-                    
-                    failure_count += 1
-                    transaction_logger.error(f"Item {item_identifier}: {clean_msg}")
-                    failed_items_list.append({"universal_id": str(item_identifier), "reason": clean_msg})
+            # 2. Validation, Duplicates Within the Payload and Processing (spooled like /upload)
+            success_messages, failed_items_list = await spooled_batch(
+                config, items_to_process, db, on_duplicate or settings.PAYLOAD_DUPLICATE_POLICY, operation="update")
+            success_count = len(success_messages)
+            failure_count = len(failed_items_list)
 
             # 3. Log Summary
             end_time = datetime.now(timezone.utc)
@@ -270,7 +517,7 @@ def create_router(config: RouterConfig) -> APIRouter:
                 return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=content)
 
 
-    @router.post(
+    @write_router.post(
         "/delete",
         response_model=UploadSuccessResponse,
         summary=f"Endpoint to delete {config.entity_name_plural.title()}",
@@ -309,26 +556,65 @@ def create_router(config: RouterConfig) -> APIRouter:
             success_count = 0
             failure_count = 0
 
-            for uid in ids_to_delete:
+            if settings.DELETE_MODE == "tombstone":
+                # One UPDATE for the whole list instead of a lookup, delete and commit per id
+                parsed_ids = []
+                for uid in ids_to_delete:
+                    try:
+                        parsed_ids.append((uid, UUID(str(uid))))
+                    except ValueError:
+                        failure_count += 1
+                        clean_msg = "Invalid universal_id."
+                        transaction_logger.warning(f"SKIPPED: {uid} - {clean_msg}")
+                        failed_items_list.append({"universal_id": str(uid), "reason": clean_msg})
+
                 try:
-                    deleted_item = await config.service.process_delete_item(db=db, universal_id=uid)
-                    
-                    if deleted_item:
+                    marked_ids = set(config.service.process_delete_batch(
+                        db, list(dict.fromkeys(universal_id for uid, universal_id in parsed_ids))))
+                    batch_error = None
+                except Exception as e:
+                    marked_ids = set()
+                    batch_error = f"Database/Server Error: {str(e)}"
+
+                for uid, universal_id in parsed_ids:
+                    if universal_id in marked_ids:
+                        # A repeated id is reported as not found, as in hard mode
+                        marked_ids.discard(universal_id)
                         success_count += 1
                         msg = f"DELETED: {uid}"
                         success_messages.append(msg)
                         transaction_logger.info(f"SUCCESS: {msg}")
+                    elif batch_error:
+                        failure_count += 1
+                        transaction_logger.error(f"FAILURE: {uid} - {batch_error}")
+                        failed_items_list.append({"universal_id": str(uid), "reason": batch_error})
                     else:
                         failure_count += 1
                         clean_msg = "Record not found in database."
                         transaction_logger.warning(f"SKIPPED: {uid} - {clean_msg}")
                         failed_items_list.append({"universal_id": str(uid), "reason": clean_msg})
 
-                except Exception as e:
-                    failure_count += 1
-                    clean_msg = f"Database/Server Error: {str(e)}"
-                    transaction_logger.error(f"FAILURE: {uid} - {clean_msg}")
-                    failed_items_list.append({"universal_id": str(uid), "reason": clean_msg})
+            else:
+                for uid in ids_to_delete:
+                    try:
+                        deleted_item = await config.service.process_delete_item(db=db, universal_id=uid)
+                    
+                        if deleted_item:
+                            success_count += 1
+                            msg = f"DELETED: {uid}"
+                            success_messages.append(msg)
+                            transaction_logger.info(f"SUCCESS: {msg}")
+                        else:
+                            failure_count += 1
+                            clean_msg = "Record not found in database."
+                            transaction_logger.warning(f"SKIPPED: {uid} - {clean_msg}")
+                            failed_items_list.append({"universal_id": str(uid), "reason": clean_msg})
+
+                    except Exception as e:
+                        failure_count += 1
+                        clean_msg = f"Database/Server Error: {str(e)}"
+                        transaction_logger.error(f"FAILURE: {uid} - {clean_msg}")
+                        failed_items_list.append({"universal_id": str(uid), "reason": clean_msg})
 
             # 3. Log Summary & Response
             end_time = datetime.now(timezone.utc)
@@ -357,4 +643,302 @@ def create_router(config: RouterConfig) -> APIRouter:
             else:
                 return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=content)
 
+    @router.post(
+        "/uploads",
+        status_code=status.HTTP_201_CREATED,
+        summary=f"Start a resumable upload of {config.entity_name_plural.title()}",
+        description=(f"Opens an upload session for a payload too large to send reliably in one request. PUT the "
+                     f"bytes of the /upload payload as numbered chunks (0, 1, ...) to "
+                     f"/uploads/{{upload_id}}/chunks/{{number}}, check which arrived with GET "
+                     f"/uploads/{{upload_id}}, then POST /uploads/{{upload_id}}/finalize. `total_chunks`, when "
+                     f"given, lets the status list the chunks still missing.")
+    )
+    def create_upload_session(
+        total_chunks: Optional[int] = Query(None, ge=1, description="Number of chunks the payload is split into")
+    ):
+        return JSONResponse(status_code=status.HTTP_201_CREATED,
+                            content=upload_sessions.create(config.table_name, total_chunks))
+
+    @router.put(
+        "/uploads/{upload_id}/chunks/{number}",
+        summary="Upload one chunk",
+        description=("Stores the request body as chunk `number` of the session. Chunks may arrive in any order; "
+                     "re-sending a chunk (e.g. after a dropped connection) replaces it.")
+    )
+    async def put_upload_chunk(
+        request: Request,
+        upload_id: UUID,
+        number: int = Path(..., ge=0, le=99_999)
+    ):
+        try:
+            size = await upload_sessions.put_chunk(upload_id, config.table_name, number, request.stream())
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        if size is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Upload session '{upload_id}' not found.")
+        return {"upload_id": str(upload_id), "chunk": number, "bytes": size}
+
+    @router.get(
+        "/uploads/{upload_id}",
+        summary="Status of a resumable upload",
+        description="Lists the chunks received so far and, when the number of chunks is known, the missing ones."
+    )
+    def get_upload_session(upload_id: UUID):
+        state = upload_sessions.status(upload_id, config.table_name)
+        if state is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Upload session '{upload_id}' not found.")
+        return state
+
+    @router.delete(
+        "/uploads/{upload_id}",
+        status_code=status.HTTP_204_NO_CONTENT,
+        summary="Abandon a resumable upload"
+    )
+    def delete_upload_session(upload_id: UUID):
+        if not upload_sessions.delete(upload_id, config.table_name):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Upload session '{upload_id}' not found.")
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    @write_router.post(
+        "/uploads/{upload_id}/finalize",
+        response_model=UploadSuccessResponse,
+        summary=f"Finish a resumable upload of {config.entity_name_plural.title()}",
+        description=("Joins the chunks in order and processes the result exactly like a POST to /upload, with "
+                     "the same response. Answers 409 while chunks are missing. The session is closed once the "
+                     "payload was processed; if it could not be (e.g. invalid JSON), it stays open.")
+    )
+    async def finalize_upload(
+        upload_id: UUID,
+        on_duplicate: Optional[Literal["last_wins", "first_wins"]] = Query(
+            None, description="Which copy to keep when the payload repeats a unique key (default from settings)"),
+        db: Session = Depends(get_db)
+    ):
+        try:
+            data = await asyncio.to_thread(upload_sessions.begin_finalize, upload_id, config.table_name)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        if data is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Upload session '{upload_id}' not found (or already being finalized).")
+
+        succeeded = False
+        try:
+            try:
+                payload = await asyncio.to_thread(json.loads, data)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                    detail=f"The assembled upload is not valid JSON: {e}")
+            if not isinstance(payload, dict):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                    detail="The assembled upload must be a JSON object, like the /upload body.")
+
+            response = await ingest_upload(payload, on_duplicate or settings.PAYLOAD_DUPLICATE_POLICY, db)
+            succeeded = True
+            return response
+        finally:
+            upload_sessions.end_finalize(upload_id, succeeded)
+
+    router.include_router(write_router)
+
+
+    @router.get(
+        "",
+        response_model=PageResponse,
+        summary=f"List {config.entity_name_plural.title()}",
+        description=(f"Returns {config.entity_name_plural} ordered by ({config.sort_field_name}, {config.pk_field_name}) "
+                     f"using keyset pagination. Pass the returned `next_cursor` as `cursor` to get the next page. "
+                     f"Large text columns ({', '.join(config.service.large_columns)}) are only returned when listed in `fields`.")
+    )
+    def list_items(
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned by the previous page"),
+        limit: int = Query(100, ge=1, le=1000),
+        fields: Optional[str] = Query(None, description="Comma-separated column names to return"),
+        db: Session = Depends(get_db)
+    ):
+        try:
+            items, next_cursor = config.service.get_page(
+                db=db,
+                sort_field=config.sort_field_name,
+                cursor=cursor,
+                limit=limit,
+                fields=fields)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        return JSONResponse(content=jsonable_encoder({"items": items, "next_cursor": next_cursor}))
+
+
+    @router.get(
+        "/search",
+        response_model=PageResponse,
+        summary=f"Full-text search over {config.entity_name_plural.title()}",
+        description=(f"Searches the {config.entity_name_plural} text (web search syntax: \"phrases\", OR, -word), "
+                     f"ranked by relevance and paginated with `cursor`. `date_from`/`date_to` filter on "
+                     f"{config.sort_field_name}.")
+    )
+    def search_items(
+        q: str = Query(..., min_length=1, description="Search text"),
+        date_from: Optional[datetime] = Query(None, description=f"Inclusive lower bound on {config.sort_field_name}"),
+        date_to: Optional[datetime] = Query(None, description=f"Exclusive upper bound on {config.sort_field_name}"),
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned by the previous page"),
+        limit: int = Query(20, ge=1, le=200),
+        fields: Optional[str] = Query(None, description="Comma-separated column names to return"),
+        db: Session = Depends(get_db)
+    ):
+        try:
+            items, next_cursor = config.service.search(
+                db=db,
+                query_text=q,
+                sort_field=config.sort_field_name,
+                date_from=date_from,
+                date_to=date_to,
+                cursor=cursor,
+                limit=limit,
+                fields=fields)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        return JSONResponse(content=jsonable_encoder({"items": items, "next_cursor": next_cursor}))
+
+
+    if config.service.lookup_fields:
+
+        @router.get(
+            "/lookup",
+            summary=f"Look up {config.entity_name_plural.title()} by identifier",
+            description=(f"Finds {config.entity_name_plural} by a partial or badly formatted "
+                         f"{' / '.join(config.service.lookup_fields)} (e.g. \"Circ No 12/2019\"). "
+                         f"`mode=auto` tries exact, prefix and then fuzzy (trigram) matching.")
+        )
+        def lookup_items(
+            q: str = Query(..., min_length=1, description="Identifier text as the user typed it"),
+            field: Optional[str] = Query(None, description=f"One of: {', '.join(config.service.lookup_fields)} (default: all)"),
+            mode: str = Query("auto", description="auto, exact, prefix or fuzzy"),
+            limit: int = Query(10, ge=1, le=100),
+            fields: Optional[str] = Query(None, description="Comma-separated column names to return"),
+            db: Session = Depends(get_db)
+        ):
+            try:
+                items, matched_mode = config.service.lookup(
+                    db=db,
+                    query_text=q,
+                    field=field,
+                    mode=mode,
+                    limit=limit,
+                    fields=fields)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+            return JSONResponse(content=jsonable_encoder({"mode": matched_mode, "items": items}))
+
+    if config.service.facets:
+        @router.get(
+            "/stats",
+            summary=f"{config.entity_name_singular} counts by facet",
+            description=(f"Counts of {config.entity_name_plural} per value of each facet "
+                         f"({', '.join(facet.name for facet in config.service.facets)}), read from counters the "
+                         f"ingestion endpoints keep up to date, so the cost does not grow with the table. "
+                         f"Values are listed most frequent first (months latest first); `null` counts the "
+                         f"{config.entity_name_plural} without a value.")
+        )
+        def get_stats(
+            facets: Optional[str] = Query(None, description="Comma-separated facet names (default: all)"),
+            limit: int = Query(50, ge=1, le=1000, description="Most values returned per facet"),
+            db: Session = Depends(get_db)
+        ):
+            try:
+                stats = config.service.get_stats(db=db, facets=facets, limit=limit)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+            return JSONResponse(content=jsonable_encoder(stats))
+
+    if config.service.hierarchy is not None:
+        @router.get(
+            "/hierarchy",
+            summary=f"{config.entity_name_singular} product hierarchy",
+            description=(f"The prod_id > sub_prod_id > sub_subprod_id tree of the {config.entity_name_plural}, with "
+                         f"names and record counts per node. Served from a cache that every upload, update and "
+                         f"delete invalidates; `null` ids group the {config.entity_name_plural} without one.")
+        )
+        def get_hierarchy(db: Session = Depends(get_db)):
+            return JSONResponse(content=jsonable_encoder(config.service.get_hierarchy(db=db)))
+
+
+    @router.get(
+        "/export",
+        summary=f"Stream all {config.entity_name_plural.title()}",
+        description=(f"Streams every {config.entity_name_singular} from a server-side cursor, so memory use stays "
+                     f"constant however large the table is. `format=ndjson` returns one row per line (all columns "
+                     f"unless `fields` is given); `format=vil` returns a VIL envelope that can be POSTed back to "
+                     f"/upload. `date_*` bounds on {config.sort_field_name} select a period; `updated_*`/`ingested_*` "
+                     f"bounds allow incremental exports (all inclusive from, exclusive to).")
+    )
+    def export_items(
+        output_format: Literal["ndjson", "vil"] = Query("ndjson", alias="format"),
+        date_from: Optional[datetime] = Query(None, description=f"Inclusive lower bound on {config.sort_field_name}"),
+        date_to: Optional[datetime] = Query(None, description=f"Exclusive upper bound on {config.sort_field_name}"),
+        updated_from: Optional[datetime] = Query(None),
+        updated_to: Optional[datetime] = Query(None),
+        ingested_from: Optional[datetime] = Query(None),
+        ingested_to: Optional[datetime] = Query(None),
+        fields: Optional[str] = Query(None, description="Comma-separated column names (ndjson only)")
+    ):
+        try:
+            columns = config.service.resolve_columns(fields, include_large=True)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        ranges = {
+            config.sort_field_name: (date_from, date_to),
+            "updated_dt": (updated_from, updated_to),
+            "ingestion_dt": (ingested_from, ingested_to),
+        }
+
+        def stream():
+            # The response outlives the request's dependencies, so the stream owns its session
+            db = SessionLocal()
+            try:
+                if output_format == "vil":
+                    yield from config.service.export_vil(
+                        db, vil_table_name=config.vil_table_name, schema=config.pydantic_schema, ranges=ranges)
+                else:
+                    yield from config.service.export_ndjson(db, columns=columns, ranges=ranges)
+            finally:
+                db.close()
+
+        media_type = "application/json" if output_format == "vil" else "application/x-ndjson"
+        filename = f"{config.table_name}.{'json' if output_format == 'vil' else 'ndjson'}"
+        return StreamingResponse(
+            stream(),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+    @router.get(
+        "/{universal_id:uuid}",
+        summary=f"Get a single {config.entity_name_singular}",
+        description=f"Returns one {config.entity_name_singular} by universal_id. All columns unless `fields` is given."
+    )
+    def get_item(
+        universal_id: UUID,
+        fields: Optional[str] = Query(None, description="Comma-separated column names to return"),
+        db: Session = Depends(get_db)
+    ):
+        try:
+            item = config.service.get_item(db=db, universal_id=universal_id, fields=fields)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        if item is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{config.entity_name_singular} '{universal_id}' not found.")
+
+        return JSONResponse(content=jsonable_encoder(item))
+
     return router
@@ -0,0 +1,28 @@
+from typing import Dict
+
+from app.routers.router_config import RouterConfig
+from app.routers.article import article_config
+from app.routers.budgets_union import budgets_union_config
+from app.routers.ce import ce_config
+from app.routers.cgst import cgst_config
+from app.routers.cu import cu_config
+from app.routers.dgft import dgft_config
+from app.routers.features import features_config
+from app.routers.sgst import sgst_config
+from app.routers.st import st_config
+from app.routers.vat import vat_config
+
+# Every table router's configuration, keyed by the URL prefix it is mounted under in main.py.
+# Used by the cross-table endpoints (e.g. /search) to reach each table's service.
+ROUTER_CONFIGS: Dict[str, RouterConfig] = {
+    "articles": article_config,
+    "budgets_union": budgets_union_config,
+    "ce": ce_config,
+    "cgst": cgst_config,
+    "cu": cu_config,
+    "dgft": dgft_config,
+    "features": features_config,
+    "sgst": sgst_config,
+    "st": st_config,
+    "vat": vat_config,
+}
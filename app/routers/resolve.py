@@ -0,0 +1,70 @@
+from typing import Any, Dict, List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from database.db_session import get_db
+from database.crud.registry_crud import universal_id_registry
+from app.core.config import settings
+from app.schemas.common import ResolveRequest
+from app.routers.registry import ROUTER_CONFIGS
+
+router = APIRouter()
+
+# Database table name (as stored in the registry) -> URL prefix of its router
+PREFIXES_BY_TABLE: Dict[str, str] = {
+    config.service.crud.model.__tablename__: prefix for prefix, config in ROUTER_CONFIGS.items()}
+
+
+def _location(row: Dict[str, Any]) -> Dict[str, Any]:
+    prefix = PREFIXES_BY_TABLE.get(row["table_name"], row["table_name"])
+    return {
+        "table": prefix,
+        "pk": row["record_pk"],
+        "vil_id": row["vil_id"],
+        "url": f"/{prefix}/{row['universal_id']}",
+    }
+
+
+@router.get(
+    "/{universal_id:uuid}",
+    summary="Find the table of a universal_id",
+    description=("Returns the table(s) that hold a universal_id, with the record's primary key, vil_id and "
+                 "URL, in one index lookup on the universal_id registry instead of one probe per table.")
+)
+def resolve_one(universal_id: UUID, db: Session = Depends(get_db)):
+    rows = universal_id_registry.resolve(db, [universal_id])
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"universal_id '{universal_id}' not found.")
+
+    return JSONResponse(content=jsonable_encoder({
+        "universal_id": universal_id,
+        "matches": [_location(row) for row in rows],
+    }))
+
+
+@router.post(
+    "",
+    summary="Find the tables of many universal_ids",
+    description=(f"Resolves up to {settings.RESOLVE_MAX_BATCH} universal_ids with one registry query per "
+                 f"5000 ids. `resolved` maps each found id to its matches; ids that are not stored "
+                 f"anywhere are listed in `missing`.")
+)
+def resolve_many(request: ResolveRequest, db: Session = Depends(get_db)):
+    if len(request.universal_ids) > settings.RESOLVE_MAX_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many universal_ids: {len(request.universal_ids)} (max {settings.RESOLVE_MAX_BATCH}).")
+
+    requested = list(dict.fromkeys(request.universal_ids))
+    resolved: Dict[UUID, List[Dict[str, Any]]] = {}
+    for row in universal_id_registry.resolve(db, requested):
+        resolved.setdefault(row["universal_id"], []).append(_location(row))
+
+    return JSONResponse(content=jsonable_encoder({
+        "resolved": resolved,
+        "missing": [universal_id for universal_id in requested if universal_id not in resolved],
+    }))
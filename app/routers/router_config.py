@@ -26,6 +26,9 @@ class RouterConfig:
     # A human-friendly name for the entity (plural, e.g., "articles")
     entity_name_plural: str
 
+    # Date column used (with the primary key) to order and paginate read endpoints
+    sort_field_name: str = "circular_date"
+
     # Actual name of the table in the json dump (to facilitate cases like cs - st)
     vil_table_name: Optional[str] = None
 
@@ -0,0 +1,58 @@
+from typing import Optional
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from database.db_session import get_db
+from app.schemas.common import PageResponse
+from app.routers.registry import ROUTER_CONFIGS
+from app.services.search_service import search_all_tables
+
+router = APIRouter()
+
+
+@router.get(
+    "",
+    response_model=PageResponse,
+    summary="Full-text search across all tables",
+    description=("Searches `cir_subject` (case and circular tables) and `summary` (articles, features) "
+                 "in every table at once, ranked by relevance. Each item carries the `table` it comes "
+                 "from and its `universal_id`; fetch the full record from `GET /<table>/<universal_id>`. "
+                 "`date_from`/`date_to` filter on each table's date column.")
+)
+def search_all(
+    q: str = Query(..., min_length=1, description="Search text"),
+    tables: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(ROUTER_CONFIGS)}"),
+    date_from: Optional[datetime] = Query(None, description="Inclusive lower bound on the table's date column"),
+    date_to: Optional[datetime] = Query(None, description="Exclusive upper bound on the table's date column"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned by the previous page"),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    selected = list(ROUTER_CONFIGS)
+    if tables:
+        selected = [name.strip() for name in tables.split(",") if name.strip()]
+        unknown = [name for name in selected if name not in ROUTER_CONFIGS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown table(s): {', '.join(unknown)}. Available: {', '.join(ROUTER_CONFIGS)}")
+
+    sources = [(name, ROUTER_CONFIGS[name].service, ROUTER_CONFIGS[name].sort_field_name) for name in selected]
+
+    try:
+        items, next_cursor = search_all_tables(
+            db,
+            sources=sources,
+            query_text=q,
+            date_from=date_from,
+            date_to=date_to,
+            cursor=cursor,
+            limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return JSONResponse(content=jsonable_encoder({"items": items, "next_cursor": next_cursor}))
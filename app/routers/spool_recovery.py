@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict
+
+from database.db_session import SessionLocal
+from app.core.logging_config import transaction_logging
+from app.core.spool import SpoolJob, spool
+from app.core.admission import AdmissionRejected, admission
+from app.routers.router_config import RouterConfig
+from app.routers.registry import ROUTER_CONFIGS
+from app.routers.generic_router_factory import batch_processor
+
+logger = logging.getLogger(__name__)
+transaction_logger = logging.getLogger("transaction_logger")
+
+# Table name (as spooled) -> router configuration
+CONFIGS_BY_TABLE: Dict[str, RouterConfig] = {config.table_name: config for config in ROUTER_CONFIGS.values()}
+
+
+async def admitted(table: str):
+    """
+    Takes one of `table`'s ingestion slots like a live batch, waiting out the
+    rejections: a resumed batch has no client to answer 429 to.
+    """
+    while True:
+        try:
+            await admission.acquire(table)
+            return
+        except AdmissionRejected as e:
+            logger.info(f"Resuming a spooled batch of '{table}' waits {e.retry_after}s: {e.reason}")
+            await asyncio.sleep(e.retry_after)
+
+
+async def resume_job(job: SpoolJob):
+    """
+    Finishes one spooled batch from the item after its checkpoint, holding an
+    ingestion slot of its table (see app.core.admission) like the request it came
+    from. The outcome goes to a `resume_<operation>` transaction log, since the
+    client that sent the batch is gone.
+    """
+    config = CONFIGS_BY_TABLE[job.table_name]
+    items = job.read_items()
+    start_index = job.read_checkpoint() + 1
+    process = batch_processor(job.operation)
+
+    await admitted(config.table_name)
+    db = SessionLocal()
+    try:
+        with transaction_logging(table_name=config.table_name, operation=f"resume_{job.operation}"):
+            transaction_logger.info(
+                f"Resuming spooled batch '{job.job_id}' (accepted {job.meta.get('accepted_at')}) "
+                f"at item {start_index} of {job.total}")
+            start_time = datetime.now(timezone.utc)
+            success_messages, failed_items_list = await process(
+                config, items, db, job.policy, start_index=start_index, on_item_done=job.checkpoint)
+            duration = datetime.now(timezone.utc) - start_time
+
+            transaction_logger.info("PROCESSING SUMMARY")
+            transaction_logger.info(f"Resumed items: {job.total - start_index}")
+            transaction_logger.info(f"Success: {len(success_messages)}")
+            transaction_logger.info(f"Failed: {len(failed_items_list)}")
+            transaction_logger.info(f"Duration: {duration}")
+    finally:
+        db.close()
+        admission.release(config.table_name)
+
+
+def resume_spooled_batches():
+    """
+    Resumes every unfinished spooled batch not held by another process, oldest first.
+    """
+    for job in spool.pending():
+        if not job.lock():
+            continue
+        if job.table_name not in CONFIGS_BY_TABLE:
+            logger.error(f"Spooled batch '{job.job_id}' is for unknown table '{job.table_name}'; left in place.")
+            job.unlock()
+            continue
+        try:
+            asyncio.run(resume_job(job))
+        except Exception as e:
+            logger.error(f"Could not resume spooled batch '{job.job_id}': {e}")
+            job.unlock()
+            continue
+        job.discard()
+
+
+def resume_in_background() -> threading.Thread:
+    """
+    Runs `resume_spooled_batches` on a daemon thread, so startup is not delayed. A
+    shutdown in the middle leaves the batch spooled for the next start.
+    """
+    thread = threading.Thread(target=resume_spooled_batches, name="spool-recovery", daemon=True)
+    thread.start()
+    return thread
@@ -1,8 +1,18 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
+from uuid import UUID
 
 
 class UploadSuccessResponse(BaseModel):
     message: str
     processed_items: List[str]
-    failed_items: List[Dict[str, str]] = []
\ No newline at end of file
+    failed_items: List[Dict[str, str]] = []
+
+
+class PageResponse(BaseModel):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+
+class ResolveRequest(BaseModel):
+    universal_ids: List[UUID]
@@ -2,38 +2,205 @@ import os
 import json
 import aiofiles
 import logging
-from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import date, datetime, timezone, tzinfo
+from types import SimpleNamespace
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+from uuid import UUID, uuid4
+from sqlalchemy import REAL, UniqueConstraint, and_, cast, or_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.lookup_keys import lookup_candidates
+from app.core.stored_datetimes import as_stored, session_time_zone
+from app.services.id_filter import UniversalIdFilter
+from app.services.field_mapping import FieldMapping, compile_mapping
+from app.services.partitioning import PARTITION_COLUMN, YearPartitions
+from app.services.facets import FACETS, MISSING_VALUE, facet_deltas
+from app.services.hierarchy import (
+    HIERARCHY_ID_COLUMNS, HIERARCHY_NAME_COLUMNS, HierarchyCache, build_tree, hierarchy_deltas)
+from database.crud import change_crud, facet_crud, file_gc_crud, hierarchy_crud, registry_crud
 
 logger = logging.getLogger(__name__)
 
-class BaseDataProcessingService(ABC):
+# How copies of the same record within one payload are collapsed
+PAYLOAD_DUPLICATE_POLICIES = ("last_wins", "first_wins")
+
+
+def _json_default(value: Any) -> Any:
+    """
+    json.dumps fallback for the column types used by the models.
+    """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _as_stored(value: Any, zone: Optional[tzinfo]) -> Any:
+    if isinstance(value, dict):
+        return {key: _as_stored(item, zone) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_as_stored(item, zone) for item in value]
+    return as_stored(value, zone)
+
+
+def comparable_content(item: BaseModel, zone: Optional[tzinfo]) -> Dict[str, Any]:
+    """
+    An item's field values as the database stores them, for comparing a payload or
+    a file with a row: aware datetimes are converted to the session time zone `zone`
+    (see `session_time_zone`), so `...Z` / `...+05:30` in a payload or file is no
+    difference from the row.
+    """
+    return _as_stored(item.model_dump(), zone)
+
+class BaseDataProcessingService:
     """
-    An abstract base class for data processing services.
+    The base class for data processing services.
     It encapsulates the transactional logic for:
     1. Creating a database record.
     2. Saving an associated file.
     3. Updating the record with the file path.
+
+    Schema items are mapped to model rows by a declarative `FieldMapping`
+    (built from `schema` and `field_renames`), compiled when the service is created.
     """
-    def __init__(self, crud_model, storage_dir: str, file_suffix: str, pk_field_name: str):
+    # Text columns that can be large; read endpoints only return them when asked for
+    large_columns = ("cir_subject", "summary")
+
+    # Identifier columns that have a normalized `<column>_key` for /lookup (if the table has them)
+    lookup_columns = ("circular_no", "case_no", "order_no", "eq_citation")
+
+    # Modes tried in order by an "auto" lookup
+    lookup_modes = ("exact", "prefix", "fuzzy")
+
+    # Schema fields stored under a different column name (schema field -> model column)
+    field_renames = {"file_path": "html_file_path"}
+
+    # Columns computed from the item and the processing context (column -> function(item, **context)),
+    # e.g. the partition key of the partitioned tables
+    derived_columns: Dict[str, Callable[..., Any]] = {}
+
+    def __init__(self, crud_model, schema: Type[BaseModel], storage_dir: str, file_suffix: str, pk_field_name: str):
         self.crud = crud_model
+        self.schema = schema
         self.storage_dir = storage_dir
         self.file_suffix = file_suffix
         self.pk_field_name = pk_field_name
+        self.known_ids = UniversalIdFilter(name=storage_dir)
+        self.registry = registry_crud.universal_id_registry
+        self.file_gc = file_gc_crud.file_gc_queue
+        self.changes = change_crud.change_outbox
+        self.mapping = compile_mapping(FieldMapping(
+            schema=schema, model=crud_model.model, renames=self.field_renames, derived=self.derived_columns))
+        self.partitions = (YearPartitions(crud_model.model.__tablename__)
+                           if PARTITION_COLUMN in self.derived_columns else None)
+        # Facets counted in facet_counts: those whose column this table has
+        self.facets = tuple(facet for facet in FACETS if facet.column in crud_model.model.__table__.c)
+        # Product hierarchy (product_hierarchy table + cached tree), for tables that have one
+        table_columns = crud_model.model.__table__.c
+        self.hierarchy = (HierarchyCache(ttl=settings.HIERARCHY_CACHE_TTL_SECONDS)
+                          if all(column in table_columns for column in (*HIERARCHY_ID_COLUMNS, *HIERARCHY_NAME_COLUMNS))
+                          else None)
 
-    @abstractmethod
     def _prepare_initial_data(self, item: BaseModel, ingestion_time: datetime, file_storage_path: str) -> dict:
         """
-        Abstract method to be implemented by child classes.
-        This method is responsible for mapping the Pydantic schema fields
-        to the SQLAlchemy model's fields.
+        Maps the Pydantic schema fields to the SQLAlchemy model's fields.
+        """
+        return self.mapping.build_row(item, ingestion_time=ingestion_time, file_storage_path=file_storage_path)
+
+    def _ensure_partition(self, db: Session, item: BaseModel, ingestion_time: datetime):
+        """
+        Makes sure the partition the item will be routed to exists (partitioned tables only).
+        Called before the item's own reads and writes: see `YearPartitions.ensure`.
+        """
+        if self.partitions is not None:
+            value = self.derived_columns[PARTITION_COLUMN](item, ingestion_time=ingestion_time, file_storage_path=None)
+            self.partitions.ensure(db.get_bind(), value)
+
+    def ensure_partitions(self, db: Session, items: Iterable[BaseModel], ingestion_time: datetime):
+        """
+        `_ensure_partition` for a whole batch, before the batch's first read of the
+        table: a partition cannot be created while the session's transaction holds a
+        lock on it. Each year costs one check per process.
+        """
+        if self.partitions is not None:
+            for item in items:
+                self._ensure_partition(db, item, ingestion_time)
+
+    def _update_summaries(self, db: Session, removed: Any = None, added: Any = None) -> bool:
+        """
+        Moves a record's facet and product hierarchy counts from its `removed` to its
+        `added` values (None for an insert / a delete), in the caller's transaction.
+        Does NOT commit. Returns whether the hierarchy changed, i.e. whether its cache
+        must be invalidated once the transaction commits.
+        """
+        table_name = self.crud.model.__tablename__
+        if self.facets:
+            facet_crud.facet_counts.apply_deltas(
+                db, table_name=table_name, deltas=facet_deltas(self.facets, removed, added))
+
+        if self.hierarchy is None:
+            return False
+        deltas, names = hierarchy_deltas(removed, added)
+        hierarchy_crud.product_hierarchy.apply_deltas(db, table_name=table_name, deltas=deltas, names=names)
+        return bool(deltas or names)
+
+    def _register(self, db: Session, db_obj: Any):
+        """
+        Records the record's universal_id in the global registry. Does NOT commit.
+        """
+        self.registry.register(
+            db,
+            universal_id=db_obj.universal_id,
+            table_name=self.crud.model.__tablename__,
+            record_pk=getattr(db_obj, self.pk_field_name),
+            vil_id=db_obj.vil_id)
+
+    def _remove_from_summaries(self, db: Session, removed: List[Any]) -> bool:
+        """
+        `_update_summaries` for many deleted records at once: their deltas are summed
+        and applied with one upsert per summary table. Does NOT commit.
         """
-        pass
+        table_name = self.crud.model.__tablename__
+        if self.facets:
+            deltas = Counter()
+            for record in removed:
+                deltas.update(facet_deltas(self.facets, removed=record))
+            facet_crud.facet_counts.apply_deltas(
+                db, table_name=table_name, deltas={key: delta for key, delta in deltas.items() if delta})
+
+        if self.hierarchy is None:
+            return False
+        deltas = Counter()
+        for record in removed:
+            deltas.update(hierarchy_deltas(removed=record)[0])
+        deltas = {path: delta for path, delta in deltas.items() if delta}
+        hierarchy_crud.product_hierarchy.apply_deltas(db, table_name=table_name, deltas=deltas, names={})
+        return bool(deltas)
+
+    @property
+    def summary_columns(self) -> List[str]:
+        """
+        The columns the facet counts and the product hierarchy are computed from.
+        """
+        columns = [facet.column for facet in self.facets]
+        if self.hierarchy is not None:
+            columns += [*HIERARCHY_ID_COLUMNS, *HIERARCHY_NAME_COLUMNS]
+        return list(dict.fromkeys(columns))
+
+    def _record_change(self, db: Session, operation: str, universal_ids: List[Any]):
+        """
+        Writes the change rows read by /changes, in the caller's transaction, as its
+        last statement before the commit (see `CRUDChangeOutbox.record`). Does NOT commit.
+        """
+        if settings.CHANGES_ENABLED:
+            self.changes.record(db, table_name=self.crud.model.__tablename__, operation=operation,
+                                universal_ids=universal_ids, now=datetime.now(timezone.utc).replace(tzinfo=None))
 
     async def process_and_create_item(self, db: Session, item: BaseModel, ingestion_time: datetime):
         """
@@ -48,6 +215,10 @@ class BaseDataProcessingService(ABC):
         file_created = False
 
         try:
+            self._ensure_partition(db, item, ingestion_time)
+            # A re-upload of a deleted record reuses its file name: keep the collector off it
+            self.file_gc.cancel(db, file_path=file_storage_path)
+
             # 2. File Saving Logic (Happens FIRST now)
             json_content_to_save = item.model_dump(mode='json')
             async with aiofiles.open(file_storage_path, 'w', encoding='utf-8') as f:
@@ -62,10 +233,17 @@ class BaseDataProcessingService(ABC):
             )
             
             db_obj = self.crud.create(db=db, obj_in=initial_data)
+            self._register(db, db_obj)
+            hierarchy_changed = self._update_summaries(db, added=db_obj)
+            self._record_change(db, "create", [db_obj.universal_id])
 
             # 4. Finalize Transaction
             db.commit()
-            db.refresh(db_obj)
+            if hierarchy_changed:
+                self.hierarchy.invalidate()
+            # No refresh: the INSERT returned the generated key and the session keeps
+            # db_obj loaded after the commit (expire_on_commit=False)
+            self.known_ids.add(db_obj.universal_id)
             
             return db_obj
 
@@ -85,51 +263,96 @@ class BaseDataProcessingService(ABC):
     async def process_update_item(self, db: Session, item: BaseModel, ingestion_time: datetime):
         """
         It assumes the item exists and will skip (return None) if it doesn't.
+
+        The record is found, updated and its previous summarized values read back in a
+        single UPDATE ... RETURNING (see `CRUDBase.update_returning`). Returns the
+        updated record's universal_id, primary key, vil_id and file_storage_path.
         """
+        temp_path = None
         try:
-            db_obj = self.crud.get_by_universal_id(db=db, universal_id=item.universal_id)
+            self._ensure_partition(db, item, ingestion_time)
 
-            if not db_obj and getattr(item, 'vil_id', None):
-                db_obj = self.crud.get_by_vil_id(db=db, vil_id=item.vil_id)
+            # 3. Prepare the data dictionary for the update (the file keeps its path)
+            data_dict = self._prepare_initial_data(
+                item=item,
+                ingestion_time=ingestion_time,
+                file_storage_path=None)
+            data_dict.pop('file_storage_path', None)
+
+            table = self.crud.model.__table__
+            returned = list(dict.fromkeys(
+                [column.name for column in self.crud.model.__mapper__.primary_key]
+                + ["universal_id", "vil_id", "file_storage_path"]))
+            old_columns = list(dict.fromkeys([*self.summary_columns, "universal_id", "vil_id"]))
+
+            # 4. Update the record in the database
+            row = self.crud.update_returning(
+                db, match=table.c.universal_id == item.universal_id, values=data_dict,
+                columns=returned, old_columns=old_columns)
+            linked_legacy = False
 
-                if db_obj:
+            if row is None and getattr(item, 'vil_id', None):
+                row = self.crud.update_returning(
+                    db, match=table.c.vil_id == item.vil_id, values=data_dict,
+                    columns=returned, old_columns=old_columns)
+
+                if row:
                      logger.info(f"Migration: Linking universal_id {item.universal_id} to legacy vil_id {item.vil_id}")
-                     db_obj.universal_id = item.universal_id
+                     self.registry.unregister(db, universal_id=row["old_universal_id"], table_name=self.crud.model.__tablename__)
+                     linked_legacy = True
 
-            if not db_obj:
+            if not row:
                 # --- SKIP PATH ---
+                # Nothing was written: end the item's transaction like the other paths do
+                db.rollback()
                 ident = getattr(item, 'universal_id', getattr(item, 'vil_id', 'Unknown'))
                 logger.warning(f"Update skipped: Record {ident} not found.")
                 return None
-            
+
             item_identifier = getattr(item, 'universal_id', getattr(item, 'vil_id', 'unknown'))
-            logger.info(f"Found existing record ({item_identifier}). Updating...")
-            
-            # 3. Prepare the data dictionary for the update
-            data_dict = self._prepare_initial_data(
-                item=item, 
-                ingestion_time=ingestion_time,
-                file_storage_path=db_obj.file_storage_path)
+            logger.info(f"Updated existing record ({item_identifier}).")
 
-            data_dict.pop('file_storage_path', None)
+            db_obj = SimpleNamespace(**{column: row[column] for column in returned})
+            previous = SimpleNamespace(**{column: row[f"old_{column}"] for column in old_columns})
+            # Columns the update does not set keep their previous values
+            current = SimpleNamespace(**{column: data_dict.get(column, getattr(previous, column))
+                                         for column in self.summary_columns})
+            hierarchy_changed = self._update_summaries(db, removed=previous, added=current)
+            if linked_legacy or db_obj.vil_id != previous.vil_id:
+                self._register(db, db_obj)
 
-            # 4. Update the object in the database session
-            db_obj = self.crud.update(db=db, db_obj=db_obj, obj_in=data_dict)
-            
-            # 5. Overwrite the associated JSON file with the new data
+            # 5. Write the new data next to the associated JSON file; it replaces the file
+            # once the update is committed, so a failed commit leaves the file as it was
             json_content_to_save = item.model_dump(mode='json')
-            async with aiofiles.open(db_obj.file_storage_path, 'w', encoding='utf-8') as f:
+            temp_path = f"{db_obj.file_storage_path}.{uuid4().hex}.tmp"
+            async with aiofiles.open(temp_path, 'w', encoding='utf-8') as f:
                 await f.write(json.dumps(json_content_to_save, indent=4))
-            
+
+            if linked_legacy:
+                # Consumers see the legacy id go away and the record come back under the new one
+                self._record_change(db, "delete", [previous.universal_id])
+            self._record_change(db, "update", [db_obj.universal_id])
             db.commit()
-            db.refresh(db_obj)
-            
+            try:
+                os.replace(temp_path, db_obj.file_storage_path)
+            except OSError as e:
+                # The update is committed: report it, and leave the file to fsck --repair
+                logger.error(f"Could not replace {db_obj.file_storage_path} after updating "
+                             f"{db_obj.universal_id}: {e}")
+            temp_path = None
+            if hierarchy_changed:
+                self.hierarchy.invalidate()
+            if linked_legacy:
+                self.known_ids.add(db_obj.universal_id)
+
             return db_obj
 
         except (SQLAlchemyError, IOError, Exception) as e:
             ident = getattr(item, 'universal_id', getattr(item, 'vil_id', 'Unknown'))
             logger.error(f"Error processing update for item {ident}. Rolling back...")
             db.rollback()
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
             raise
     
     async def process_delete_item(self, db: Session, universal_id: str):
@@ -145,13 +368,437 @@ class BaseDataProcessingService(ABC):
                 logger.warning(f"Delete skipped: Record {universal_id} not found.")
                 return None
             
-            # 2. Delete (DB Only) and commit
+            # 2. Delete the row and commit; the file is queued for the background collector
+            hierarchy_changed = self._update_summaries(db, removed=db_obj)
+            self.registry.unregister(db, universal_id=db_obj.universal_id, table_name=self.crud.model.__tablename__)
+            if db_obj.file_storage_path:
+                self.file_gc.enqueue(db, table_name=self.crud.model.__tablename__,
+                                     file_path=db_obj.file_storage_path,
+                                     now=datetime.now(timezone.utc).replace(tzinfo=None))
             db.delete(db_obj)
+            # The DELETE is sent now, so the change row is the last write before the commit
+            db.flush()
+            self._record_change(db, "delete", [db_obj.universal_id])
             db.commit()
+            if hierarchy_changed:
+                self.hierarchy.invalidate()
 
             return db_obj
         
         except (SQLAlchemyError, Exception) as e:
             logger.error(f"Error deleting item {universal_id}. Rolling back. Error: {e}")
             db.rollback()
-            raise
\ No newline at end of file
+            raise
+
+    def process_delete_batch(self, db: Session, universal_ids: List[UUID]) -> List[UUID]:
+        """
+        Deletes records in tombstone mode (DELETE_MODE "tombstone"): one bulk UPDATE
+        sets their `deleted_at`, and the summaries and the registry are updated for
+        the marked rows in the same transaction, which is committed once. The rows
+        and their files are removed later by `purge_tombstones`.
+        Returns the universal_ids that were marked; the others were not found (or
+        were deleted already).
+        """
+        table_name = self.crud.model.__tablename__
+        try:
+            marked = self.crud.tombstone(
+                db, universal_ids, now=datetime.now(timezone.utc).replace(tzinfo=None),
+                columns=list(dict.fromkeys(["universal_id", *self.summary_columns])))
+            hierarchy_changed = self._remove_from_summaries(db, [SimpleNamespace(**row) for row in marked])
+            marked_ids = [row["universal_id"] for row in marked]
+            self.registry.unregister_many(db, universal_ids=marked_ids, table_name=table_name)
+            self._record_change(db, "delete", marked_ids)
+            db.commit()
+        except (SQLAlchemyError, Exception) as e:
+            logger.error(f"Error tombstoning {len(universal_ids)} item(s). Rolling back. Error: {e}")
+            db.rollback()
+            raise
+
+        if hierarchy_changed:
+            self.hierarchy.invalidate()
+        return marked_ids
+
+    def purge_tombstones(self, db: Session, *, before: datetime, limit: int) -> int:
+        """
+        Removes up to `limit` rows tombstoned before `before` and queues their files
+        for the collector, in one transaction. Commits. Returns the number of rows removed.
+        """
+        try:
+            purged = self.crud.purge_tombstones(db, before=before, limit=limit)
+            self.file_gc.enqueue_many(
+                db, table_name=self.crud.model.__tablename__,
+                file_paths=[row["file_storage_path"] for row in purged if row["file_storage_path"]],
+                now=datetime.now(timezone.utc).replace(tzinfo=None))
+            db.commit()
+        except (SQLAlchemyError, Exception):
+            db.rollback()
+            raise
+        return len(purged)
+
+    def find_deleted_ids(self, db: Session, universal_ids: List[UUID]) -> set:
+        """
+        Returns which of `universal_ids` (already known to be stored) are tombstoned.
+        """
+        if not universal_ids:
+            return set()
+        return self.crud.get_deleted_universal_ids(db, list(universal_ids))
+
+    def warm_id_filter(self, db: Session):
+        """
+        Loads every stored universal_id into the in-memory filter (streamed, so
+        memory use is the filter's bit array only).
+        """
+        if not settings.ID_FILTER_ENABLED:
+            return
+
+        def stored_ids():
+            # Tombstoned ids included: they are rejected like stored ones until purged
+            for rows in self.crud.stream_rows(db, columns=["universal_id"], batch_size=settings.EXPORT_BATCH_SIZE,
+                                              include_deleted=True):
+                for row in rows:
+                    yield row["universal_id"]
+
+        self.known_ids.warm(self.crud.count(db), stored_ids())
+
+    def find_existing_ids(self, db: Session, universal_ids: List[UUID]) -> set:
+        """
+        Returns which of `universal_ids` are already stored. Ids the filter rules out
+        are skipped; the rest are confirmed with one batched query, so a batch of new
+        rows usually costs no query at all.
+        """
+        if settings.ID_FILTER_ENABLED:
+            candidates = [uid for uid in universal_ids if self.known_ids.might_contain(uid)]
+        else:
+            candidates = list(universal_ids)
+
+        if not candidates:
+            return set()
+        return self.crud.get_existing_universal_ids(db, candidates)
+
+    def resolve_columns(self, fields: Optional[str], include_large: bool) -> List[str]:
+        """
+        Turns a comma-separated `fields` query value into a list of column names.
+        Without `fields`, returns every column except the large ones (unless
+        `include_large`). Raises ValueError for unknown field names.
+        """
+        all_columns = self.crud.column_names
+
+        if not fields:
+            if include_large:
+                return all_columns
+            return [name for name in all_columns if name not in self.large_columns]
+
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in all_columns]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(all_columns)}")
+
+        # The identity column is always returned so callers can address the record
+        return list(dict.fromkeys(["universal_id", *requested]))
+
+    def get_item(self, db: Session, universal_id: Any, fields: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns one record as a dictionary (all columns unless `fields` is given).
+        """
+        columns = self.resolve_columns(fields, include_large=True)
+        return self.crud.get_row_by_universal_id(db, universal_id, columns=columns)
+
+    def get_page(self, db: Session, *, sort_field: str, cursor: Optional[str] = None,
+                 limit: int = 100, fields: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Returns one page of records ordered by (sort_field, primary key) and the
+        cursor for the next page (None on the last page).
+        Raises ValueError for an invalid cursor or unknown fields.
+        """
+        columns = self.resolve_columns(fields, include_large=False)
+
+        # The keyset columns are needed to build the next cursor
+        query_columns = list(dict.fromkeys([self.pk_field_name, sort_field, *columns]))
+
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)
+            if len(after) != 2:
+                raise ValueError(f"Invalid cursor: {cursor!r}")
+
+        # Fetch one extra row to know whether another page exists
+        rows = self.crud.get_page(db, sort_field=sort_field, columns=query_columns, after=after, limit=limit + 1)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor([last[sort_field], last[self.pk_field_name]])
+
+        return rows, next_cursor
+
+    def search(self, db: Session, *, query_text: str, sort_field: str,
+               date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+               cursor: Optional[str] = None, limit: int = 20,
+               fields: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Full-text search ranked by relevance (best first, ties by newest primary key),
+        paginated with a (rank, primary key) keyset cursor.
+        Raises ValueError for an invalid cursor or unknown fields.
+        """
+        columns = self.resolve_columns(fields, include_large=False)
+        table = self.crud.model.__table__
+
+        query, rank, pk_column = self.crud.search_select(
+            query_text=query_text, sort_field=sort_field, date_from=date_from, date_to=date_to)
+
+        if cursor:
+            after = decode_cursor(cursor)
+            if len(after) != 2:
+                raise ValueError(f"Invalid cursor: {cursor!r}")
+            after_rank = cast(after[0], REAL)
+            query = query.where(or_(rank < after_rank, and_(rank == after_rank, pk_column < after[1])))
+
+        query_columns = list(dict.fromkeys([self.pk_field_name, *columns]))
+        query = (query
+                 .with_only_columns(*[table.c[name] for name in query_columns], rank.label("rank"))
+                 .order_by(rank.desc(), pk_column.desc())
+                 .limit(limit + 1))
+
+        rows = [dict(row._mapping) for row in db.execute(query)]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1]["rank"], rows[-1][self.pk_field_name]])
+
+        return rows, next_cursor
+
+    def get_stats(self, db: Session, *, facets: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        """
+        Record counts per facet value, read from the maintained facet_counts table, so
+        the cost depends on the number of distinct values, not on the table size.
+        `facets` is a comma-separated subset of the table's facets (default: all).
+        Raises ValueError for unknown facet names.
+        """
+        available = {facet.name: facet for facet in self.facets}
+        requested = [name.strip() for name in facets.split(",") if name.strip()] if facets else list(available)
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            raise ValueError(f"Unknown facet(s): {', '.join(unknown)}. Available: {', '.join(available)}")
+
+        table_name = self.crud.model.__tablename__
+        result = {name: [
+            {"value": None if row["value"] == MISSING_VALUE else row["value"], "count": row["count"]}
+            for row in facet_crud.facet_counts.get_counts(
+                db, table_name=table_name, facet=name, limit=limit, chronological=available[name].chronological)]
+            for name in requested}
+
+        total = facet_crud.facet_counts.get_total(db, table_name=table_name, facet=self.facets[0].name)
+        return {"total": total, "facets": result}
+
+    def get_hierarchy(self, db: Session) -> Dict[str, Any]:
+        """
+        The product tree (prod_id > sub_prod_id > sub_subprod_id) with record counts per
+        node, built from the product_hierarchy table and cached until the next write.
+        """
+        def load():
+            return build_tree(hierarchy_crud.product_hierarchy.get_paths(db, table_name=self.crud.model.__tablename__))
+
+        tree = self.hierarchy.get(load)
+        return {"total": sum(node["count"] for node in tree), "tree": tree}
+
+    @property
+    def lookup_fields(self) -> List[str]:
+        """
+        Identifier columns of this table that can be used with `lookup`.
+        """
+        table_columns = self.crud.model.__table__.c
+        return [name for name in self.lookup_columns if f"{name}_key" in table_columns]
+
+    def lookup(self, db: Session, *, query_text: str, field: Optional[str] = None, mode: str = "auto",
+               limit: int = 10, fields: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Finds records by a (possibly partial or badly formatted) identifier such as
+        "Circ No 12/2019". With mode "auto", tries exact, then prefix, then fuzzy
+        matching and stops at the first mode that finds anything.
+
+        Returns (rows, the mode that matched or None).
+        Raises ValueError for an unknown field/mode or a query with no usable characters.
+        """
+        available = self.lookup_fields
+        if field is not None and field not in available:
+            raise ValueError(f"Field '{field}' cannot be looked up. Available: {', '.join(available)}")
+        if mode != "auto" and mode not in self.lookup_modes:
+            raise ValueError(f"Unknown mode '{mode}'. Available: auto, {', '.join(self.lookup_modes)}")
+
+        candidates = lookup_candidates(query_text)
+        if not candidates:
+            raise ValueError("Query has no letters or digits to look up.")
+
+        key_columns = [f"{name}_key" for name in ([field] if field else available)]
+        columns = self.resolve_columns(fields, include_large=False)
+        modes = self.lookup_modes if mode == "auto" else (mode,)
+
+        for current_mode in modes:
+            rows = self.crud.lookup(
+                db,
+                key_columns=key_columns,
+                candidates=candidates,
+                mode=current_mode,
+                columns=columns,
+                limit=limit)
+            if rows:
+                return rows, current_mode
+
+        return [], None
+
+    def schema_columns(self, schema: Type[BaseModel]) -> Dict[str, str]:
+        """
+        Maps each field of the upload schema to the model column it is stored in.
+        """
+        return {name: self.field_renames.get(name, name) for name in schema.model_fields}
+
+    def stored_item(self, row: Dict[str, Any]) -> Optional[BaseModel]:
+        """
+        A stored row as an item of the upload schema, or None if the row does not
+        validate against the schema. `row` must hold the columns of `schema_columns(schema)`.
+        """
+        try:
+            return self.schema(**{name: row[column] for name, column in self.schema_columns(self.schema).items()})
+        except ValidationError:
+            return None
+
+    def stored_content(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        A stored row in the upload schema's shape, as its JSON file is written, or None
+        if the row does not validate against the schema.
+        """
+        item = self.stored_item(row)
+        return item.model_dump(mode="json") if item is not None else None
+
+    def plan_items(self, db: Session, items: Dict[int, BaseModel], *, upsert: bool) -> Dict[int, str]:
+        """
+        What /upload (upsert=False) or /update (upsert=True) would do with each
+        validated item, without writing anything: {index: outcome}, with one query
+        per 5000 items for the stored rows they match by universal_id or vil_id.
+
+        Outcomes: "create", "update", "unchanged" (stored with the same content),
+        "duplicate" (stored, and /upload does not overwrite; also a vil_id held by
+        another record) and "deleted" (tombstoned, see DELETE_MODE).
+        """
+        table_columns = self.crud.model.__table__.c
+        columns = list(dict.fromkeys([
+            "universal_id", "vil_id", *self.schema_columns(self.schema).values(),
+            *(["deleted_at"] if "deleted_at" in table_columns else [])]))
+        rows = self.crud.get_rows_by_identity(
+            db,
+            universal_ids=[item.universal_id for item in items.values()],
+            vil_ids=[item.vil_id for item in items.values() if item.vil_id is not None],
+            columns=columns)
+
+        zone = session_time_zone(db.get_bind())
+        by_universal_id = {row["universal_id"]: row for row in rows}
+        # Only live rows: /update's legacy fallback does not see tombstoned ones
+        by_vil_id = {row["vil_id"]: row for row in rows if row["vil_id"] is not None and not row.get("deleted_at")}
+
+        plan = {}
+        for index, item in items.items():
+            row = by_universal_id.get(item.universal_id)
+            if row is not None and row.get("deleted_at") is not None:
+                plan[index] = "deleted"
+            elif row is not None:
+                stored = self.stored_item(row)
+                if stored is not None and comparable_content(stored, zone) == comparable_content(item, zone):
+                    plan[index] = "unchanged"
+                else:
+                    plan[index] = "update" if upsert else "duplicate"
+            elif item.vil_id is not None and item.vil_id in by_vil_id:
+                # /update links the legacy record found by vil_id to the new universal_id
+                plan[index] = "update" if upsert else "duplicate"
+            else:
+                plan[index] = "create"
+        return plan
+
+    def unique_field_groups(self, schema: Type[BaseModel]) -> List[Tuple[str, ...]]:
+        """
+        Returns the schema fields behind each unique constraint / unique index of the
+        table (read from the table metadata), e.g. [("universal_id",), ("vil_id",), ...].
+        Constraints on columns the schema does not supply (e.g. the primary key) are left out.
+        """
+        table = self.crud.model.__table__
+        column_fields = {column: field for field, column in self.schema_columns(schema).items()}
+
+        column_sets = [tuple(column.name for column in constraint.columns)
+                       for constraint in table.constraints if isinstance(constraint, UniqueConstraint)]
+        column_sets += [tuple(column.name for column in index.columns) for index in table.indexes if index.unique]
+        # Keys the partitioned tables keep unique through <table>_keys rather than a constraint
+        column_sets += [tuple(columns) for columns in table.info.get("unique_keys", ())]
+
+        # Table order, so conflicts are reported on universal_id before vil_id, file path, ...
+        position = {name: number for number, name in enumerate(table.columns.keys())}
+        column_sets.sort(key=lambda columns: [position[name] for name in columns])
+
+        groups = []
+        for columns in dict.fromkeys(column_sets):
+            if columns and all(column in column_fields for column in columns):
+                groups.append(tuple(column_fields[column] for column in columns))
+        return groups
+
+    def find_payload_duplicates(self, items: Dict[int, BaseModel], unique_groups: List[Tuple[str, ...]],
+                                policy: str) -> Dict[int, str]:
+        """
+        Finds items of one payload that share a unique key with another item of the
+        same payload. With "last_wins" the latest copy is kept, with "first_wins" the
+        earliest; every other copy is returned as {index: reason} so it can be skipped
+        before any file or database work. NULLs never conflict, as in Postgres.
+        """
+        if policy not in PAYLOAD_DUPLICATE_POLICIES:
+            raise ValueError(f"Unknown duplicate policy '{policy}'. Available: {', '.join(PAYLOAD_DUPLICATE_POLICIES)}")
+
+        order = sorted(items, reverse=(policy == "last_wins"))
+        kept_by_key = [{} for _ in unique_groups]
+        duplicates = {}
+
+        for index in order:
+            keys = [tuple(getattr(items[index], field) for field in group) for group in unique_groups]
+
+            for group_number, key in enumerate(keys):
+                if None not in key and key in kept_by_key[group_number]:
+                    fields = ", ".join(unique_groups[group_number])
+                    values = ", ".join(str(value) for value in key)
+                    duplicates[index] = (f"Duplicate In Payload: {fields}={values} also appears at index "
+                                         f"{kept_by_key[group_number][key]}, which was kept ({policy}).")
+                    break
+            else:
+                for group_number, key in enumerate(keys):
+                    if None not in key:
+                        kept_by_key[group_number][key] = index
+
+        return duplicates
+
+    def export_ndjson(self, db: Session, *, columns: List[str],
+                      ranges: Dict[str, Tuple[Optional[datetime], Optional[datetime]]]) -> Iterator[bytes]:
+        """
+        Streams the table as newline-delimited JSON, one row per line.
+        """
+        for rows in self.crud.stream_rows(db, columns=columns, ranges=ranges, batch_size=settings.EXPORT_BATCH_SIZE):
+            yield "".join(json.dumps(row, default=_json_default) + "\n" for row in rows).encode("utf-8")
+
+    def export_vil(self, db: Session, *, vil_table_name: str, schema: Type[BaseModel],
+                   ranges: Dict[str, Tuple[Optional[datetime], Optional[datetime]]]) -> Iterator[bytes]:
+        """
+        Streams the table as a VIL envelope (`{"name": ..., "data": [...]}`) whose items
+        are in the upload schema's shape, so the output can be POSTed back to /upload.
+        """
+        field_columns = self.schema_columns(schema)
+        columns = list(dict.fromkeys(field_columns.values()))
+
+        yield ('{"name": ' + json.dumps(vil_table_name) + ', "data": [').encode("utf-8")
+
+        first = True
+        for rows in self.crud.stream_rows(db, columns=columns, ranges=ranges, batch_size=settings.EXPORT_BATCH_SIZE):
+            items = (
+                json.dumps({field: row[column] for field, column in field_columns.items()}, default=_json_default)
+                for row in rows)
+            chunk = ",\n".join(items)
+            if chunk:
+                yield (("\n" if first else ",\n") + chunk).encode("utf-8")
+                first = False
+
+        yield b"\n]}\n"
@@ -1,44 +1,20 @@
-from datetime import datetime
-
 from app.services.base import BaseDataProcessingService
+from app.services.partitioning import PARTITION_COLUMN, partition_date
 from database.crud import ce_crud
 from app.schemas.ce_schema import CECreate
 
 
 class CEService(BaseDataProcessingService):
+    derived_columns = {PARTITION_COLUMN: partition_date}
+
     def __init__(self):
         super().__init__(
             crud_model=ce_crud.ce,
+            schema=CECreate,
             storage_dir="ce",
             file_suffix="ce.json",
             pk_field_name="case_id"
         )
 
-    def _prepare_initial_data(self, item: CECreate, ingestion_time: datetime, file_storage_path: str) -> dict:
-        """
-        Maps the CECreate schema to the CE model fields.
-        """
-        return {
-            "universal_id": item.universal_id,
-            "vil_id": item.vil_id,
-            "prod_id": item.prod_id,
-            "prod_name": item.prod_name,
-            "sub_prod_id": item.sub_prod_id,
-            "sub_prod_name": item.sub_prod_name,
-            "sub_subprod_id": item.sub_subprod_id,
-            "circular_date": item.circular_date,
-            "eq_citation": item.eq_citation,
-            "circular_no": item.circular_no,
-            "case_no": item.case_no,
-            "order_no": item.order_no,
-            "judge_name": item.judge_name,
-            "cir_subject": item.cir_subject,
-            "party_name": item.party_name,
-            "html_file_path": item.file_path,
-            "created_dt": item.created_dt,
-            "updated_dt": item.updated_dt,
-            "ingestion_dt": ingestion_time,
-            "file_storage_path": file_storage_path
-        }
 
 ce_service = CEService()
\ No newline at end of file
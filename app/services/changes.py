@@ -0,0 +1,188 @@
+import time
+import select
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from database.crud.change_crud import CHANGES_CHANNEL, change_outbox
+
+logger = logging.getLogger(__name__)
+
+# Seconds between prunes of the outbox
+PRUNE_INTERVAL = 3600
+
+
+class ChangeFeed:
+    """
+    Wakes /changes consumers when changes are committed, so they do not poll.
+
+    A background thread holds one dedicated connection (outside the pool) that
+    LISTENs on CHANGES_CHANNEL; every notification bumps `version` and wakes the
+    waiting consumers, which then read the outbox from their last sequence number.
+    While the connection is down, waiting consumers re-read every `poll_interval`
+    seconds instead. The same thread prunes changes older than `retention_days`.
+    """
+    def __init__(self, retention_days: float, poll_interval: float, gap_grace: float):
+        self.retention_days = retention_days
+        self.poll_interval = poll_interval
+        self.gap_grace = gap_grace
+        self.version = 0
+        self.listening = False
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_prune = 0.0
+
+    def read(self, db: Session, *, after_seq: int, table_names: Optional[Set[str]],
+             limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Returns (changes, last_seq): the committed changes after `after_seq` of the
+        given tables (all when None), and the sequence number to resume from.
+
+        Sequence numbers are taken at insert time, so a transaction may commit after
+        one holding a later number. Reading stops at a gap in the sequence while a
+        transaction that started before the next change was written still holds its
+        lock on the outbox: it may hold a missing number. Once there is none, the gap
+        is a rolled-back transaction and is passed. Rows without `written_at` (written
+        before migration f5a0c7d3e8b1, or off Postgres) fall back to a time rule: the
+        gap is passed once the next change is older than `gap_grace` seconds, which
+        skips a change whose transaction commits later still.
+        """
+        rows = change_outbox.read_after(db, after_seq=after_seq, limit=limit)
+        settled_before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.gap_grace)
+        oldest_writer: Optional[datetime] = None
+        writers_read = False
+
+        changes = []
+        last_seq = after_seq
+        for row in rows:
+            if row["seq"] != last_seq + 1:
+                if row["written_at"] is not None:
+                    # Read once, at the first gap
+                    if not writers_read:
+                        oldest_writer, writers_read = change_outbox.oldest_writer_start(db), True
+                    settled = oldest_writer is None or oldest_writer > row["written_at"]
+                else:
+                    settled = row["changed_at"] <= settled_before
+                if not settled:
+                    break
+            last_seq = row["seq"]
+            # Filtered out rows still advance last_seq, so they are not read again
+            if table_names is None or row["table_name"] in table_names:
+                changes.append(row)
+        return changes, last_seq
+
+    async def wait(self, version: int, timeout: float) -> bool:
+        """
+        Waits up to `timeout` seconds for a notification after `version` (or for the
+        poll interval when not listening). Returns whether one arrived.
+        """
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            if self.version != version:
+                return True
+            if not self.listening:
+                timeout = min(timeout, self.poll_interval)
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def _notify(self):
+        with self._lock:
+            self.version += 1
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The waiter's event loop is closed
+                pass
+
+    def _listen(self):
+        # Imported here: psycopg2 is only needed for the listener
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        dsn = make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = psycopg2.connect(dsn)
+                connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANGES_CHANNEL}")
+                self.listening = True
+                # Changes committed while the connection was down were not signalled
+                self._notify()
+
+                while not self._stop.is_set():
+                    if select.select([connection], [], [], self.poll_interval)[0]:
+                        connection.poll()
+                        if connection.notifies:
+                            connection.notifies.clear()
+                            self._notify()
+                    self._prune_if_due()
+            except Exception as e:
+                logger.warning(f"Change feed listener failed, consumers poll until it reconnects: {e}")
+            finally:
+                self.listening = False
+                if connection is not None:
+                    connection.close()
+            self._stop.wait(self.poll_interval)
+
+    def _prune_if_due(self):
+        if self.retention_days <= 0 or time.monotonic() - self._last_prune < PRUNE_INTERVAL:
+            return
+        self._last_prune = time.monotonic()
+        from database.db_session import SessionLocal
+
+        before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=self.retention_days)
+        try:
+            with SessionLocal() as db:
+                pruned = change_outbox.prune(db, before=before)
+                db.commit()
+            if pruned:
+                logger.info(f"Pruned {pruned} change(s) older than {self.retention_days} day(s)")
+        except Exception as e:
+            logger.error(f"Change outbox prune failed: {e}")
+
+    def start(self) -> threading.Thread:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="change-feed", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval)
+            self._thread = None
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Listener state and the latest sequence number, for /health/changes.
+        """
+        from database.db_session import SessionLocal
+
+        with SessionLocal() as db:
+            return {"listening": self.listening, "last_seq": change_outbox.last_seq(db)}
+
+
+change_feed = ChangeFeed(
+    retention_days=settings.CHANGES_RETENTION_DAYS,
+    poll_interval=settings.CHANGES_POLL_SECONDS,
+    gap_grace=settings.CHANGES_GAP_GRACE_SECONDS)
@@ -0,0 +1,56 @@
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# Stored value for records that have no value for a facet (the counters' key cannot be NULL)
+MISSING_VALUE = ""
+
+
+def month_bucket(value: datetime) -> str:
+    return value.strftime("%Y-%m")
+
+
+@dataclass(frozen=True)
+class Facet:
+    """
+    A dimension the stats endpoint counts records by: the value of `column`, optionally
+    bucketed (e.g. a date by month). `chronological` facets are listed latest first
+    instead of most frequent first.
+    """
+    name: str
+    column: str
+    bucket: Optional[Callable[[Any], str]] = None
+    chronological: bool = False
+
+    def value_of(self, record: Any) -> str:
+        raw = getattr(record, self.column)
+        if raw is None:
+            return MISSING_VALUE
+        return self.bucket(raw) if self.bucket else str(raw)
+
+
+# Facets of every table that has the facet's column. Changing this list needs a
+# migration that (re)fills facet_counts, see 5d2f8e61c3a9.
+FACETS = (
+    Facet("prod_name", "prod_name"),
+    Facet("state_id", "state_id"),
+    Facet("sub_prod_name", "sub_prod_name"),
+    Facet("circular_month", "circular_date", bucket=month_bucket, chronological=True),
+)
+
+
+def facet_deltas(facets: Iterable[Facet], removed: Optional[Any] = None,
+                 added: Optional[Any] = None) -> Dict[Tuple[str, str], int]:
+    """
+    The counter changes for a record going from `removed` to `added` (either may be
+    None for an insert / delete), keyed by (facet name, value). Values that did not
+    change cancel out.
+    """
+    deltas = Counter()
+    for facet in facets:
+        if removed is not None:
+            deltas[(facet.name, facet.value_of(removed))] -= 1
+        if added is not None:
+            deltas[(facet.name, facet.value_of(added))] += 1
+    return {key: delta for key, delta in deltas.items() if delta}
@@ -0,0 +1,109 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Tuple, Type
+
+from pydantic import BaseModel
+
+
+class MappingError(ValueError):
+    """
+    Raised when a mapping spec does not match its model's columns.
+    """
+
+
+@dataclass(frozen=True)
+class FieldMapping:
+    """
+    Declarative spec of how one upload schema is stored in one model.
+
+    Every schema field is stored in the column of the same name unless `renames`
+    says otherwise (schema field -> column) or it is listed in `exclude`.
+    `injected` lists columns that are not in the schema but are filled from the
+    processing context (column -> context key passed to the row builder), and
+    `derived` columns computed from both (column -> function(item, **context)).
+    """
+    schema: Type[BaseModel]
+    model: Type
+    renames: Dict[str, str] = field(default_factory=dict)
+    injected: Dict[str, str] = field(default_factory=lambda: {
+        "ingestion_dt": "ingestion_time",
+        "file_storage_path": "file_storage_path",
+    })
+    derived: Dict[str, Callable[..., Any]] = field(default_factory=dict)
+    exclude: Tuple[str, ...] = ()
+
+
+class CompiledMapping:
+    """
+    A `FieldMapping` checked against the model and turned into a row builder.
+
+    The builder is generated as Python source once (like `dataclasses` does for
+    `__init__`), so building a row is a single dict display with plain attribute
+    reads: as fast as a hand-written `_prepare_initial_data`, without one per table.
+    `build_row` returns the values keyed by column (in `columns` order) and takes the
+    injected values as keyword arguments named by the context keys. There is no
+    positional (tuple / COPY) variant: each record is inserted in its own transaction
+    together with its JSON file (`process_and_create_item`), never in bulk.
+    """
+    def __init__(self, spec: FieldMapping):
+        self.spec = spec
+        self.fields = tuple(name for name in spec.schema.model_fields if name not in spec.exclude)
+        self.field_columns = {name: spec.renames.get(name, name) for name in self.fields}
+        self.context_keys = tuple(spec.injected.values())
+        self.columns = tuple(self.field_columns.values()) + tuple(spec.injected) + tuple(spec.derived)
+
+        self._validate()
+        self.build_row = self._generate_builder()
+
+    def _generate_builder(self):
+        bad_keys = [key for key in self.context_keys if not key.isidentifier()]
+        if bad_keys:
+            raise MappingError(f"Context keys must be identifiers: {', '.join(bad_keys)}")
+
+        context_arguments = "".join(f", {key}={key}" for key in self.context_keys)
+        values = ([f"item.{name}" for name in self.fields] + list(self.context_keys)
+                  + [f"_derived_{number}(item{context_arguments})" for number in range(len(self.spec.derived))])
+        parameters = ", ".join(["item", *self.context_keys])
+        row_items = ", ".join(f"{column!r}: {value}" for column, value in zip(self.columns, values))
+        source = (
+            f"def build_row({parameters}):\n"
+            f"    return {{{row_items}}}\n")
+
+        namespace: Dict[str, Any] = {f"_derived_{number}": function
+                                     for number, function in enumerate(self.spec.derived.values())}
+        exec(compile(source, f"<mapping {self.spec.schema.__name__}>", "exec"), namespace)
+        return namespace["build_row"]
+
+    def _validate(self):
+        spec = self.spec
+        table = spec.model.__table__
+        where = f"{spec.schema.__name__} -> {table.name}"
+
+        unknown_fields = [name for name in [*spec.renames, *spec.exclude] if name not in spec.schema.model_fields]
+        if unknown_fields:
+            raise MappingError(f"{where}: renamed/excluded fields not in the schema: {', '.join(unknown_fields)}")
+
+        stored_columns = {column.name: column for column in table.columns if column.computed is None}
+        missing_columns = [name for name in self.columns if name not in stored_columns]
+        if missing_columns:
+            raise MappingError(f"{where}: mapped to columns the model does not have: {', '.join(missing_columns)}")
+
+        repeated = sorted({name for name in self.columns if self.columns.count(name) > 1})
+        if repeated:
+            raise MappingError(f"{where}: columns mapped more than once: {', '.join(repeated)}")
+
+        # Required columns the database cannot fill itself must come from the mapping
+        unfilled = [
+            name for name, column in stored_columns.items()
+            if name not in self.columns and not column.nullable and column.default is None
+            and column.server_default is None and not column.primary_key]
+        if unfilled:
+            raise MappingError(f"{where}: required columns not mapped: {', '.join(unfilled)}")
+
+
+def compile_mapping(spec: FieldMapping) -> CompiledMapping:
+    """
+    Checks `spec` against its model and compiles it. Services call this when they
+    are instantiated, i.e. at import time, so a mapping that drifted from the model
+    stops the application from starting instead of failing on the first upload.
+    """
+    return CompiledMapping(spec)
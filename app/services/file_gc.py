@@ -0,0 +1,108 @@
+import os
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from database.crud.file_gc_crud import file_gc_queue
+
+logger = logging.getLogger(__name__)
+
+
+class FileCollector:
+    """
+    Unlinks the JSON files of deleted records, which /delete only queues in
+    file_gc_queue (in the delete's own transaction) so its latency does not
+    depend on the file system.
+
+    Entries are taken in batches, locked with SKIP LOCKED so several processes
+    can collect at once. A batch's entries are removed in the same transaction
+    once their files are gone, so a crash mid-batch only means some unlinks are
+    retried. A file that cannot be unlinked is retried on later runs, up to
+    `max_attempts` times.
+    """
+    def __init__(self, batch_size: int, interval: float, max_attempts: int):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def collect_batch(self, db: Session) -> Tuple[int, int]:
+        """
+        Unlinks one batch and returns (files removed, failures). Commits.
+        """
+        entries = file_gc_queue.claim_batch(db, limit=self.batch_size, max_attempts=self.max_attempts)
+        removed: List[int] = []
+        errors: Dict[int, str] = {}
+        for entry in entries:
+            try:
+                os.remove(entry["file_path"])
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                errors[entry["id"]] = str(e)
+                continue
+            removed.append(entry["id"])
+
+        file_gc_queue.confirm(db, ids=removed)
+        file_gc_queue.record_failures(db, errors=errors)
+        db.commit()
+        for entry_id, error in errors.items():
+            logger.warning(f"Could not remove queued file (entry {entry_id}): {error}")
+        return len(removed), len(errors)
+
+    def run_once(self) -> int:
+        """
+        Collects batches until the queue is drained (or only failing entries are
+        left) and returns the number of files removed.
+        """
+        # Imported here: database.db_session builds the engine at import time
+        from database.db_session import SessionLocal
+
+        total = 0
+        with SessionLocal() as db:
+            while not self._stop.is_set():
+                removed, failed = self.collect_batch(db)
+                total += removed
+                if removed + failed < self.batch_size or not removed:
+                    break
+        return total
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                removed = self.run_once()
+                if removed:
+                    logger.info(f"Removed {removed} file(s) of deleted records")
+            except Exception as e:
+                logger.error(f"File collection failed: {e}")
+
+    def start(self) -> threading.Thread:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="file-gc", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+    def status(self) -> Dict[str, int]:
+        """
+        Queue backlog, for /health/file-gc.
+        """
+        from database.db_session import SessionLocal
+
+        with SessionLocal() as db:
+            return file_gc_queue.backlog(db, max_attempts=self.max_attempts)
+
+
+file_collector = FileCollector(
+    batch_size=settings.FILE_GC_BATCH_SIZE,
+    interval=settings.FILE_GC_INTERVAL_SECONDS,
+    max_attempts=settings.FILE_GC_MAX_ATTEMPTS)
@@ -0,0 +1,272 @@
+"""
+Consistency checker for the JSON files under STORAGE_PATH.
+
+Every record's `file_storage_path` should point at a file holding the record as
+it was last uploaded. This checks, per table:
+
+    missing    rows whose file does not exist
+    orphan     files in the table's storage directory that no row points at
+    mismatch   files whose content differs from the row (or is not valid JSON);
+               values are compared as the database stores them, so a datetime
+               written with its UTC offset matches the row's naive value (in the
+               session time zone)
+
+With --repair, missing and mismatched files are rewritten from the database row
+(the database is the source of truth) and orphan files are deleted. Files younger
+than --min-age seconds are never reported as orphans: /upload writes the file
+before it inserts the row.
+
+Usage:
+    python -m app.services.fsck --tables sgst,cu [--repair] [--skip-content] [--out report.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.stored_datetimes import session_time_zone
+from app.services.base import comparable_content
+
+logger = logging.getLogger(__name__)
+
+# Paths listed per problem kind in the report; the counts are always complete
+MAX_LISTED = 100
+
+
+@dataclass
+class TableReport:
+    table: str
+    rows: int = 0
+    files: int = 0
+    missing: int = 0
+    orphans: int = 0
+    mismatched: int = 0
+    repaired: int = 0
+    repair_errors: int = 0
+    missing_files: List[str] = field(default_factory=list)
+    orphan_files: List[str] = field(default_factory=list)
+    mismatched_files: List[Dict[str, Any]] = field(default_factory=list)
+
+    def note(self, kind: str, entry: Any):
+        setattr(self, kind, getattr(self, kind) + 1)
+        listed = {"missing": self.missing_files, "orphans": self.orphan_files,
+                  "mismatched": self.mismatched_files}[kind]
+        if len(listed) < MAX_LISTED:
+            listed.append(entry)
+
+
+def scan_directory(path: str) -> Dict[str, float]:
+    """
+    Absolute path -> mtime of every file directly in `path` (the storage directories are flat).
+    """
+    files = {}
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    files[os.path.abspath(entry.path)] = entry.stat(follow_symlinks=False).st_mtime
+    except FileNotFoundError:
+        pass
+    return files
+
+
+def _write_json(path: str, content: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.fsck.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(content, indent=4))
+    os.replace(temp_path, path)
+
+
+class TableChecker:
+    """
+    Checks one table's rows against its storage directory.
+    """
+    def __init__(self, service, repair: bool, check_content: bool, min_age: float, pool: ThreadPoolExecutor):
+        self.service = service
+        self.repair = repair
+        self.check_content = check_content
+        self.min_age = min_age
+        self.pool = pool
+        self.field_columns = service.schema_columns(service.schema)
+        self.report = TableReport(table=service.crud.model.__tablename__)
+        # The session time zone aware datetimes are stored in, set by `run`
+        self.zone = None
+
+    def expected_item(self, row: Dict[str, Any]) -> Optional[BaseModel]:
+        """
+        The record the service would write to the row's file, or None if the row
+        does not validate against the upload schema.
+        """
+        return self.service.stored_item(row)
+
+    def check_row(self, row: Dict[str, Any], exists: Optional[bool]) -> Optional[Tuple[str, Any, Optional[bool]]]:
+        """
+        Runs on a worker thread. Returns (kind, report entry, repaired) for a row whose
+        file has a problem, repairing it first when asked to (repaired is None when
+        not). `exists` is None when the file was not part of the directory scan.
+        """
+        path = row["file_storage_path"]
+        if exists is None:
+            exists = os.path.isfile(path)
+        if exists and not self.check_content:
+            return None
+
+        expected = self.expected_item(row) if self.check_content or self.repair else None
+        if not exists:
+            problem = ("missing", path)
+        else:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    actual = comparable_content(self.service.schema(**json.load(f)), self.zone)
+            except (OSError, ValueError) as e:
+                problem = ("mismatched", {"path": path, "universal_id": str(row["universal_id"]),
+                                          "error": str(e).splitlines()[0]})
+            else:
+                if expected is None:
+                    return None
+                # Compared as stored, so a file that only writes the same values
+                # differently (e.g. a datetime with its offset) is left alone
+                stored = comparable_content(expected, self.zone)
+                if actual == stored:
+                    return None
+                problem = ("mismatched", {"path": path, "universal_id": str(row["universal_id"]),
+                                          "fields": sorted(name for name in stored
+                                                           if actual.get(name) != stored[name])})
+
+        if not self.repair:
+            return problem + (None,)
+        if expected is None:
+            # The row itself does not validate against the schema: nothing to rewrite it from
+            return problem + (False,)
+        try:
+            _write_json(path, expected.model_dump(mode="json"))
+            return problem + (True,)
+        except OSError as e:
+            logger.error(f"Could not rewrite '{path}': {e}")
+            return problem + (False,)
+
+    def run(self, db: Session) -> TableReport:
+        storage_dir = os.path.abspath(os.path.join(settings.STORAGE_PATH, self.service.storage_dir))
+        files = scan_directory(storage_dir)
+        self.report.files = len(files)
+        self.zone = session_time_zone(db.get_bind())
+
+        columns = list(dict.fromkeys(
+            ["universal_id", "file_storage_path",
+             *(self.field_columns.values() if self.check_content or self.repair else [])]))
+        referenced = set()
+        # Tombstoned rows keep their files until the purge queues them
+        for rows in self.service.crud.stream_rows(db, columns=columns, batch_size=settings.EXPORT_BATCH_SIZE,
+                                                  include_deleted=True):
+            self.report.rows += len(rows)
+            work = []
+            for row in rows:
+                path = os.path.abspath(row["file_storage_path"])
+                referenced.add(path)
+                # Paths outside the scanned directory are checked one by one
+                work.append((row, (path in files) if os.path.dirname(path) == storage_dir else None))
+            for result in self.pool.map(lambda args: self.check_row(*args), work):
+                if result is not None:
+                    kind, entry, repaired = result
+                    self.report.note(kind, entry)
+                    self._count_repair(repaired)
+
+        orphan_before = time.time() - self.min_age
+        for path, mtime in files.items():
+            if path in referenced or mtime >= orphan_before or path.endswith(".fsck.tmp"):
+                continue
+            self.report.note("orphans", path)
+            if self.repair:
+                try:
+                    os.remove(path)
+                    self._count_repair(True)
+                except OSError as e:
+                    logger.error(f"Could not delete orphan '{path}': {e}")
+                    self._count_repair(False)
+        return self.report
+
+    def _count_repair(self, repaired: Optional[bool]):
+        if repaired is True:
+            self.report.repaired += 1
+        elif repaired is False:
+            self.report.repair_errors += 1
+
+
+def check_tables(services: List, repair: bool = False, check_content: bool = True,
+                 min_age: float = 600, workers: int = 8) -> List[TableReport]:
+    """
+    Checks the given services' tables, several at once, each with its own session.
+    """
+    # Imported here: database.db_session builds the engine at import time
+    from database.db_session import SessionLocal
+
+    file_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fsck-files")
+
+    def check(service) -> TableReport:
+        with SessionLocal() as db:
+            return TableChecker(service, repair, check_content, min_age, file_pool).run(db)
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(len(services), settings.DUMP_MAX_PARALLEL_TABLES) or 1,
+                                thread_name_prefix="fsck-tables") as table_pool:
+            return list(table_pool.map(check, services))
+    finally:
+        file_pool.shutdown()
+
+
+def main(argv=None):
+    from app.routers.registry import ROUTER_CONFIGS
+
+    parser = argparse.ArgumentParser(description="Check the stored JSON files against the database.")
+    parser.add_argument("--tables", default=",".join(ROUTER_CONFIGS),
+                        help="Comma-separated table keys (default: all)")
+    parser.add_argument("--repair", action="store_true",
+                        help="Rewrite missing and mismatched files from the database and delete orphan files")
+    parser.add_argument("--skip-content", action="store_true",
+                        help="Only check that files exist, without reading them")
+    parser.add_argument("--min-age", type=float, default=600,
+                        help="Seconds a file must be old before it is reported as an orphan")
+    parser.add_argument("--workers", type=int, default=8, help="Threads reading and writing files")
+    parser.add_argument("--out", default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    tables = [name.strip() for name in args.tables.split(",") if name.strip()]
+    unknown = [name for name in tables if name not in ROUTER_CONFIGS]
+    if unknown:
+        parser.error(f"Unknown table(s): {', '.join(unknown)}")
+
+    reports = check_tables([ROUTER_CONFIGS[name].service for name in tables], repair=args.repair,
+                           check_content=not args.skip_content, min_age=args.min_age, workers=args.workers)
+    result = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "repair": args.repair,
+        "tables": [asdict(report) for report in reports],
+    }
+
+    output = json.dumps(result, indent=4)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    problems = sum(report.missing + report.orphans + report.mismatched for report in reports)
+    print(f"{problems} problem(s) found" + (f", {sum(r.repaired for r in reports)} repaired" if args.repair else ""),
+          file=sys.stderr)
+    # Non-zero when something is (still) wrong, for cron / CI
+    return 1 if (problems and not args.repair) or any(report.repair_errors for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Columns a table needs for a product hierarchy, from the root level down
+HIERARCHY_ID_COLUMNS = ("prod_id", "sub_prod_id", "sub_subprod_id")
+HIERARCHY_NAME_COLUMNS = ("prod_name", "sub_prod_name")
+
+# Stored id for records that have no value at a level (the key cannot be NULL)
+MISSING_ID = ""
+
+Path = Tuple[str, str, str]
+
+
+def hierarchy_path(record: Any) -> Path:
+    return tuple(MISSING_ID if getattr(record, column) is None else str(getattr(record, column))
+                 for column in HIERARCHY_ID_COLUMNS)
+
+
+def hierarchy_names(record: Any) -> Tuple[Optional[str], Optional[str]]:
+    return tuple(getattr(record, column) for column in HIERARCHY_NAME_COLUMNS)
+
+
+def hierarchy_deltas(removed: Optional[Any] = None,
+                     added: Optional[Any] = None) -> Tuple[Dict[Path, int], Dict[Path, Tuple[Optional[str], Optional[str]]]]:
+    """
+    The path count changes for a record going from `removed` to `added` (either may
+    be None for an insert / delete), and the names to store for the `added` path.
+    Both are empty when neither the path nor the names changed.
+    """
+    deltas = Counter()
+    if removed is not None:
+        deltas[hierarchy_path(removed)] -= 1
+    if added is not None:
+        deltas[hierarchy_path(added)] += 1
+    deltas = {path: delta for path, delta in deltas.items() if delta}
+
+    names = {}
+    if added is not None and (deltas or hierarchy_names(added) != hierarchy_names(removed)):
+        names[hierarchy_path(added)] = hierarchy_names(added)
+    return deltas, names
+
+
+def _id_order(value: Optional[str]):
+    # Numeric ids in numeric order, then other ids, then the records without an id
+    if value is None:
+        return (2, 0, "")
+    return (0, int(value), "") if value.isdigit() else (1, 0, value)
+
+
+def build_tree(paths: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Nests (prod_id, sub_prod_id, sub_subprod_id) path rows into
+    [{"id", "name", "count", "children": [...]}, ...]; a node's count is the sum of
+    its children's. Missing ids and names are returned as None.
+    """
+    roots: Dict[str, Dict[str, Any]] = {}
+    for row in paths:
+        ids = [row[column] or None for column in HIERARCHY_ID_COLUMNS]
+        names = [row[column] for column in HIERARCHY_NAME_COLUMNS] + [None]
+
+        siblings = roots
+        for level, (node_id, name) in enumerate(zip(ids, names)):
+            node = siblings.get(node_id)
+            if node is None:
+                node = siblings[node_id] = {"id": node_id, "name": name, "count": 0}
+                if level < len(HIERARCHY_ID_COLUMNS) - 1:
+                    node["children"] = {}
+            node["count"] += row["count"]
+            if node["name"] is None:
+                node["name"] = name
+            siblings = node.get("children")
+
+    def ordered(nodes: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        result = []
+        for node_id in sorted(nodes, key=_id_order):
+            node = nodes[node_id]
+            if "children" in node:
+                node["children"] = ordered(node["children"])
+            result.append(node)
+        return result
+
+    return ordered(roots)
+
+
+class HierarchyCache:
+    """
+    The last built tree of one table. `invalidate` is called after every committed
+    write that changed the hierarchy; a tree that was being rebuilt while a write
+    committed is returned but not kept, so a stale tree is never cached. `ttl`
+    bounds how long writes from other processes can go unseen.
+    """
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._tree: Optional[List[Dict[str, Any]]] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._tree = None
+
+    def get(self, load: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._tree is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return self._tree
+            generation = self._generation
+
+        tree = load()
+
+        with self._lock:
+            if generation == self._generation:
+                self._tree = tree
+                self._loaded_at = time.monotonic()
+        return tree
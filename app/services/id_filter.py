@@ -0,0 +1,104 @@
+import math
+import hashlib
+import logging
+import threading
+from typing import Iterable
+from uuid import UUID
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UniversalIdFilter:
+    """
+    In-process Bloom filter of the universal_ids known to be stored in one table.
+
+    It answers "definitely not stored" or "maybe stored". Upload uses it to prescreen
+    a batch: only the "maybe" ids are confirmed with one batched query, and confirmed
+    duplicates are rejected before any file is written.
+
+    Until `warm` has finished loading the table's ids the filter is not ready and
+    answers "maybe" for everything, which is always correct (every id is confirmed
+    against the database). Deleted ids cannot be removed from a Bloom filter; they
+    only cost a false positive that the confirming query filters out.
+    """
+    def __init__(self, name: str, capacity: int = None, error_rate: float = None):
+        self.name = name
+        self.error_rate = error_rate or settings.ID_FILTER_ERROR_RATE
+        self._lock = threading.Lock()
+        self.ready = False
+        self._allocate(capacity or settings.ID_FILTER_MIN_CAPACITY)
+
+    def _allocate(self, capacity: int):
+        """
+        Sizes the bit array for `capacity` ids at the configured false positive rate.
+        """
+        self.capacity = max(capacity, 1)
+        self.num_bits = max(8, int(-self.capacity * math.log(self.error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, universal_id: UUID):
+        # Double hashing (Kirsch-Mitzenmacher) over one 128-bit digest. The digest is
+        # used rather than the raw UUID so that non-random (e.g. v1) ids spread evenly too.
+        digest = hashlib.blake2b(universal_id.bytes, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, universal_id: UUID):
+        with self._lock:
+            for position in self._positions(universal_id):
+                self.bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+        if self.ready and self.count == self.capacity + 1:
+            logger.warning(f"Id filter '{self.name}' is over its capacity of {self.capacity}; "
+                           f"false positives (extra confirming lookups) will increase until the next warm-up.")
+
+    def might_contain(self, universal_id: UUID) -> bool:
+        if not self.ready:
+            return True
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(universal_id))
+
+    def warm(self, expected_count: int, universal_ids: Iterable[UUID]):
+        """
+        Rebuilds the filter from the table's ids. Ids added by concurrent writes while
+        warming land in the new bit array too, so nothing committed is missed.
+        """
+        with self._lock:
+            self.ready = False
+            self._allocate(max(settings.ID_FILTER_MIN_CAPACITY, expected_count * 2))
+
+        for universal_id in universal_ids:
+            self.add(universal_id)
+
+        self.ready = True
+        logger.info(f"Id filter '{self.name}' warmed with {self.count} ids "
+                    f"({len(self.bits) // 1024} KiB, {self.num_hashes} hashes).")
+
+
+def warm_filters_in_background(services: Iterable) -> threading.Thread:
+    """
+    Warms the id filter of every service on a daemon thread, one table at a time,
+    so application startup is not delayed by large tables.
+    """
+    # Imported here: database.db_session builds the engine at import time
+    from database.db_session import SessionLocal
+
+    def run():
+        for service in services:
+            db = SessionLocal()
+            try:
+                service.warm_id_filter(db)
+            except Exception as e:
+                logger.error(f"Could not warm id filter for '{service.storage_dir}': {e}")
+            finally:
+                db.close()
+
+    thread = threading.Thread(target=run, name="id-filter-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,188 @@
+"""
+On-demand yearly partitions of the partitioned case tables, and the repair of
+rows that landed in `<table>_default`.
+
+A row whose year has no partition yet (the partition could not be created in
+time, or `<table>_default` already held rows of that year) is stored in the
+default partition, and rows of that year keep going there. Moving them into a
+partition of their own:
+
+    python -m app.services.partitioning --tables sgst,cu [--years 2031] [--dry-run]
+
+Each year is moved in one transaction that blocks writes to the default partition
+(not to the other partitions) until it commits; run it outside the ingestion window.
+"""
+import sys
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.stored_datetimes import as_stored, session_time_zone
+
+from database.crud.base import PARTITION_COLUMN
+
+logger = logging.getLogger(__name__)
+
+
+def partition_date(item: BaseModel, ingestion_time: datetime, **context) -> datetime:
+    """
+    Partition key of a record: its circular_date, or the ingestion time when it has none.
+    """
+    return item.circular_date or ingestion_time
+
+
+class YearPartitions:
+    """
+    Creates the yearly partitions of one partitioned table on demand.
+
+    Postgres cannot create a partition from inside the INSERT that needs it, so the
+    services call `ensure` for a batch's years before they read or write its items.
+    Each year is checked against the database once per process; the partition itself
+    is created by the `vil_ensure_year_partition` function (migration 4e9a1c7d2b60) on
+    a connection of its own, so the DDL is committed at once and never part of an
+    ingestion transaction. Rows for a year whose partition could not be created land
+    in `<table>_default` (see `split_default`).
+    """
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self._known_years = set()
+        # year -> time.monotonic() before which a failed creation is not retried
+        self._retry_after: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def ensure(self, bind: Engine, value: Optional[datetime]):
+        """
+        Makes sure `value`'s year has a partition. Must not be called while a
+        transaction of the caller holds a lock on the table (e.g. after reading it):
+        the DDL would wait on that transaction until the lock timeout.
+        """
+        if value is None:
+            return
+        # The year of the value the column stores (an aware one in the session time zone)
+        value = as_stored(value, session_time_zone(bind))
+        if value.year in self._known_years:
+            return
+        # After a failure the year is not retried for a while: every row would hold up
+        # its batch for the whole lock timeout otherwise
+        if time.monotonic() < self._retry_after.get(value.year, 0.0):
+            return
+
+        with self._lock:
+            if value.year in self._known_years or time.monotonic() < self._retry_after.get(value.year, 0.0):
+                return
+
+            # Other sessions' open transactions on the table block the DDL. Their owners
+            # may be waiting on this thread (e.g. suspended on the same event loop), so the
+            # wait is bounded; on timeout the row goes to the default partition.
+            try:
+                with bind.connect() as connection:
+                    connection.execute(text(f"SET LOCAL lock_timeout = {int(settings.PARTITION_LOCK_TIMEOUT_MS)}"))
+                    partition_name = connection.execute(
+                        text("SELECT vil_ensure_year_partition(CAST(:parent AS regclass), :value)"),
+                        {"parent": self.table_name, "value": value}).scalar()
+                    connection.commit()
+            except OperationalError as e:
+                self._retry_after[value.year] = time.monotonic() + settings.PARTITION_RETRY_SECONDS
+                logger.warning(f"Could not create the {value.year} partition of '{self.table_name}' in time; "
+                               f"rows of {value.year} go to the default partition for the next "
+                               f"{settings.PARTITION_RETRY_SECONDS:g}s. Error: {e}")
+                return
+
+            if partition_name is None:
+                logger.warning(f"Could not create the {value.year} partition of '{self.table_name}' because "
+                               f"'{self.table_name}_default' already holds rows for that year. "
+                               f"New rows for {value.year} go to the default partition until they are moved "
+                               f"with `python -m app.services.partitioning --tables ...`.")
+            self._retry_after.pop(value.year, None)
+            self._known_years.add(value.year)
+
+    def default_years(self, connection: Connection) -> List[int]:
+        """
+        The years that have rows in `<table>_default`.
+        """
+        return list(connection.execute(text(
+            f"SELECT DISTINCT extract(year FROM {PARTITION_COLUMN})::int FROM {self.table_name}_default "
+            f"ORDER BY 1")).scalars())
+
+    def split_default(self, connection: Connection, year: int, key_columns: List[str]) -> int:
+        """
+        Moves `year`'s rows out of `<table>_default` into a new `<table>_y<year>`
+        partition and returns how many were moved. Runs in the caller's transaction,
+        which the caller commits. `key_columns` are the columns kept in `<table>_keys`.
+
+        Deleting the rows from the default partition fires the trigger that removes
+        their keys, and the new table is filled before it is attached (no trigger),
+        so the keys are written back once it is attached.
+        """
+        table = self.table_name
+        partition = f"{table}_y{year:04d}"
+        bounds = {"lower": datetime(year, 1, 1), "upper": datetime(year + 1, 1, 1)}
+        in_year = f"{PARTITION_COLUMN} >= :lower AND {PARTITION_COLUMN} < :upper"
+        columns = ", ".join(connection.execute(text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table AND is_generated = 'NEVER' "
+            "ORDER BY ordinal_position"), {"table": table}).scalars())
+
+        # No new rows of the year can reach the default partition while they are moved
+        connection.execute(text(f"LOCK TABLE {table}_default IN EXCLUSIVE MODE"))
+        connection.execute(text(f"CREATE TABLE {partition} (LIKE {table} INCLUDING DEFAULTS INCLUDING GENERATED)"))
+        moved = connection.execute(text(
+            f"INSERT INTO {partition} ({columns}) SELECT {columns} FROM {table}_default WHERE {in_year}"),
+            bounds).rowcount
+        connection.execute(text(f"DELETE FROM {table}_default WHERE {in_year}"), bounds)
+        connection.execute(text(
+            f"ALTER TABLE {table} ATTACH PARTITION {partition} "
+            f"FOR VALUES FROM ('{bounds['lower']:%Y-%m-%d}') TO ('{bounds['upper']:%Y-%m-%d}')"))
+        key_list = ", ".join(key_columns)
+        connection.execute(text(f"INSERT INTO {table}_keys ({key_list}) SELECT {key_list} FROM {partition}"))
+        return moved
+
+
+def main(argv=None):
+    from app.routers.registry import ROUTER_CONFIGS
+    from database.db_session import engine
+
+    partitioned = {name: config.service for name, config in ROUTER_CONFIGS.items()
+                   if config.service.partitions is not None}
+
+    parser = argparse.ArgumentParser(description="Move rows out of the default partition of the case tables.")
+    parser.add_argument("--tables", default=",".join(partitioned),
+                        help="Comma-separated table keys (default: all partitioned tables)")
+    parser.add_argument("--years", default=None, help="Comma-separated years (default: every year found)")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the years found in the default partitions")
+    args = parser.parse_args(argv)
+
+    tables = [name.strip() for name in args.tables.split(",") if name.strip()]
+    unknown = [name for name in tables if name not in partitioned]
+    if unknown:
+        parser.error(f"Not partitioned or unknown table(s): {', '.join(unknown)}")
+    only_years = {int(year) for year in args.years.split(",")} if args.years else None
+
+    for name in tables:
+        service = partitioned[name]
+        key_columns = [columns[0] for columns in service.crud.model.__table__.info["unique_keys"]]
+        with engine.connect() as connection:
+            years = [year for year in service.partitions.default_years(connection)
+                     if only_years is None or year in only_years]
+        for year in years:
+            if args.dry_run:
+                print(f"{name}: {year} has rows in the default partition", file=sys.stderr)
+                continue
+            with engine.begin() as connection:
+                moved = service.partitions.split_default(connection, year, key_columns)
+            print(f"{name}: moved {moved} row(s) of {year} into {service.partitions.table_name}_y{year:04d}",
+                  file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import REAL, and_, cast, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.pagination import encode_cursor, decode_cursor
+from app.services.base import BaseDataProcessingService
+
+logger = logging.getLogger(__name__)
+
+
+def search_all_tables(db: Session, *, sources: Sequence[Tuple[str, BaseDataProcessingService, str]],
+                      query_text: str, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                      cursor: Optional[str] = None, limit: int = 20) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Full-text search across several tables in one query.
+
+    `sources` is a list of (table key, service, date column). Each table contributes
+    its own top-`limit` matches (a GIN index lookup plus a small sort), the branches are
+    combined with UNION ALL and the best `limit` rows overall are returned.
+
+    Results are ordered by (rank DESC, table ASC, pk DESC); the cursor carries that
+    triple so every branch can skip what previous pages already returned.
+    Raises ValueError for an invalid cursor.
+    """
+    after = None
+    if cursor:
+        after = decode_cursor(cursor)
+        if len(after) != 3:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+
+    branches = []
+    for table_key, service, sort_field in sources:
+        table = service.crud.model.__table__
+        query, rank, pk_column = service.crud.search_select(
+            query_text=query_text, sort_field=sort_field, date_from=date_from, date_to=date_to)
+
+        if after is not None:
+            after_rank, after_table, after_pk = after
+            after_rank = cast(after_rank, REAL)
+            if table_key < after_table:
+                query = query.where(rank < after_rank)
+            elif table_key == after_table:
+                query = query.where(or_(rank < after_rank, and_(rank == after_rank, pk_column < after_pk)))
+            else:
+                query = query.where(rank <= after_rank)
+
+        branches.append(
+            query.with_only_columns(
+                literal(table_key).label("table"),
+                pk_column.label("pk"),
+                table.c.universal_id.label("universal_id"),
+                table.c[sort_field].label("date"),
+                rank.label("rank"))
+            .order_by(rank.desc(), pk_column.desc())
+            .limit(limit + 1))
+
+    if not branches:
+        return [], None
+
+    combined = union_all(*branches).subquery("matches")
+    query = (select(combined)
+             .order_by(combined.c.rank.desc(), combined.c.table.asc(), combined.c.pk.desc())
+             .limit(limit + 1))
+
+    rows = [dict(row._mapping) for row in db.execute(query)]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last["rank"], last["table"], last["pk"]])
+
+    return rows, next_cursor
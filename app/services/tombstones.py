@@ -0,0 +1,74 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TombstonePurger:
+    """
+    Physically removes the rows /delete tombstoned (DELETE_MODE "tombstone") once
+    they are older than `retention_days`, in batches of `batch_size` rows. Each batch
+    is one DELETE, found through the partial `deleted_at` index, and its files are
+    queued for the FileCollector in the same transaction. Until a tombstone is purged,
+    its universal_id and unique keys cannot be uploaded again.
+    """
+    def __init__(self, retention_days: float, interval: float, batch_size: int):
+        self.retention_days = retention_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.services: List = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict[str, int]:
+        """
+        Purges every table's expired tombstones and returns the rows removed per table.
+        """
+        # Imported here: database.db_session builds the engine at import time
+        from database.db_session import SessionLocal
+
+        before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=self.retention_days)
+        purged = {}
+        with SessionLocal() as db:
+            for service in self.services:
+                if "deleted_at" not in service.crud.model.__table__.c:
+                    continue
+                table_name = service.crud.model.__tablename__
+                while not self._stop.is_set():
+                    removed = service.purge_tombstones(db, before=before, limit=self.batch_size)
+                    purged[table_name] = purged.get(table_name, 0) + removed
+                    if removed < self.batch_size:
+                        break
+        return {table_name: count for table_name, count in purged.items() if count}
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                purged = self.run_once()
+                if purged:
+                    logger.info(f"Purged tombstones: {purged}")
+            except Exception as e:
+                logger.error(f"Tombstone purge failed: {e}")
+
+    def start(self, services: List) -> threading.Thread:
+        self.services = list(services)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tombstone-purge", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+
+tombstone_purger = TombstonePurger(
+    retention_days=settings.TOMBSTONE_RETENTION_DAYS,
+    interval=settings.TOMBSTONE_PURGE_INTERVAL_SECONDS,
+    batch_size=settings.TOMBSTONE_PURGE_BATCH_SIZE)
@@ -0,0 +1,6 @@
+"""
+Benchmark and load-test tooling for the VIL ingestion API.
+
+Everything in this package talks to a running API over HTTP (see `client.py`),
+so results reflect the full request path: validation, file writes and Postgres.
+"""
@@ -0,0 +1,87 @@
+"""
+Minimal keep-alive HTTP client built on the standard library.
+
+Each thread gets its own persistent connection, so the client can be shared by
+the concurrent load tester without any locking.
+"""
+import http.client
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+
+@dataclass
+class ApiResponse:
+    status: int
+    body: Any
+    elapsed: float
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class ApiClient:
+    """
+    Sends JSON requests to the ingestion API and times them.
+    """
+    def __init__(self, base_url: str, timeout: float = 600.0):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if self.scheme == "https" else 80)
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = conn_class(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def request(self, method: str, path: str, payload: Optional[Any] = None,
+                headers: Optional[Dict[str, str]] = None) -> ApiResponse:
+        """
+        Performs one request. Network errors are reported as status 0 so that
+        callers can count them alongside HTTP errors.
+        """
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request_headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        request_headers.update(headers or {})
+
+        start = time.perf_counter()
+        try:
+            conn = self._connection()
+            conn.request(method, f"{self.base_path}{path}", body=body, headers=request_headers)
+            raw = conn.getresponse()
+            data = raw.read()
+            elapsed = time.perf_counter() - start
+        except (OSError, http.client.HTTPException) as e:
+            self._reset()
+            return ApiResponse(status=0, body={"error": str(e)}, elapsed=time.perf_counter() - start)
+
+        try:
+            parsed = json.loads(data) if data else None
+        except ValueError:
+            parsed = data.decode("utf-8", errors="replace")
+
+        return ApiResponse(
+            status=raw.status,
+            body=parsed,
+            elapsed=elapsed,
+            headers={key.lower(): value for key, value in raw.getheaders()})
+
+    def post(self, path: str, payload: Any, headers: Optional[Dict[str, str]] = None) -> ApiResponse:
+        return self.request("POST", path, payload, headers)
+
+    def get(self, path: str) -> ApiResponse:
+        return self.request("GET", path)
@@ -0,0 +1,84 @@
+"""
+Compares two benchmark results files produced by `benchmarks.harness`.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 0.10]
+
+Prints per-table, per-phase throughput and latency deltas. Exits with status 1
+when any phase regresses by more than `--threshold` (throughput down, or p99 up).
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+METRICS = (
+    # (metric, higher_is_better)
+    ("items_per_s", True),
+    ("p50_ms", False),
+    ("p99_ms", False),
+)
+
+
+def _delta(old: float, new: float) -> float:
+    if old == 0:
+        return 0.0
+    return (new - old) / old
+
+
+def compare(baseline: Dict, candidate: Dict, threshold: float) -> Tuple[List[str], List[str]]:
+    """
+    Returns (report_lines, regressions).
+    """
+    lines: List[str] = []
+    regressions: List[str] = []
+
+    lines.append(f"baseline:  {baseline['meta'].get('git_commit', '?')[:12]} {baseline['meta'].get('label', '')}")
+    lines.append(f"candidate: {candidate['meta'].get('git_commit', '?')[:12]} {candidate['meta'].get('label', '')}")
+    lines.append("")
+    lines.append(f"{'table':<15}{'phase':<10}{'metric':<14}{'baseline':>12}{'candidate':>12}{'delta':>10}")
+
+    for table, phases in baseline["tables"].items():
+        if table not in candidate["tables"]:
+            lines.append(f"{table:<15}(missing from candidate)")
+            continue
+        for phase, old_stats in phases.items():
+            new_stats = candidate["tables"][table].get(phase)
+            if new_stats is None:
+                continue
+            for metric, higher_is_better in METRICS:
+                old_value, new_value = old_stats[metric], new_stats[metric]
+                delta = _delta(old_value, new_value)
+                lines.append(f"{table:<15}{phase:<10}{metric:<14}{old_value:>12}{new_value:>12}{delta:>+10.1%}")
+
+                worse = -delta if higher_is_better else delta
+                if worse > threshold:
+                    regressions.append(f"{table}/{phase}/{metric}: {delta:+.1%}")
+
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark results files.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative regression that fails the comparison (default 0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    lines, regressions = compare(baseline, candidate, args.threshold)
+    print("\n".join(lines))
+
+    if regressions:
+        print("\nREGRESSIONS:")
+        print("\n".join(f"  {regression}" for regression in regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
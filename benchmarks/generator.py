@@ -0,0 +1,253 @@
+"""
+Synthetic VIL dump generator.
+
+Produces payloads in the exact shape the `/upload`, `/update` and `/delete`
+endpoints expect (`{"name": ..., "data": [...]}`) for each of the ten schemas.
+Every generated item is validated against its Pydantic schema, so a schema
+change that the generator does not know about fails loudly instead of
+producing silently-invalid benchmark data.
+
+Synthetic rows are easy to recognise in a shared database:
+- `vil_id` values start at `VIL_ID_OFFSET`,
+- `circular_no` values start with `BENCH/`,
+- `file_path` values live under `bench/`.
+"""
+import copy
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Type
+
+from pydantic import BaseModel
+
+from app.schemas.article_schema import ArticleCreate
+from app.schemas.budgets_union_schema import BudgetsUnionCreate
+from app.schemas.ce_schema import CECreate
+from app.schemas.cgst_schema import CGSTCreate
+from app.schemas.cu_schema import CUCreate
+from app.schemas.dgft_schema import DGFTCreate
+from app.schemas.features_schema import FeaturesCreate
+from app.schemas.sgst_schema import SGSTCreate
+from app.schemas.st_schema import STCreate
+from app.schemas.vat_schema import VATCreate
+
+VIL_ID_OFFSET = 9_000_000_000
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """
+    Describes one ingestible table from the client's point of view.
+    """
+    # URL prefix the router is mounted under in main.py
+    endpoint: str
+
+    # Value expected in the payload's "name" field (RouterConfig.vil_table_name)
+    vil_name: str
+
+    # Pydantic schema used to validate each generated item
+    schema: Type[BaseModel]
+
+
+TABLES: Dict[str, TableSpec] = {
+    "articles": TableSpec("articles", "articles", ArticleCreate),
+    "budgets_union": TableSpec("budgets_union", "budgets_union", BudgetsUnionCreate),
+    "ce": TableSpec("ce", "casedata_ce", CECreate),
+    "cgst": TableSpec("cgst", "casedata_cgst", CGSTCreate),
+    "cu": TableSpec("cu", "casedata_cu", CUCreate),
+    "dgft": TableSpec("dgft", "casedata_dgft", DGFTCreate),
+    "features": TableSpec("features", "features", FeaturesCreate),
+    "sgst": TableSpec("sgst", "casedata_sgst", SGSTCreate),
+    "st": TableSpec("st", "casedata_st", STCreate),
+    "vat": TableSpec("vat", "casedata_vat", VATCreate),
+}
+
+
+@dataclass(frozen=True)
+class DumpProfile:
+    """
+    Shape of a generated workload for one table.
+    """
+    # Number of items in the initial (fresh) dump
+    size: int
+
+    # Fraction of the re-sent dump that repeats items from the initial dump
+    duplicate_ratio: float = 0.5
+
+    # Fraction of the update dump whose content differs from the initial dump
+    changed_ratio: float = 0.2
+
+    # Seed for the random generator; the same seed always yields the same dumps
+    seed: int = 42
+
+
+# --- Vocabularies ---
+
+_WORDS = (
+    "assessee tribunal appeal order refund credit input tax classification valuation "
+    "exemption notification penalty demand interest adjudication show cause notice "
+    "commissioner appellate authority customs duty excise service goods import export "
+    "rebate drawback circular clarification amendment section rule schedule tariff "
+    "jurisdiction limitation remand hearing evidence proceedings transaction supply "
+    "registration return assessment audit investigation seizure confiscation"
+).split()
+
+_FIRST_NAMES = ("Anil", "Priya", "Rahul", "Sunita", "Vikram", "Meera", "Arjun", "Kavita", "Rohan", "Neha")
+_LAST_NAMES = ("Sharma", "Iyer", "Gupta", "Reddy", "Mehta", "Nair", "Kapoor", "Das", "Joshi", "Khan")
+_COMPANY_SUFFIXES = ("Pvt Ltd", "Ltd", "Industries", "Traders", "Exports", "Enterprises")
+_COURTS = ("CESTAT-DEL", "CESTAT-MUM", "HC-DEL", "HC-BOM", "SC", "AAR-KAR", "AAAR-TN")
+_STATES = ("MH", "KA", "TN", "DL", "GJ", "UP", "WB", "RJ", "KL", "TG")
+
+# prod_id -> (prod_name, {sub_prod_id: (sub_prod_name, [sub_subprod_id, ...])})
+_PRODUCT_TREE = {
+    "1": ("Customs", {"11": ("Valuation", ["111", "112"]), "12": ("Classification", ["121"])}),
+    "2": ("Central Excise", {"21": ("CENVAT Credit", ["211", "212", "213"]), "22": ("Refund", ["221"])}),
+    "3": ("GST", {"31": ("Input Tax Credit", ["311", "312"]), "32": ("Place of Supply", ["321", "322"])}),
+    "4": ("Service Tax", {"41": ("Export of Services", ["411"]), "42": ("Abatement", ["421", "422"])}),
+}
+
+
+class _ItemFactory:
+    """
+    Builds one realistic item at a time for a given table.
+    Field values are chosen by field name so the same rules apply across schemas.
+    """
+    def __init__(self, table: str, rng: random.Random):
+        self.table = table
+        self.spec = TABLES[table]
+        self.rng = rng
+
+    def _words(self, low: int, high: int) -> str:
+        count = self.rng.randint(low, high)
+        return " ".join(self.rng.choice(_WORDS) for _ in range(count)).capitalize() + "."
+
+    def _person(self) -> str:
+        return f"{self.rng.choice(_FIRST_NAMES)} {self.rng.choice(_LAST_NAMES)}"
+
+    def _date(self) -> datetime:
+        start = datetime(1995, 1, 1)
+        return start + timedelta(days=self.rng.randint(0, 30 * 365), seconds=self.rng.randint(0, 86399))
+
+    def _uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def build(self, serial: int) -> Dict[str, Any]:
+        """
+        Builds the item with the given serial number. Serial numbers drive every
+        unique column, so two items with different serials never collide.
+        """
+        vil_id = VIL_ID_OFFSET + serial
+        circular_date = self._date()
+        year = circular_date.year
+
+        prod_id = self.rng.choice(list(_PRODUCT_TREE))
+        prod_name, sub_products = _PRODUCT_TREE[prod_id]
+        sub_prod_id = self.rng.choice(list(sub_products))
+        sub_prod_name, sub_sub_ids = sub_products[sub_prod_id]
+
+        created_dt = circular_date + timedelta(days=self.rng.randint(0, 30))
+
+        values = {
+            "universal_id": self._uuid(),
+            "vil_id": vil_id,
+            "prod_id": prod_id,
+            "prod_name": prod_name,
+            "sub_prod_id": sub_prod_id,
+            "sub_prod_name": sub_prod_name,
+            "sub_subprod_id": self.rng.choice(sub_sub_ids),
+            "state_id": self.rng.choice(_STATES),
+            "circular_date": circular_date,
+            "article_date": circular_date,
+            "feature_date": circular_date,
+            "eq_citation": f"{year}-VIL-{serial}-{self.rng.choice(_COURTS)}",
+            "section_no": f"Section {self.rng.randint(1, 170)}",
+            "rule_no": f"Rule {self.rng.randint(1, 140)}",
+            "igst_section_no": f"Section {self.rng.randint(1, 25)}",
+            "igst_rule_no": f"Rule {self.rng.randint(1, 10)}",
+            "circular_no": f"BENCH/{serial}/{year}-{self.table.upper()}",
+            "case_no": f"Appeal No. {self.rng.randint(100, 99999)}/{year}",
+            "order_no": f"Final Order No. {self.rng.randint(100, 99999)}/{year}",
+            "judge_name": self._person(),
+            "party_name": f"{self._person()} {self.rng.choice(_COMPANY_SUFFIXES)}",
+            "author": self._person(),
+            "cir_subject": self._words(8, 40),
+            "subject": self._words(6, 20),
+            "summary": self._words(150, 600),
+            "file_path": f"bench/{self.table}/{self.table}{vil_id}.htm",
+            "created_dt": created_dt,
+            "updated_dt": created_dt,
+        }
+
+        item = {}
+        for field_name in self.spec.schema.model_fields:
+            item[field_name] = values.get(field_name, self._words(1, 3))
+
+        # Round-trip through the schema so the payload is guaranteed valid and
+        # serialised exactly the way the exporter would send it.
+        return self.spec.schema(**item).model_dump(mode="json")
+
+    def mutate(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns a copy of `item` with realistic content changes (same identity).
+        """
+        changed = copy.deepcopy(item)
+        for text_field in ("cir_subject", "summary", "subject"):
+            if text_field in changed:
+                changed[text_field] = self._words(8, 40)
+        if "updated_dt" in changed:
+            changed["updated_dt"] = self._date().isoformat()
+        return self.spec.schema(**changed).model_dump(mode="json")
+
+
+def _envelope(table: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"name": TABLES[table].vil_name, "data": items}
+
+
+def generate_dumps(table: str, profile: DumpProfile) -> Dict[str, Dict[str, Any]]:
+    """
+    Generates the full set of payloads used by one benchmark run for a table:
+
+    - "initial": `profile.size` fresh items, for `/upload`.
+    - "resend":  same size, `duplicate_ratio` of it repeated from "initial",
+                 the rest fresh. Models an exporter re-sending a dump.
+    - "update":  every item of "initial", `changed_ratio` of them with new
+                 content. Models a nightly `/update` push.
+    - "delete":  every universal_id from "initial" and "resend", for `/delete`.
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown table '{table}'. Known tables: {', '.join(sorted(TABLES))}")
+
+    rng = random.Random(f"{profile.seed}:{table}")
+    factory = _ItemFactory(table, rng)
+
+    initial = [factory.build(serial) for serial in range(profile.size)]
+
+    duplicate_count = int(round(profile.size * profile.duplicate_ratio))
+    duplicates = rng.sample(initial, k=min(duplicate_count, len(initial)))
+    fresh = [factory.build(profile.size + offset) for offset in range(profile.size - len(duplicates))]
+    resend = duplicates + fresh
+    rng.shuffle(resend)
+
+    changed_count = int(round(profile.size * profile.changed_ratio))
+    changed_indexes = set(rng.sample(range(len(initial)), k=min(changed_count, len(initial))))
+    update = [
+        factory.mutate(item) if index in changed_indexes else copy.deepcopy(item)
+        for index, item in enumerate(initial)
+    ]
+
+    all_ids = list(dict.fromkeys(item["universal_id"] for item in initial + resend))
+
+    return {
+        "initial": _envelope(table, initial),
+        "resend": _envelope(table, resend),
+        "update": _envelope(table, update),
+        "delete": {"name": TABLES[table].vil_name, "universal_id": all_ids},
+    }
+
+
+def batched(items: List[Any], batch_size: int) -> List[List[Any]]:
+    """
+    Splits a list into consecutive batches of at most `batch_size` items.
+    """
+    return [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
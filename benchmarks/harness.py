@@ -0,0 +1,169 @@
+"""
+Ingestion benchmark harness.
+
+Runs a fixed sequence of phases against a running API (backed by a local
+Postgres) for each selected table and writes a JSON results file:
+
+    initial  POST /<table>/upload  fresh items
+    resend   POST /<table>/upload  dump with `duplicate_ratio` repeated items
+    update   POST /<table>/update  dump with `changed_ratio` modified items
+    delete   POST /<table>/delete  every id created above
+
+Usage:
+    python -m benchmarks.harness --base-url http://localhost:8024 \\
+        --tables cu,sgst,articles --size 2000 --batch-size 500 --out bench.json
+
+Compare two results files with `python -m benchmarks.compare`.
+
+Each phase also records the SQL statements the API reported for it (the
+X-SQL-Statements response header) per item sent. With
+`--max-statements-per-item N` the harness exits with status 1 when any phase
+needed more than N statements per item, which guards the write path against
+round trips creeping back in.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from benchmarks.client import ApiClient
+from benchmarks.generator import TABLES, DumpProfile, batched, generate_dumps
+from benchmarks.stats import git_commit, summarize
+
+PHASES = (
+    ("initial", "upload"),
+    ("resend", "upload"),
+    ("update", "update"),
+    ("delete", "delete"),
+)
+
+
+def _run_phase(client: ApiClient, table: str, operation: str, payload: Dict, batch_size: int) -> Dict:
+    """
+    Sends one phase's payload in batches, sequentially, and summarises it.
+    """
+    endpoint = TABLES[table].endpoint
+    list_key = "universal_id" if operation == "delete" else "data"
+    items = payload[list_key]
+
+    latencies: List[float] = []
+    statuses: List[int] = []
+    item_failures = 0
+    statements: Optional[int] = 0
+
+    phase_start = time.perf_counter()
+    for batch in batched(items, batch_size):
+        body = dict(payload)
+        body[list_key] = batch
+        response = client.post(f"/{endpoint}/{operation}", body)
+        latencies.append(response.elapsed)
+        statuses.append(response.status)
+        if isinstance(response.body, dict):
+            item_failures += len(response.body.get("failed_items", []))
+        # None once a response lacks the header (counter disabled on the API)
+        counted = response.headers.get("x-sql-statements")
+        statements = statements + int(counted) if statements is not None and counted is not None else None
+    wall_time = time.perf_counter() - phase_start
+
+    summary = summarize(latencies, len(items), wall_time, statuses)
+    summary["item_failures"] = item_failures
+    summary["sql_statements"] = statements
+    summary["statements_per_item"] = (round(statements / len(items), 2)
+                                      if statements is not None and items else None)
+    return summary
+
+
+def statement_budget_violations(results: Dict, max_per_item: float) -> List[str]:
+    """
+    The phases whose statements per item exceed `max_per_item`.
+    """
+    violations = []
+    for table, phases in results["tables"].items():
+        for phase, stats in phases.items():
+            per_item = stats.get("statements_per_item")
+            if per_item is not None and per_item > max_per_item:
+                violations.append(f"{table}/{phase}: {per_item} statements per item (max {max_per_item})")
+    return violations
+
+
+def run_table(client: ApiClient, table: str, profile: DumpProfile, batch_size: int) -> Dict:
+    """
+    Runs every phase for one table. Leftovers from an interrupted previous run
+    (same seed, same ids) are deleted first so runs stay reproducible.
+    """
+    dumps = generate_dumps(table, profile)
+
+    # Pre-clean: not timed, failures (ids not found) are expected
+    for batch in batched(dumps["delete"]["universal_id"], batch_size):
+        client.post(f"/{TABLES[table].endpoint}/delete", {"name": TABLES[table].vil_name, "universal_id": batch})
+
+    results = {}
+    for phase, operation in PHASES:
+        print(f"  {table}: {phase} ({operation}) ...", file=sys.stderr)
+        results[phase] = _run_phase(client, table, operation, dumps[phase], batch_size)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the VIL ingestion endpoints.")
+    parser.add_argument("--base-url", default="http://localhost:8024")
+    parser.add_argument("--tables", default=",".join(TABLES),
+                        help="Comma-separated table keys (default: all)")
+    parser.add_argument("--size", type=int, default=1000, help="Items in the initial dump per table")
+    parser.add_argument("--batch-size", type=int, default=500, help="Items per request")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.5)
+    parser.add_argument("--changed-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="", help="Free-form label stored in the results file")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--max-statements-per-item", type=float, default=None,
+                        help="Exit with status 1 when a phase needs more SQL statements per item")
+    args = parser.parse_args(argv)
+
+    tables = [name.strip() for name in args.tables.split(",") if name.strip()]
+    unknown = [name for name in tables if name not in TABLES]
+    if unknown:
+        parser.error(f"Unknown table(s): {', '.join(unknown)}")
+
+    profile = DumpProfile(
+        size=args.size,
+        duplicate_ratio=args.duplicate_ratio,
+        changed_ratio=args.changed_ratio,
+        seed=args.seed)
+    client = ApiClient(args.base_url)
+
+    results = {
+        "meta": {
+            "label": args.label,
+            "git_commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "base_url": args.base_url,
+            "batch_size": args.batch_size,
+            "profile": profile.__dict__,
+        },
+        "tables": {},
+    }
+
+    for table in tables:
+        results["tables"][table] = run_table(client, table, profile, args.batch_size)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+
+    print(f"Results written to {args.out}", file=sys.stderr)
+
+    if args.max_statements_per_item is not None:
+        violations = statement_budget_violations(results, args.max_statements_per_item)
+        for violation in violations:
+            print(f"Statement budget exceeded: {violation}", file=sys.stderr)
+        if violations:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Concurrent multi-client load tester.
+
+Simulates several exporters pushing different tables at the same time (the
+overnight pattern is `cu`, `sgst` and `vat` in parallel). For every table,
+`--concurrency` client threads send the table's dump in batches: first all
+`/upload` batches, then all `/update` batches. All tables run at once.
+
+While the load runs, a sampler polls `GET /health/db-pool` so the report shows
+how close the API's SQLAlchemy pool came to exhaustion.
+
+A batch refused with `429` by the API's admission control is sent again after
+the `Retry-After` it came with. Refusals are reported as `throttled`, apart
+from the errors; only the final answer to a batch counts towards latencies and
+statuses.
+
+Usage:
+    python -m benchmarks.loadtest --base-url http://localhost:8024 \\
+        --tables cu,sgst,vat --concurrency 4 --size 5000 --batch-size 250 --out load.json
+
+Generated rows are deleted again at the end unless `--keep-data` is given.
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from benchmarks.client import ApiClient, ApiResponse
+from benchmarks.generator import TABLES, DumpProfile, batched, generate_dumps
+from benchmarks.stats import git_commit, summarize
+
+# Statuses the API uses for a request that was processed (possibly partially)
+OK_STATUSES = {200, 201, 207}
+# Wait before resending a refused batch when the 429 has no usable Retry-After
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class _Recorder:
+    """
+    Thread-safe collector of request outcomes, grouped by (table, operation).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[tuple, List[float]] = {}
+        self.statuses: Dict[tuple, List[int]] = {}
+        self.items: Dict[tuple, int] = {}
+        self.item_failures: Dict[tuple, int] = {}
+        self.throttled: Dict[tuple, int] = {}
+        # When each key's first request started and its last one finished (perf_counter)
+        self.first_start: Dict[tuple, float] = {}
+        self.last_end: Dict[tuple, float] = {}
+
+    def record(self, key: tuple, response: ApiResponse, item_count: int):
+        failures = 0
+        if isinstance(response.body, dict):
+            failures = len(response.body.get("failed_items", []))
+        end = time.perf_counter()
+        with self._lock:
+            self.first_start[key] = min(self.first_start.get(key, end), end - response.elapsed)
+            self.last_end[key] = max(self.last_end.get(key, end), end)
+            self.latencies.setdefault(key, []).append(response.elapsed)
+            self.statuses.setdefault(key, []).append(response.status)
+            self.items[key] = self.items.get(key, 0) + item_count
+            self.item_failures[key] = self.item_failures.get(key, 0) + failures
+
+    def record_throttled(self, key: tuple):
+        with self._lock:
+            self.throttled[key] = self.throttled.get(key, 0) + 1
+
+
+def _retry_after(response: ApiResponse) -> float:
+    """
+    Seconds to wait before resending a batch refused with 429.
+    """
+    try:
+        return max(float(response.headers.get("retry-after", "")), 0.0)
+    except ValueError:
+        return DEFAULT_RETRY_AFTER
+
+
+class _PoolSampler(threading.Thread):
+    """
+    Polls the API's pool status endpoint until stopped.
+    """
+    def __init__(self, client: ApiClient, interval: float):
+        super().__init__(daemon=True)
+        self.client = client
+        self.interval = interval
+        self.samples: List[Dict] = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            response = self.client.get("/health/db-pool")
+            if response.status == 200 and isinstance(response.body, dict):
+                self.samples.append(response.body)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def report(self) -> Dict:
+        if not self.samples or "capacity" not in self.samples[0]:
+            return {"samples": len(self.samples)}
+        saturations = [sample["saturation"] for sample in self.samples]
+        return {
+            "samples": len(self.samples),
+            "capacity": self.samples[0]["capacity"],
+            "max_checked_out": max(sample["checked_out"] for sample in self.samples),
+            "max_overflow": max(sample["overflow"] for sample in self.samples),
+            "mean_saturation": round(sum(saturations) / len(saturations), 3),
+            "saturated_fraction": round(sum(1 for value in saturations if value >= 1.0) / len(saturations), 3),
+        }
+
+
+def _drive_table(client: ApiClient, recorder: _Recorder, table: str, dumps: Dict,
+                 batch_size: int, concurrency: int):
+    """
+    Runs one exporter: `concurrency` threads drain the upload batches, then
+    the update batches, of a single table.
+    """
+    endpoint = TABLES[table].endpoint
+    vil_name = TABLES[table].vil_name
+
+    for phase, operation in (("initial", "upload"), ("update", "update")):
+        jobs: "queue.Queue[List[Dict]]" = queue.Queue()
+        for batch in batched(dumps[phase]["data"], batch_size):
+            jobs.put(batch)
+
+        def worker():
+            while True:
+                try:
+                    batch = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                while True:
+                    response = client.post(f"/{endpoint}/{operation}", {"name": vil_name, "data": batch})
+                    if response.status != 429:
+                        break
+                    recorder.record_throttled((table, operation))
+                    time.sleep(_retry_after(response))
+                recorder.record((table, operation), response, len(batch))
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(concurrency):
+                executor.submit(worker)
+
+
+def _cleanup(client: ApiClient, tables: List[str], all_dumps: Dict[str, Dict], batch_size: int):
+    for table in tables:
+        ids = all_dumps[table]["delete"]["universal_id"]
+        for batch in batched(ids, batch_size):
+            client.post(f"/{TABLES[table].endpoint}/delete", {"name": TABLES[table].vil_name, "universal_id": batch})
+
+
+def _summarize_key(recorder: _Recorder, key: tuple) -> Dict:
+    """
+    Summarises one (table, operation). Throughput is over the key's own active
+    time, from its first request to its last response, not the whole run.
+    """
+    statuses = recorder.statuses[key]
+    active_time = recorder.last_end[key] - recorder.first_start[key]
+    summary = summarize(recorder.latencies[key], recorder.items[key], active_time, statuses)
+    failed_requests = sum(1 for status in statuses if status not in OK_STATUSES)
+    summary["request_error_rate"] = round(failed_requests / len(statuses), 4) if statuses else 0.0
+    summary["throttled"] = recorder.throttled.get(key, 0)
+    summary["item_failures"] = recorder.item_failures[key]
+    summary["item_error_rate"] = round(recorder.item_failures[key] / recorder.items[key], 4) if recorder.items[key] else 0.0
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent multi-table load test for the VIL ingestion API.")
+    parser.add_argument("--base-url", default="http://localhost:8024")
+    parser.add_argument("--tables", default="cu,sgst,vat", help="Comma-separated table keys pushed in parallel")
+    parser.add_argument("--concurrency", type=int, default=2, help="Concurrent clients per table")
+    parser.add_argument("--size", type=int, default=2000, help="Items per table")
+    parser.add_argument("--batch-size", type=int, default=250, help="Items per request")
+    parser.add_argument("--changed-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--pool-sample-interval", type=float, default=0.25, help="Seconds between pool samples")
+    parser.add_argument("--keep-data", action="store_true", help="Do not delete generated rows at the end")
+    parser.add_argument("--out", default="loadtest_results.json")
+    args = parser.parse_args(argv)
+
+    tables = [name.strip() for name in args.tables.split(",") if name.strip()]
+    unknown = [name for name in tables if name not in TABLES]
+    if unknown:
+        parser.error(f"Unknown table(s): {', '.join(unknown)}")
+
+    profile = DumpProfile(size=args.size, duplicate_ratio=0.0, changed_ratio=args.changed_ratio, seed=args.seed)
+    all_dumps = {table: generate_dumps(table, profile) for table in tables}
+    client = ApiClient(args.base_url)
+
+    # Start from a clean slate for the generated ids
+    _cleanup(client, tables, all_dumps, args.batch_size)
+
+    recorder = _Recorder()
+    sampler = _PoolSampler(ApiClient(args.base_url, timeout=10), args.pool_sample_interval)
+
+    print(f"Driving {len(tables)} table(s) x {args.concurrency} client(s) ...", file=sys.stderr)
+    sampler.start()
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(
+            target=_drive_table,
+            args=(client, recorder, table, all_dumps[table], args.batch_size, args.concurrency))
+        for table in tables
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - start
+    sampler.stop()
+
+    per_table = {}
+    for table in tables:
+        per_table[table] = {
+            operation: _summarize_key(recorder, (table, operation))
+            for operation in ("upload", "update")
+            if (table, operation) in recorder.latencies
+        }
+
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    all_statuses = [value for values in recorder.statuses.values() for value in values]
+    total_items = sum(recorder.items.values())
+    overall = summarize(all_latencies, total_items, wall_time, all_statuses)
+    overall["request_error_rate"] = round(
+        sum(1 for status in all_statuses if status not in OK_STATUSES) / len(all_statuses), 4) if all_statuses else 0.0
+    overall["throttled"] = sum(recorder.throttled.values())
+    overall["item_failures"] = sum(recorder.item_failures.values())
+
+    results = {
+        "meta": {
+            "git_commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "base_url": args.base_url,
+            "tables": tables,
+            "concurrency_per_table": args.concurrency,
+            "batch_size": args.batch_size,
+            "profile": profile.__dict__,
+        },
+        "overall": overall,
+        "tables": per_table,
+        "db_pool": sampler.report(),
+    }
+
+    if not args.keep_data:
+        _cleanup(client, tables, all_dumps, args.batch_size)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+
+    print(json.dumps({"overall": overall, "db_pool": results["db_pool"]}, indent=4))
+    print(f"Results written to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Small statistics helpers shared by the benchmark harness and the load tester.
+"""
+import math
+import subprocess
+from collections import Counter
+from typing import Dict, Iterable, List
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile. Returns 0.0 for an empty list.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies: List[float], items: int, wall_time: float, statuses: Iterable[int]) -> Dict:
+    """
+    Summarises one phase: request latencies (seconds), number of items sent
+    and total wall-clock time of the phase.
+    """
+    return {
+        "requests": len(latencies),
+        "items": items,
+        "duration_s": round(wall_time, 4),
+        "items_per_s": round(items / wall_time, 2) if wall_time > 0 else 0.0,
+        "requests_per_s": round(len(latencies) / wall_time, 2) if wall_time > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else 0.0,
+        "status_counts": {str(code): count for code, count in sorted(Counter(statuses).items())},
+    }
+
+
+def git_commit() -> str:
+    """
+    Commit hash of the working tree the benchmark runs from, for results files.
+    """
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
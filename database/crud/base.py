@@ -1,7 +1,18 @@
-from typing import Any, Dict, Generic, Type, TypeVar, Optional
+from typing import Any, Dict, Generic, Iterator, List, Sequence, Tuple, Type, TypeVar, Optional
+from datetime import datetime
+from sqlalchemy import or_, select, update, delete, func, literal
+from sqlalchemy.sql import ColumnElement, Select
 from sqlalchemy.orm import Session
 from database.db_session import Base
 
+# Postgres text search configuration used by the generated `search_vector` columns
+TEXT_SEARCH_CONFIG = "english"
+
+# Partitioned tables are range-partitioned on PARTITION_COLUMN, which holds
+# PARTITION_SOURCE_COLUMN (or ingestion_dt when that is NULL)
+PARTITION_COLUMN = "partition_dt"
+PARTITION_SOURCE_COLUMN = "circular_date"
+
 # Define custom types for SQLAlchemy model and Pydantic schema
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -48,13 +59,13 @@ class CRUDBase(Generic[ModelType]):
         """
         Retrieves a record by its vil_id.
         """
-        return db.query(self.model).filter(self.model.vil_id == vil_id).first()
+        return db.query(self.model).filter(self.model.vil_id == vil_id, *self.live_conditions).first()
     
     def get_by_universal_id(self, db: Session, universal_id: Any) -> Optional[ModelType]:
         """
         Retrieves a record by its universal_id.
         """
-        return db.query(self.model).filter(self.model.universal_id == universal_id).first()
+        return db.query(self.model).filter(self.model.universal_id == universal_id, *self.live_conditions).first()
 
     def update(self, db: Session, *, db_obj: ModelType, obj_in: Dict[str, Any]) -> ModelType:
         """
@@ -71,3 +82,308 @@ class CRUDBase(Generic[ModelType]):
         
         db.add(db_obj)
         return db_obj
+
+    def update_returning(self, db: Session, *, match: ColumnElement, values: Dict[str, Any], columns: List[str],
+                         old_columns: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Updates the first live row matching `match` with `values` in a single statement,
+        UPDATE ... FROM (SELECT ... FOR UPDATE) ... RETURNING, instead of loading the
+        row, updating it and reloading it. Returns the row's `columns` as updated and
+        its `old_columns` as they were before (keyed "old_<name>"), or None when no
+        live row matches. Like `update`, the primary key is never changed.
+        Does NOT commit.
+        """
+        table = self.model.__table__
+        pk_name = self.model.__mapper__.primary_key[0].name
+        pk_columns = [table.c[column.name] for column in self.model.__mapper__.primary_key]
+        previous = (select(*pk_columns, *[table.c[name].label(f"old_{name}") for name in old_columns])
+                    .where(match, *self.live_conditions)
+                    .limit(1)
+                    .with_for_update()
+                    .subquery("previous"))
+        statement = (update(table)
+                     .where(*[column == previous.c[column.name] for column in pk_columns])
+                     .values({name: value for name, value in values.items() if name != pk_name})
+                     .returning(*[table.c[name] for name in columns],
+                                *[previous.c[f"old_{name}"] for name in old_columns]))
+        row = db.execute(statement).first()
+        return dict(row._mapping) if row is not None else None
+
+    @property
+    def column_names(self) -> List[str]:
+        """
+        Names of the stored data columns of the underlying table, in table order.
+        Generated columns (e.g. `search_vector`) and columns marked `info={"internal": True}`
+        (e.g. the partition key `partition_dt`) are left out.
+        """
+        return [column.name for column in self.model.__table__.columns
+                if column.computed is None and not column.info.get("internal")]
+
+    @property
+    def live_conditions(self) -> List[ColumnElement]:
+        """
+        Conditions leaving out tombstoned rows (`deleted_at` set, see DELETE_MODE).
+        Empty for tables without a `deleted_at` column. The partial indexes of the
+        tables that have one require these conditions in the query to be used.
+        """
+        table = self.model.__table__
+        return [table.c.deleted_at.is_(None)] if "deleted_at" in table.c else []
+
+    def range_conditions(self, column_name: str, start: Optional[datetime], end: Optional[datetime]) -> List[ColumnElement]:
+        """
+        Conditions for `start <= column < end` (either bound may be None).
+
+        On partitioned tables a range on PARTITION_SOURCE_COLUMN is repeated on the
+        partition key, so Postgres can skip the partitions outside the range. This is
+        exact: a row whose circular_date is in the range has partition_dt == circular_date.
+        """
+        table = self.model.__table__
+        columns = [table.c[column_name]]
+        if column_name == PARTITION_SOURCE_COLUMN and PARTITION_COLUMN in table.c:
+            columns.append(table.c[PARTITION_COLUMN])
+
+        conditions = []
+        for column in columns:
+            if start is not None:
+                conditions.append(column >= start)
+            if end is not None:
+                conditions.append(column < end)
+        return conditions
+
+    def get_row_by_universal_id(self, db: Session, universal_id: Any, *, columns: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Retrieves only the requested columns of a record, as a plain dictionary.
+        """
+        table = self.model.__table__
+        query = (select(*[table.c[name] for name in columns])
+                 .where(table.c.universal_id == universal_id, *self.live_conditions))
+        row = db.execute(query).first()
+        return dict(row._mapping) if row else None
+
+    def get_page(self, db: Session, *, sort_field: str, columns: List[str],
+                 after: Optional[Sequence[Any]] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Keyset (cursor) pagination ordered by (sort_field, primary key).
+
+        `after` is the (sort value, primary key) pair of the last row of the previous page.
+        The ordering matches the single-column index on `sort_field` (ASC, NULLS LAST),
+        and the page after a non-NULL sort value is bounded by `sort_field >= value`, so
+        each page is an index range scan starting at the cursor instead of an OFFSET skip.
+        Rows whose sort value is NULL come last, ordered by primary key; they are read
+        (with a second query) only once the non-NULL rows are exhausted.
+        """
+        table = self.model.__table__
+        pk_column = table.c[self.model.__mapper__.primary_key[0].name]
+        sort_column = table.c[sort_field]
+        selected = [table.c[name] for name in columns]
+
+        query = (select(*selected)
+                 .where(*self.live_conditions)
+                 .order_by(sort_column.asc().nulls_last(), pk_column.asc())
+                 .limit(limit))
+        if after is None:
+            return [dict(row._mapping) for row in db.execute(query)]
+
+        sort_value, pk_value = after
+        rows = []
+        if sort_value is not None:
+            # The `>= sort_value` bound (repeated on the partition key, see range_conditions)
+            # is where the index scan starts; the OR only skips the rows of the cursor's
+            # own sort value up to its primary key
+            query = query.where(*self.range_conditions(sort_field, sort_value, None),
+                                or_(sort_column > sort_value, pk_column > pk_value))
+            rows = [dict(row._mapping) for row in db.execute(query)]
+            if len(rows) == limit:
+                return rows
+            # The non-NULL rows are exhausted: the page continues with the NULL tail
+            pk_value = None
+
+        tail = (select(*selected)
+                .where(sort_column.is_(None), *self.live_conditions)
+                .order_by(pk_column.asc())
+                .limit(limit - len(rows)))
+        if pk_value is not None:
+            tail = tail.where(pk_column > pk_value)
+        return rows + [dict(row._mapping) for row in db.execute(tail)]
+
+    def search_select(self, *, query_text: str, sort_field: str,
+                      date_from: Optional[datetime] = None,
+                      date_to: Optional[datetime] = None) -> Tuple[Select, ColumnElement, ColumnElement]:
+        """
+        Builds (without executing) a full-text search over the generated `search_vector`
+        column, which is backed by a GIN index. `query_text` uses web search syntax
+        ("quoted phrases", OR, -excluded).
+
+        Returns (select, rank expression, primary key column). The select has the match
+        and date filters applied but no columns chosen and no ordering; callers pick the
+        columns with `with_only_columns` and add their own keyset condition.
+        """
+        table = self.model.__table__
+        pk_column = table.c[self.model.__mapper__.primary_key[0].name]
+
+        ts_query = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, query_text)
+        rank = func.ts_rank(table.c.search_vector, ts_query)
+
+        query = (select(pk_column)
+                 .where(table.c.search_vector.op("@@")(ts_query), *self.live_conditions)
+                 .where(*self.range_conditions(sort_field, date_from, date_to)))
+
+        return query, rank, pk_column
+
+    def lookup(self, db: Session, *, key_columns: List[str], candidates: List[str], mode: str,
+               columns: List[str], limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Looks records up by normalized identifier keys (`<column>_key`, trigram GIN indexed).
+
+        Modes:
+        - "exact":  key equals one of the candidates.
+        - "prefix": key starts with one of the candidates (shortest keys first).
+        - "fuzzy":  trigram similarity (`%`) or the candidate appearing inside the key
+                    (`<%`), best score first.
+        Every row carries a `score` between 0 and 1.
+        """
+        table = self.model.__table__
+        keys = [table.c[name] for name in key_columns]
+        selected = [table.c[name] for name in columns]
+
+        if mode == "exact":
+            condition = or_(*[key.in_(candidates) for key in keys])
+            score = literal(1.0)
+            order_by = [table.c.universal_id]
+        elif mode == "prefix":
+            # Candidates are alphanumeric only, so they never contain LIKE wildcards
+            condition = or_(*[key.like(f"{candidate}%") for key in keys for candidate in candidates])
+            score = literal(1.0)
+            order_by = [func.least(*[func.length(key) for key in keys]), table.c.universal_id]
+        elif mode == "fuzzy":
+            condition = or_(*[
+                or_(key.op("%")(candidate), literal(candidate).op("<%")(key))
+                for key in keys for candidate in candidates])
+            score = func.greatest(*[
+                func.greatest(func.similarity(key, candidate), func.word_similarity(candidate, key))
+                for key in keys for candidate in candidates])
+            order_by = [score.desc(), table.c.universal_id]
+        else:
+            raise ValueError(f"Unknown lookup mode '{mode}'")
+
+        query = (select(*selected, score.label("score"))
+                 .where(condition, *self.live_conditions)
+                 .order_by(*order_by)
+                 .limit(limit))
+        return [dict(row._mapping) for row in db.execute(query)]
+
+    def stream_rows(self, db: Session, *, columns: List[str],
+                    ranges: Optional[Dict[str, Tuple[Optional[datetime], Optional[datetime]]]] = None,
+                    batch_size: int = 2000, include_deleted: bool = False) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Streams the table in primary key order through a server-side cursor,
+        yielding lists of at most `batch_size` rows. Memory use is bounded by
+        `batch_size`, whatever the size of the table.
+
+        `ranges` maps a column name to an (inclusive start, exclusive end) pair;
+        either bound may be None. Tombstoned rows are left out unless `include_deleted`.
+        """
+        table = self.model.__table__
+        pk_column = table.c[self.model.__mapper__.primary_key[0].name]
+
+        query = select(*[table.c[name] for name in columns]).order_by(pk_column)
+        if not include_deleted:
+            query = query.where(*self.live_conditions)
+        for column_name, (start, end) in (ranges or {}).items():
+            query = query.where(*self.range_conditions(column_name, start, end))
+
+        # yield_per turns on stream_results, i.e. a named (server-side) cursor with psycopg2
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        try:
+            for partition in result.partitions():
+                yield [dict(row._mapping) for row in partition]
+        finally:
+            result.close()
+
+    def count(self, db: Session) -> int:
+        """
+        Returns the number of rows in the table.
+        """
+        return db.execute(select(func.count()).select_from(self.model.__table__)).scalar_one()
+
+    def get_existing_universal_ids(self, db: Session, universal_ids: Sequence[Any], *,
+                                   chunk_size: int = 5000) -> set:
+        """
+        Returns the subset of `universal_ids` that are already stored, using one
+        indexed `IN (...)` query per `chunk_size` ids. Tombstoned rows count as stored:
+        their unique keys are held until the purge removes them.
+        """
+        table = self.model.__table__
+        existing = set()
+        for start in range(0, len(universal_ids), chunk_size):
+            chunk = universal_ids[start:start + chunk_size]
+            query = select(table.c.universal_id).where(table.c.universal_id.in_(chunk))
+            existing.update(db.execute(query).scalars())
+        return existing
+
+    def get_rows_by_identity(self, db: Session, *, universal_ids: Sequence[Any], vil_ids: Sequence[Any],
+                             columns: List[str], chunk_size: int = 5000) -> List[Dict[str, Any]]:
+        """
+        Returns the requested columns of the rows (tombstoned ones included) whose
+        universal_id or vil_id is among the given ones, with one indexed query per
+        `chunk_size` ids of each list.
+        """
+        table = self.model.__table__
+        selected = [table.c[name] for name in columns]
+        rows = {}
+        for start in range(0, max(len(universal_ids), len(vil_ids)), chunk_size):
+            uid_chunk = universal_ids[start:start + chunk_size]
+            vil_chunk = vil_ids[start:start + chunk_size]
+            query = select(*selected).where(or_(table.c.universal_id.in_(uid_chunk), table.c.vil_id.in_(vil_chunk)))
+            for row in db.execute(query):
+                rows[row.universal_id] = dict(row._mapping)
+        return list(rows.values())
+
+    def get_deleted_universal_ids(self, db: Session, universal_ids: Sequence[Any], *,
+                                  chunk_size: int = 5000) -> set:
+        """
+        Returns the subset of `universal_ids` whose rows are tombstoned.
+        """
+        table = self.model.__table__
+        if "deleted_at" not in table.c:
+            return set()
+        deleted = set()
+        for start in range(0, len(universal_ids), chunk_size):
+            chunk = universal_ids[start:start + chunk_size]
+            query = select(table.c.universal_id).where(table.c.universal_id.in_(chunk), table.c.deleted_at.isnot(None))
+            deleted.update(db.execute(query).scalars())
+        return deleted
+
+    def tombstone(self, db: Session, universal_ids: Sequence[Any], *, now: datetime, columns: List[str],
+                  chunk_size: int = 5000) -> List[Dict[str, Any]]:
+        """
+        Marks the live rows among `universal_ids` deleted, with one UPDATE per
+        `chunk_size` ids, and returns the requested columns of the rows it marked
+        (ids that are unknown or already tombstoned are not returned).
+        Does NOT commit.
+        """
+        table = self.model.__table__
+        returned = [table.c[name] for name in columns]
+        marked = []
+        for start in range(0, len(universal_ids), chunk_size):
+            chunk = universal_ids[start:start + chunk_size]
+            statement = (update(table)
+                         .where(table.c.universal_id.in_(chunk), table.c.deleted_at.is_(None))
+                         .values(deleted_at=now)
+                         .returning(*returned))
+            marked.extend(dict(row._mapping) for row in db.execute(statement))
+        return marked
+
+    def purge_tombstones(self, db: Session, *, before: datetime, limit: int) -> List[Dict[str, Any]]:
+        """
+        Physically deletes up to `limit` rows tombstoned before `before` (found through
+        the partial `deleted_at` index) and returns their universal_id and
+        file_storage_path. Does NOT commit.
+        """
+        table = self.model.__table__
+        pk_column = table.c[self.model.__mapper__.primary_key[0].name]
+        batch = select(pk_column).where(table.c.deleted_at < before).limit(limit)
+        statement = (delete(table)
+                     .where(pk_column.in_(batch.scalar_subquery()), table.c.deleted_at < before)
+                     .returning(table.c.universal_id, table.c.file_storage_path))
+        return [dict(row._mapping) for row in db.execute(statement)]
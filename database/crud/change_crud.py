@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, Optional, Sequence
+from datetime import datetime
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.orm import Session
+
+from database.models.change_model import ChangeRecord
+from database.crud.base import CRUDBase
+
+# Postgres LISTEN/NOTIFY channel signalled by every transaction that writes changes;
+# the payload is the table name (Postgres folds identical notifications of one transaction).
+# The notification is sent by a trigger on change_outbox, so writing changes is one statement.
+CHANGES_CHANNEL = "vil_changes"
+
+
+class CRUDChangeOutbox(CRUDBase[ChangeRecord]):
+    def record(self, db: Session, *, table_name: str, operation: str, universal_ids: Sequence[Any],
+               now: datetime):
+        """
+        Writes one change row per universal_id. The table's trigger queues a NOTIFY,
+        which Postgres only delivers if the caller's transaction commits. Does NOT commit.
+        Call it as the last statement before the commit, after the transaction's other
+        writes: /changes waits at a gap in `seq` while its transaction may still commit.
+        """
+        if not universal_ids:
+            return
+        db.execute(self.model.__table__.insert().values([
+            {"table_name": table_name, "universal_id": universal_id, "operation": operation, "changed_at": now}
+            for universal_id in universal_ids]))
+
+    def read_after(self, db: Session, *, after_seq: int, limit: int) -> List[Dict[str, Any]]:
+        """
+        Returns up to `limit` changes with a sequence number above `after_seq`, in order.
+        """
+        table = self.model.__table__
+        query = select(table).where(table.c.seq > after_seq).order_by(table.c.seq).limit(limit)
+        return [dict(row._mapping) for row in db.execute(query)]
+
+    def oldest_writer_start(self, db: Session) -> Optional[datetime]:
+        """
+        When the oldest transaction still writing changes (other than the caller's)
+        started: an INSERT holds its lock on the table from before it takes a seq until
+        its transaction ends. None when there is no such transaction, or off Postgres.
+        """
+        if db.get_bind().dialect.name != "postgresql":
+            return None
+        return db.execute(text(
+            # pg_stat_activity is read once per transaction: a holder missing from it
+            # is a newer backend, and counted as the oldest to stay on the safe side
+            "SELECT min(coalesce(activity.xact_start, '-infinity')) FROM pg_locks AS locks "
+            "LEFT JOIN pg_stat_activity AS activity ON activity.pid = locks.pid "
+            "WHERE locks.locktype = 'relation' AND locks.relation = CAST(:table AS regclass) "
+            "AND locks.mode = 'RowExclusiveLock' AND locks.pid <> pg_backend_pid()"),
+            {"table": self.model.__tablename__}).scalar_one()
+
+    def last_seq(self, db: Session) -> int:
+        """
+        The latest sequence number (0 when the outbox is empty).
+        """
+        return db.execute(select(func.coalesce(func.max(self.model.__table__.c.seq), 0))).scalar_one()
+
+    def prune(self, db: Session, *, before: datetime) -> int:
+        """
+        Deletes the changes recorded before `before`. Does NOT commit.
+        """
+        table = self.model.__table__
+        return db.execute(delete(table).where(table.c.changed_at < before)).rowcount
+
+
+change_outbox = CRUDChangeOutbox(ChangeRecord)
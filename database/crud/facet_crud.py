@@ -0,0 +1,56 @@
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from database.models.facet_model import FacetCount
+from database.crud.base import CRUDBase
+
+
+class CRUDFacetCount(CRUDBase[FacetCount]):
+    def apply_deltas(self, db: Session, *, table_name: str, deltas: Dict[Tuple[str, str], int]):
+        """
+        Adds `deltas` ({(facet, value): change}) to the counters of `table_name` with one
+        upsert. Does NOT commit, so the counters change in the caller's transaction.
+        Rows are written in key order, so concurrent transactions lock them in the same
+        order and cannot deadlock on each other.
+        """
+        rows = [
+            {"table_name": table_name, "facet": facet, "value": value, "count": delta}
+            for (facet, value), delta in sorted(deltas.items()) if delta]
+        if not rows:
+            return
+
+        table = self.model.__table__
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.table_name, table.c.facet, table.c.value],
+            set_={"count": table.c["count"] + statement.excluded["count"]})
+        db.execute(statement)
+
+    def get_counts(self, db: Session, *, table_name: str, facet: str, limit: int,
+                   chronological: bool = False) -> List[Dict[str, Any]]:
+        """
+        Returns up to `limit` (value, count) rows of one facet: the most frequent values
+        first, or the latest values first when `chronological`. Values whose records
+        were all removed (count 0) are left out.
+        """
+        table = self.model.__table__
+        order_by = [table.c.value.desc()] if chronological else [table.c["count"].desc(), table.c.value]
+        query = (select(table.c.value, table.c["count"])
+                 .where(table.c.table_name == table_name, table.c.facet == facet, table.c["count"] > 0)
+                 .order_by(*order_by)
+                 .limit(limit))
+        return [dict(row._mapping) for row in db.execute(query)]
+
+    def get_total(self, db: Session, *, table_name: str, facet: str) -> int:
+        """
+        Number of records of `table_name`: every record is counted under exactly one
+        value of each facet, so any facet's counts add up to the table size.
+        """
+        table = self.model.__table__
+        query = (select(func.coalesce(func.sum(table.c["count"]), 0))
+                 .where(table.c.table_name == table_name, table.c.facet == facet))
+        return int(db.execute(query).scalar_one())
+
+facet_counts = CRUDFacetCount(FacetCount)
@@ -0,0 +1,76 @@
+from typing import Dict, List
+from datetime import datetime
+from sqlalchemy import select, delete, update, func
+from sqlalchemy.orm import Session
+
+from database.models.file_gc_model import FileGcEntry
+from database.crud.base import CRUDBase
+
+
+class CRUDFileGcQueue(CRUDBase[FileGcEntry]):
+    def enqueue(self, db: Session, *, table_name: str, file_path: str, now: datetime):
+        """
+        Queues a deleted record's file for unlinking. Does NOT commit.
+        """
+        db.execute(self.model.__table__.insert().values(table_name=table_name, file_path=file_path, enqueued_at=now))
+
+    def enqueue_many(self, db: Session, *, table_name: str, file_paths: List[str], now: datetime):
+        """
+        Queues several files with one insert. Does NOT commit.
+        """
+        if not file_paths:
+            return
+        db.execute(self.model.__table__.insert().values(
+            [{"table_name": table_name, "file_path": path, "enqueued_at": now} for path in file_paths]))
+
+    def cancel(self, db: Session, *, file_path: str):
+        """
+        Takes `file_path` off the queue because a new record is about to use it (a
+        deleted universal_id uploaded again). Waits for a collector batch holding the
+        entry, so the new file is never written before the old one is unlinked.
+        Does NOT commit.
+        """
+        table = self.model.__table__
+        db.execute(delete(table).where(table.c.file_path == file_path))
+
+    def claim_batch(self, db: Session, *, limit: int, max_attempts: int) -> List[Dict]:
+        """
+        Locks and returns the oldest `limit` entries not given up on. Entries locked
+        by another collector are skipped, so several processes can collect at once.
+        """
+        table = self.model.__table__
+        rows = db.execute(
+            select(table.c.id, table.c.table_name, table.c.file_path)
+            .where(table.c.attempts < max_attempts)
+            .order_by(table.c.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)).all()
+        return [dict(row._mapping) for row in rows]
+
+    def confirm(self, db: Session, *, ids: List[int]):
+        """
+        Removes the entries whose file is gone. Does NOT commit.
+        """
+        if ids:
+            table = self.model.__table__
+            db.execute(delete(table).where(table.c.id.in_(ids)))
+
+    def record_failures(self, db: Session, *, errors: Dict[int, str]):
+        """
+        Counts a failed attempt for each entry in `errors` (id -> error). Does NOT commit.
+        """
+        table = self.model.__table__
+        for entry_id, error in errors.items():
+            db.execute(update(table).where(table.c.id == entry_id)
+                       .values(attempts=table.c.attempts + 1, last_error=error))
+
+    def backlog(self, db: Session, *, max_attempts: int) -> Dict[str, int]:
+        """
+        Queued entries still to collect and those given up on, for /health/file-gc.
+        """
+        table = self.model.__table__
+        pending = db.execute(select(func.count()).select_from(table).where(table.c.attempts < max_attempts)).scalar_one()
+        failed = db.execute(select(func.count()).select_from(table).where(table.c.attempts >= max_attempts)).scalar_one()
+        return {"pending": pending, "given_up": failed}
+
+file_gc_queue = CRUDFileGcQueue(FileGcEntry)
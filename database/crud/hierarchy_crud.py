@@ -0,0 +1,48 @@
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from database.models.hierarchy_model import ProductHierarchy
+from database.crud.base import CRUDBase
+
+
+class CRUDProductHierarchy(CRUDBase[ProductHierarchy]):
+    def apply_deltas(self, db: Session, *, table_name: str, deltas: Dict[Tuple[str, str, str], int],
+                     names: Dict[Tuple[str, str, str], Tuple[Optional[str], Optional[str]]]):
+        """
+        Adds `deltas` ({(prod_id, sub_prod_id, sub_subprod_id): change}) to the path
+        counts of `table_name` and stores `names` ({path: (prod_name, sub_prod_name)}),
+        with one upsert. Does NOT commit.
+        Rows are written in key order so concurrent transactions cannot deadlock.
+        """
+        rows = [
+            {"table_name": table_name, "prod_id": path[0], "sub_prod_id": path[1], "sub_subprod_id": path[2],
+             "prod_name": names.get(path, (None, None))[0], "sub_prod_name": names.get(path, (None, None))[1],
+             "count": deltas.get(path, 0)}
+            for path in sorted(set(deltas) | set(names))]
+        if not rows:
+            return
+
+        table = self.model.__table__
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.table_name, table.c.prod_id, table.c.sub_prod_id, table.c.sub_subprod_id],
+            set_={
+                "count": table.c["count"] + statement.excluded["count"],
+                "prod_name": func.coalesce(statement.excluded.prod_name, table.c.prod_name),
+                "sub_prod_name": func.coalesce(statement.excluded.sub_prod_name, table.c.sub_prod_name),
+            })
+        db.execute(statement)
+
+    def get_paths(self, db: Session, *, table_name: str) -> List[Dict[str, Any]]:
+        """
+        Returns every path of `table_name` that still has records, with names and counts.
+        """
+        table = self.model.__table__
+        query = (select(table.c.prod_id, table.c.prod_name, table.c.sub_prod_id, table.c.sub_prod_name,
+                        table.c.sub_subprod_id, table.c["count"])
+                 .where(table.c.table_name == table_name, table.c["count"] > 0))
+        return [dict(row._mapping) for row in db.execute(query)]
+
+product_hierarchy = CRUDProductHierarchy(ProductHierarchy)
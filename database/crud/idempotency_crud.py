@@ -0,0 +1,94 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+from sqlalchemy import select, delete, update, or_, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from database.models.idempotency_model import IdempotencyKey
+from database.crud.base import CRUDBase
+
+
+class CRUDIdempotencyKey(CRUDBase[IdempotencyKey]):
+    def claim(self, db: Session, *, scope: str, key: str, fingerprint: str, owner: str, now: datetime,
+              stale_before: datetime, expired_before: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Marks (scope, key) as being processed by `owner` and returns None, or returns
+        the existing record if the key is already taken: completed (with its response)
+        or still in progress. A record that expired, or whose owner stopped sending
+        heartbeats before `stale_before` (it died mid-request), is taken over. Commits.
+        """
+        table = self.model.__table__
+        inserted = db.execute(
+            insert(table)
+            .values(scope=scope, key=key, fingerprint=fingerprint, owner=owner, started_at=now, heartbeat_at=now)
+            .on_conflict_do_nothing(index_elements=[table.c.scope, table.c.key])
+            .returning(table.c.key)).first()
+        if inserted is not None:
+            db.commit()
+            return None
+
+        taken_over = db.execute(
+            update(table)
+            .where(table.c.scope == scope, table.c.key == key, or_(
+                and_(table.c.completed_at.is_(None), table.c.heartbeat_at < stale_before),
+                table.c.completed_at < expired_before))
+            .values(fingerprint=fingerprint, owner=owner, started_at=now, heartbeat_at=now,
+                    completed_at=None, status_code=None, response_body=None)
+            .returning(table.c.key)).first()
+        if taken_over is not None:
+            db.commit()
+            return None
+
+        row = db.execute(select(table).where(table.c.scope == scope, table.c.key == key)).first()
+        db.commit()
+        if row is None:
+            # Released by its owner in the meantime: claim it afresh
+            return self.claim(db, scope=scope, key=key, fingerprint=fingerprint, owner=owner, now=now,
+                              stale_before=stale_before, expired_before=expired_before)
+        return dict(row._mapping)
+
+    def heartbeat(self, db: Session, *, owner: str, now: datetime) -> int:
+        """
+        Marks every key `owner` is still processing as alive at `now`. Commits.
+        """
+        table = self.model.__table__
+        result = db.execute(
+            update(table)
+            .where(table.c.owner == owner, table.c.completed_at.is_(None))
+            .values(heartbeat_at=now))
+        db.commit()
+        return result.rowcount
+
+    def complete(self, db: Session, *, scope: str, key: str, owner: str, now: datetime, status_code: int,
+                 response_body: str):
+        """
+        Records the response of a key claimed by `owner` (not if another process has
+        taken it over since). Commits.
+        """
+        table = self.model.__table__
+        db.execute(
+            update(table)
+            .where(table.c.scope == scope, table.c.key == key, table.c.owner == owner)
+            .values(completed_at=now, status_code=status_code, response_body=response_body))
+        db.commit()
+
+    def release(self, db: Session, *, scope: str, key: str, owner: str):
+        """
+        Forgets a key claimed by `owner` whose request failed, so a retry processes it
+        again. Commits.
+        """
+        table = self.model.__table__
+        db.execute(delete(table).where(table.c.scope == scope, table.c.key == key, table.c.owner == owner,
+                                       table.c.completed_at.is_(None)))
+        db.commit()
+
+    def purge_expired(self, db: Session, *, expired_before: datetime) -> int:
+        """
+        Deletes the records completed before `expired_before`. Commits.
+        """
+        table = self.model.__table__
+        result = db.execute(delete(table).where(table.c.completed_at < expired_before))
+        db.commit()
+        return result.rowcount
+
+idempotency_keys = CRUDIdempotencyKey(IdempotencyKey)
@@ -0,0 +1,54 @@
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from database.models.registry_model import UniversalIdRegistry
+from database.crud.base import CRUDBase
+
+
+class CRUDUniversalIdRegistry(CRUDBase[UniversalIdRegistry]):
+    def register(self, db: Session, *, universal_id: Any, table_name: str, record_pk: int,
+                 vil_id: Optional[int]):
+        """
+        Records (or refreshes) where `universal_id` is stored. Does NOT commit.
+        """
+        table = self.model.__table__
+        statement = insert(table).values(
+            universal_id=universal_id, table_name=table_name, record_pk=record_pk, vil_id=vil_id)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.universal_id, table.c.table_name],
+            set_={"record_pk": statement.excluded.record_pk, "vil_id": statement.excluded.vil_id})
+        db.execute(statement)
+
+    def unregister(self, db: Session, *, universal_id: Any, table_name: str):
+        """
+        Forgets `universal_id` in `table_name`. Does NOT commit.
+        """
+        table = self.model.__table__
+        db.execute(delete(table).where(table.c.universal_id == universal_id, table.c.table_name == table_name))
+
+    def unregister_many(self, db: Session, *, universal_ids: Sequence[Any], table_name: str):
+        """
+        Forgets several universal_ids of `table_name` with one statement. Does NOT commit.
+        """
+        if not universal_ids:
+            return
+        table = self.model.__table__
+        db.execute(delete(table).where(table.c.universal_id.in_(universal_ids), table.c.table_name == table_name))
+
+    def resolve(self, db: Session, universal_ids: Sequence[Any], *, chunk_size: int = 5000) -> List[Dict[str, Any]]:
+        """
+        Returns the registry rows of `universal_ids` (usually one per id, none for
+        unknown ids), using one primary key `IN (...)` query per `chunk_size` ids.
+        """
+        table = self.model.__table__
+        rows = []
+        for start in range(0, len(universal_ids), chunk_size):
+            chunk = universal_ids[start:start + chunk_size]
+            query = (select(table.c.universal_id, table.c.table_name, table.c.record_pk, table.c.vil_id)
+                     .where(table.c.universal_id.in_(chunk)))
+            rows.extend(dict(row._mapping) for row in db.execute(query))
+        return rows
+
+universal_id_registry = CRUDUniversalIdRegistry(UniversalIdRegistry)
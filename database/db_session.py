@@ -1,13 +1,27 @@
+import os
+from functools import lru_cache
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.core.config import settings 
+from app.core import statement_counter
 
 # The connection string for your PostgreSQL database
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS)
+if settings.SQL_STATEMENT_COUNTER_ENABLED:
+    statement_counter.install(engine)
+# Objects stay loaded after commit: the write paths return what INSERT/UPDATE ... RETURNING
+# gave them instead of reloading it with another SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
@@ -17,4 +31,51 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_pool_status() -> dict:
+    """
+    Returns a snapshot of the connection pool, used to observe pool saturation
+    under load. `capacity` is the most connections the pool will ever hand out.
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool_class": type(pool).__name__}
+
+    capacity = pool.size() + pool._max_overflow
+    checked_out = pool.checkedout()
+    return {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "capacity": capacity,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+@lru_cache(maxsize=None)
+def _migration_heads() -> tuple:
+    """
+    The head revision(s) of alembic/versions, read once: they only change with a deploy.
+    """
+    # Imported here: only the migration health checks need Alembic at runtime
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = ScriptDirectory.from_config(Config(os.path.join(project_root, "alembic.ini")))
+    return tuple(sorted(script.get_heads()))
+
+def get_migration_status() -> dict:
+    """
+    The database's Alembic revision(s) against the head(s) of alembic/versions, to
+    follow a migration running in the background (MIGRATION_MODE=deferred in entrypoint.sh).
+    """
+    from alembic.runtime.migration import MigrationContext
+
+    head = list(_migration_heads())
+    with engine.connect() as connection:
+        current = sorted(MigrationContext.configure(connection).get_current_heads())
+    return {"current": current, "head": head, "up_to_date": current == head}
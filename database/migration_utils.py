@@ -0,0 +1,325 @@
+"""
+Helpers for Alembic revisions that change large tables without blocking writes.
+
+A plain `op.create_index` / `op.create_unique_constraint` holds a lock that blocks
+every INSERT, UPDATE and DELETE on the table until the whole index is built, and
+`alter_column(nullable=False)` scans the table under an exclusive lock. The helpers
+below do the same work online:
+
+    create_index_concurrently        CREATE INDEX CONCURRENTLY; on partitioned tables,
+                                     one concurrent build per partition, attached to
+                                     an index created ON ONLY the parent
+    drop_index_concurrently          DROP INDEX CONCURRENTLY (plain DROP, under a lock
+                                     timeout, for a partitioned index)
+    rename_index                     ALTER INDEX ... RENAME under a lock timeout, with
+                                     the partitions' indexes renamed along
+    add_unique_constraint_online     unique index built concurrently, then
+                                     ADD CONSTRAINT ... UNIQUE USING INDEX
+    set_not_null_online              NOT VALID check, VALIDATE, then SET NOT NULL
+                                     (which skips its scan given the valid check)
+    batched_backfill                 UPDATE in committed batches, with progress
+    execute_with_lock_retries        brief DDL under lock_timeout, retried, so it
+                                     never queues every other query behind it
+
+Each helper commits the revision's transaction so far (Postgres cannot build an index
+concurrently inside a transaction) and is safe to re-run: an interrupted concurrent
+build leaves an INVALID index behind, which is dropped and rebuilt.
+
+Offline (`alembic upgrade ... --sql`) the catalog cannot be read, so the helpers emit
+the unconditional DDL instead: plain CREATE INDEX / DROP INDEX (which work on plain
+and partitioned tables alike, but block writes while they run), one UPDATE for a
+backfill, and short DDL under a lock_timeout without retries.
+
+    from database.migration_utils import create_index_concurrently
+
+    def upgrade() -> None:
+        create_index_concurrently("ix_sgst_vil_id", "sgst", ["vil_id"])
+"""
+import time
+import hashlib
+import logging
+from typing import List, Optional, Sequence
+
+import sqlalchemy as sa
+from alembic import context, op
+from sqlalchemy.exc import OperationalError
+
+# Under the "alembic" logger, which alembic.ini prints at INFO
+logger = logging.getLogger("alembic.migration_utils")
+
+# Postgres error code of a statement cancelled by lock_timeout
+LOCK_NOT_AVAILABLE = "55P03"
+
+# Postgres identifiers are truncated past this length
+MAX_IDENTIFIER_LENGTH = 63
+
+
+def _offline() -> bool:
+    return context.is_offline_mode()
+
+
+def _bind():
+    """
+    The migration's connection, to read the catalog. Callers handle offline mode
+    first: there is no connection then.
+    """
+    if _offline():
+        raise RuntimeError("This step reads the database catalog and cannot generate offline SQL (--sql).")
+    return op.get_bind()
+
+
+def _scalar(sql: str, **params):
+    return _bind().execute(sa.text(sql), params).scalar()
+
+
+def _is_partitioned(table: str) -> bool:
+    return bool(_scalar("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)", table=table))
+
+
+def _partitions(table: str) -> List[str]:
+    rows = _bind().execute(
+        sa.text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:table) ORDER BY 1"),
+        {"table": table})
+    return [row[0] for row in rows]
+
+
+def _index_valid(name: str) -> Optional[bool]:
+    """
+    None if the index does not exist, else whether it is valid.
+    """
+    return _scalar("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)", name=name)
+
+
+def _partition_index_name(name: str, partition: str) -> str:
+    full = f"{name}_{partition.split('.')[-1]}"
+    if len(full) <= MAX_IDENTIFIER_LENGTH:
+        return full
+    digest = hashlib.md5(full.encode("utf-8")).hexdigest()[:8]
+    return f"{full[:MAX_IDENTIFIER_LENGTH - 9]}_{digest}"
+
+
+def _index_sql(name: str, table: str, columns: Sequence[str], *, unique: bool, using: Optional[str],
+               where: Optional[str], concurrently: bool = False, only: bool = False) -> str:
+    return (f"CREATE {'UNIQUE ' if unique else ''}INDEX {'CONCURRENTLY ' if concurrently else ''}"
+            f"IF NOT EXISTS {name} ON {'ONLY ' if only else ''}{table}"
+            f"{f' USING {using}' if using else ''} ({', '.join(columns)})"
+            f"{f' WHERE {where}' if where else ''}")
+
+
+def execute_with_lock_retries(sql: str, *, lock_timeout_ms: int = 2000, attempts: int = 10,
+                              backoff_seconds: float = 2.0):
+    """
+    Runs one short DDL statement (ADD COLUMN, ATTACH, ADD CONSTRAINT, ...) with a
+    `lock_timeout`, retrying with a growing pause when its lock is not granted in
+    time. Waiting indefinitely would queue all reads and writes of the table behind
+    the statement. Must run inside `autocommit_block()`.
+    """
+    if _offline():
+        op.execute(f"SET lock_timeout = {int(lock_timeout_ms)}")
+        op.execute(sql)
+        op.execute("RESET lock_timeout")
+        return
+
+    bind = op.get_bind()
+    for attempt in range(1, attempts + 1):
+        bind.execute(sa.text(f"SET lock_timeout = {int(lock_timeout_ms)}"))
+        try:
+            bind.execute(sa.text(sql))
+            return
+        except OperationalError as e:
+            if getattr(e.orig, "pgcode", None) != LOCK_NOT_AVAILABLE or attempt == attempts:
+                raise
+            logger.info(f"Lock not available (attempt {attempt}/{attempts}), retrying: {sql}")
+            time.sleep(backoff_seconds * attempt)
+        finally:
+            bind.execute(sa.text("RESET lock_timeout"))
+
+
+def _build_concurrently(name: str, table: str, columns: Sequence[str], *, unique: bool, using: Optional[str],
+                        where: Optional[str]):
+    if _index_valid(name) is False:
+        logger.info(f"Dropping invalid index {name} left by an interrupted build")
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    started = time.monotonic()
+    op.execute(_index_sql(name, table, columns, unique=unique, using=using, where=where, concurrently=True))
+    if not _index_valid(name):
+        raise RuntimeError(f"Index {name} on {table} is invalid after a concurrent build (e.g. a duplicate key).")
+    logger.info(f"Built index {name} on {table} in {time.monotonic() - started:.1f}s")
+
+
+def create_index_concurrently(name: str, table: str, columns: Sequence[str], *, unique: bool = False,
+                              using: Optional[str] = None, where: Optional[str] = None):
+    """
+    Builds an index without blocking writes. `columns` are SQL index elements, e.g.
+    ["vil_id"] or ["circular_no_key gin_trgm_ops"]; `where` makes it partial.
+
+    Postgres cannot build an index concurrently on a partitioned table, so there the
+    parent gets an (instant, invalid) index ON ONLY itself, each partition's index is
+    built concurrently and attached, and the parent's index turns valid once the last
+    partition is attached.
+    """
+    if _offline():
+        op.execute(_index_sql(name, table, columns, unique=unique, using=using, where=where))
+        return
+
+    with op.get_context().autocommit_block():
+        if not _is_partitioned(table):
+            _build_concurrently(name, table, columns, unique=unique, using=using, where=where)
+            return
+
+        execute_with_lock_retries(
+            _index_sql(name, table, columns, unique=unique, using=using, where=where, only=True))
+        partitions = _partitions(table)
+        for number, partition in enumerate(partitions, start=1):
+            partition_index = _partition_index_name(name, partition)
+            _build_concurrently(partition_index, partition, columns, unique=unique, using=using, where=where)
+            # A no-op when the index is attached already (re-run)
+            execute_with_lock_retries(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+            logger.info(f"{name}: {number}/{len(partitions)} partitions indexed")
+
+
+def drop_index_concurrently(name: str):
+    """
+    Drops an index without blocking writes. An index of a partitioned table cannot be
+    dropped concurrently; it is dropped under a lock timeout instead (a catalog-only
+    change, but it needs a brief exclusive lock on every partition).
+    """
+    if _offline():
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+        return
+
+    with op.get_context().autocommit_block():
+        if _scalar("SELECT relkind = 'I' FROM pg_class WHERE oid = to_regclass(:name)", name=name):
+            execute_with_lock_retries(f"DROP INDEX IF EXISTS {name}")
+        else:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def rename_index(name: str, new_name: str):
+    """
+    Renames an index under a lock timeout. The partitions' indexes of a partitioned
+    index are renamed too, to the names `create_index_concurrently` gives them under
+    `new_name`: left under the old name, a later build under that name would take
+    them for its own. `rename_index(name, name)` only renames the partitions' indexes.
+    """
+    if _offline():
+        _rename_index_offline(name, new_name)
+        return
+
+    with op.get_context().autocommit_block():
+        children = op.get_bind().execute(sa.text(
+            "SELECT inherits.inhrelid::regclass::text, index.indrelid::regclass::text "
+            "FROM pg_inherits inherits JOIN pg_index index ON index.indexrelid = inherits.inhrelid "
+            "WHERE inherits.inhparent = to_regclass(:name) ORDER BY 1"), {"name": name}).all()
+        # Partitions first: re-run after an interruption, the parent still has the old name
+        for child, partition in children:
+            child_name = _partition_index_name(new_name, partition)
+            if child.split(".")[-1] != child_name:
+                execute_with_lock_retries(f"ALTER INDEX {child} RENAME TO {child_name}")
+        if new_name != name:
+            execute_with_lock_retries(f"ALTER INDEX IF EXISTS {name} RENAME TO {new_name}")
+
+
+def _rename_index_offline(name: str, new_name: str):
+    # The partitions' indexes are only known when the script runs: renamed in a DO
+    # block, with the names _partition_index_name gives them (md5 past 63 characters)
+    op.execute(f"""
+        DO $$
+        DECLARE
+            child record;
+            child_name text;
+        BEGIN
+            FOR child IN
+                SELECT inherits.inhrelid::regclass::text AS index_name,
+                       (SELECT relname FROM pg_class WHERE oid = index.indrelid) AS partition_name
+                FROM pg_inherits inherits JOIN pg_index index ON index.indexrelid = inherits.inhrelid
+                WHERE inherits.inhparent = to_regclass('{name}')
+            LOOP
+                child_name := '{new_name}_' || child.partition_name;
+                IF length(child_name) > {MAX_IDENTIFIER_LENGTH} THEN
+                    child_name := left(child_name, {MAX_IDENTIFIER_LENGTH - 9}) || '_' || left(md5(child_name), 8);
+                END IF;
+                IF child.index_name <> child_name THEN
+                    EXECUTE format('ALTER INDEX %s RENAME TO %I', child.index_name, child_name);
+                END IF;
+            END LOOP;
+        END
+        $$""")
+    if new_name != name:
+        op.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {new_name}")
+
+
+def add_unique_constraint_online(constraint_name: str, table: str, columns: Sequence[str]):
+    """
+    `op.create_unique_constraint`, without blocking writes while the index is built:
+    the unique index is built concurrently, then promoted to the constraint, which
+    only takes a brief lock. Not possible on partitioned tables, whose unique indexes
+    must include the partition key.
+    """
+    if _offline():
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {constraint_name} UNIQUE ({', '.join(columns)})")
+        return
+
+    if _is_partitioned(table):
+        raise ValueError(f"{table} is partitioned: ADD CONSTRAINT ... USING INDEX is not supported on it.")
+    if _scalar("SELECT count(*) FROM pg_constraint WHERE conname = :name AND conrelid = to_regclass(:table)",
+               name=constraint_name, table=table):
+        logger.info(f"Constraint {constraint_name} on {table} exists already")
+        return
+
+    create_index_concurrently(constraint_name, table, columns, unique=True)
+    with op.get_context().autocommit_block():
+        execute_with_lock_retries(
+            f"ALTER TABLE {table} ADD CONSTRAINT {constraint_name} UNIQUE USING INDEX {constraint_name}")
+
+
+def set_not_null_online(table: str, column: str):
+    """
+    `alter_column(nullable=False)` without a full scan under an exclusive lock: a NOT
+    VALID check constraint is added (brief lock), validated (scans, but lets writes
+    through), and SET NOT NULL then relies on it instead of scanning again.
+    """
+    check_name = f"{table}_{column}_not_null"[:MAX_IDENTIFIER_LENGTH]
+    with op.get_context().autocommit_block():
+        execute_with_lock_retries(
+            f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {check_name}, "
+            f"ADD CONSTRAINT {check_name} CHECK ({column} IS NOT NULL) NOT VALID")
+        op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {check_name}")
+        execute_with_lock_retries(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+        execute_with_lock_retries(f"ALTER TABLE {table} DROP CONSTRAINT {check_name}")
+
+
+def batched_backfill(table: str, *, set_sql: str, where_sql: str, key: str = "id", batch_size: int = 10000,
+                     pause_seconds: float = 0.0) -> int:
+    """
+    Runs `UPDATE table SET <set_sql> WHERE <where_sql>` in batches of `batch_size`
+    rows, each committed on its own, so row locks are held briefly and an interrupted
+    backfill resumes where it stopped when the revision is re-run. `where_sql` must
+    select only the rows still to do (i.e. turn false once a row is updated), and
+    `key` should be indexed. Logs progress; returns the number of rows updated.
+    Offline it emits a single UPDATE (and returns 0).
+    """
+    if _offline():
+        op.execute(f"UPDATE {table} SET {set_sql} WHERE {where_sql}")
+        return 0
+
+    with op.get_context().autocommit_block():
+        total = _scalar(f"SELECT count(*) FROM {table} WHERE {where_sql}")
+        logger.info(f"Backfilling {total} row(s) of {table}")
+        statement = sa.text(
+            f"UPDATE {table} SET {set_sql} WHERE {key} IN "
+            f"(SELECT {key} FROM {table} WHERE {where_sql} LIMIT {int(batch_size)})")
+
+        done = 0
+        started = time.monotonic()
+        while True:
+            updated = _bind().execute(statement).rowcount
+            if not updated:
+                break
+            done += updated
+            elapsed = time.monotonic() - started
+            logger.info(f"{table}: {done}/{total} row(s) ({100 * done / max(total, 1):.0f}%), "
+                        f"{done / elapsed if elapsed else 0:.0f} rows/s")
+            if pause_seconds:
+                time.sleep(pause_seconds)
+    return done
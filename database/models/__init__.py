@@ -2,9 +2,15 @@ from database.models.article_model import Article
 from database.models.budgets_union_model import BudgetsUnion
 from database.models.ce_model import CE
 from database.models.cgst_model import CGST
+from database.models.change_model import ChangeRecord
 from database.models.cu_model import CU
 from database.models.dgft_model import DGFT
+from database.models.facet_model import FacetCount
 from database.models.features_model import Features
+from database.models.file_gc_model import FileGcEntry
+from database.models.hierarchy_model import ProductHierarchy
+from database.models.idempotency_model import IdempotencyKey
+from database.models.registry_model import UniversalIdRegistry
 from database.models.sgst_model import SGST
 from database.models.st_model import ST
 from database.models.vat_model import VAT
\ No newline at end of file
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, BigInteger, DateTime, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, BigInteger, DateTime, Text, Computed, Index, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import deferred
 from database.db_session import Base
 
 class CE(Base):
@@ -7,10 +8,24 @@ class CE(Base):
     SQLAlchemy ORM model for the 'ce' table.
     """
     __tablename__ = "ce"
+    __table_args__ = (
+        Index("ix_ce_search_vector", "search_vector", postgresql_using="gin", postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_ce_circular_no_key_trgm", "circular_no_key", postgresql_using="gin", postgresql_ops={"circular_no_key": "gin_trgm_ops"}, postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_ce_case_no_key_trgm", "case_no_key", postgresql_using="gin", postgresql_ops={"case_no_key": "gin_trgm_ops"}, postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_ce_order_no_key_trgm", "order_no_key", postgresql_using="gin", postgresql_ops={"order_no_key": "gin_trgm_ops"}, postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_ce_eq_citation_key_trgm", "eq_citation_key", postgresql_using="gin", postgresql_ops={"eq_citation_key": "gin_trgm_ops"}, postgresql_where=text("deleted_at IS NULL")),
+        # Tombstones only: found by the purge without touching live rows
+        Index("ix_ce_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+        # Yearly range partitions (see migration 4e9a1c7d2b60); rows are routed by partition_dt
+        # Unique across all partitions through the <table>_keys table (no unique constraint);
+        # read by the upload's duplicate checks
+        {"postgresql_partition_by": "RANGE (partition_dt)",
+         "info": {"unique_keys": [("universal_id",), ("vil_id",), ("circular_no",), ("html_file_path",)]}},
+    )
 
     case_id = Column(BigInteger, primary_key=True, autoincrement=True)
-    universal_id = Column(UUID(as_uuid=True), unique=True, nullable=False, index=True)
-    vil_id = Column(BigInteger, nullable=False, unique=True)
+    universal_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    vil_id = Column(BigInteger, nullable=False, index=True)
     prod_id = Column(Text, nullable=True)
     prod_name = Column(Text, nullable=True)
     sub_prod_id = Column(Text, nullable=True)
@@ -18,17 +33,30 @@ class CE(Base):
     sub_subprod_id = Column(Text, nullable=True)
     circular_date = Column(DateTime, nullable=True, index=True)
     eq_citation = Column(Text, nullable=True)
-    circular_no = Column(Text, nullable=False, index=True, unique=True)
+    circular_no = Column(Text, nullable=False, index=True)
     case_no = Column(Text, nullable=True)
     order_no = Column(Text, nullable=True)
     judge_name = Column(Text, nullable=True)
     cir_subject = Column(Text, nullable=True)
     party_name = Column(Text, nullable=True)
-    html_file_path = Column(Text, nullable=False, unique=True)
+    html_file_path = Column(Text, nullable=False, index=True)
     created_dt = Column(DateTime, nullable=True)
     updated_dt = Column(DateTime, nullable=True)
-    ingestion_dt = Column(DateTime, nullable=False)
+    ingestion_dt = Column(DateTime, nullable=False, index=True)
     file_storage_path = Column(Text, nullable=False)
+    # Set instead of deleting the row when DELETE_MODE is "tombstone"; the row itself
+    # is removed later by the tombstone purge
+    deleted_at = Column(DateTime, nullable=True, info={"internal": True})
+    # Partition key: circular_date, or ingestion_dt when there is none (set by the service).
+    # Part of the database primary key (case_id, partition_dt); the uniqueness of
+    # universal_id, vil_id, circular_no and html_file_path is enforced through the
+    # ce_keys table, since unique indexes on a partitioned table must include the key.
+    partition_dt = Column(DateTime, nullable=False, info={"internal": True})
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('english', coalesce(cir_subject, ''))", persisted=True)))
+    circular_no_key = deferred(Column(Text, Computed("lower(regexp_replace(circular_no, '[^[:alnum:]]+', '', 'g'))", persisted=True)))
+    case_no_key = deferred(Column(Text, Computed("lower(regexp_replace(case_no, '[^[:alnum:]]+', '', 'g'))", persisted=True)))
+    order_no_key = deferred(Column(Text, Computed("lower(regexp_replace(order_no, '[^[:alnum:]]+', '', 'g'))", persisted=True)))
+    eq_citation_key = deferred(Column(Text, Computed("lower(regexp_replace(eq_citation, '[^[:alnum:]]+', '', 'g'))", persisted=True)))
 
 
     def __repr__(self):
@@ -0,0 +1,27 @@
+from sqlalchemy import BigInteger, Column, DateTime, Text
+from sqlalchemy.dialects.postgresql import UUID
+from database.db_session import Base
+
+class ChangeRecord(Base):
+    """
+    SQLAlchemy ORM model for the 'change_outbox' table: one compact row per record
+    created, updated or deleted, written by the ingestion services in the same
+    transaction as the change itself and read by /changes in `seq` order.
+    """
+    __tablename__ = "change_outbox"
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    table_name = Column(Text, nullable=False)
+    universal_id = Column(UUID(as_uuid=True), nullable=False)
+    # "create", "update" or "delete"
+    operation = Column(Text, nullable=False)
+    changed_at = Column(DateTime, nullable=False, index=True)
+    # Database time the row was written, after its seq was taken; set by a trigger
+    # (migration f5a0c7d3e8b1). NULL for older rows and off Postgres
+    written_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        """
+        Provides a developer-friendly representation of the object, useful for debugging.
+        """
+        return f"<ChangeRecord(seq={self.seq}, table_name='{self.table_name}', operation='{self.operation}')>"
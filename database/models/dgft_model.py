@@ -1,5 +1,6 @@
-from sqlalchemy import Column, BigInteger, DateTime, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, BigInteger, DateTime, Text, Computed, Index, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import deferred
 from database.db_session import Base
 
 class DGFT(Base):
@@ -7,6 +8,12 @@ class DGFT(Base):
     SQLAlchemy ORM model for the 'dgft' table.
     """
     __tablename__ = "dgft"
+    __table_args__ = (
+        Index("ix_dgft_search_vector", "search_vector", postgresql_using="gin", postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_dgft_circular_no_key_trgm", "circular_no_key", postgresql_using="gin", postgresql_ops={"circular_no_key": "gin_trgm_ops"}, postgresql_where=text("deleted_at IS NULL")),
+        # Tombstones only: found by the purge without touching live rows
+        Index("ix_dgft_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
 
     case_id = Column(BigInteger, primary_key=True, autoincrement=True)
     universal_id = Column(UUID(as_uuid=True), unique=True, nullable=False, index=True)
@@ -23,8 +30,13 @@ class DGFT(Base):
     html_file_path = Column(Text, nullable=False, unique=True)
     created_dt = Column(DateTime, nullable=True)
     updated_dt = Column(DateTime, nullable=True)
-    ingestion_dt = Column(DateTime, nullable=False)
+    ingestion_dt = Column(DateTime, nullable=False, index=True)
     file_storage_path = Column(Text, nullable=False)
+    # Set instead of deleting the row when DELETE_MODE is "tombstone"; the row itself
+    # is removed later by the tombstone purge
+    deleted_at = Column(DateTime, nullable=True, info={"internal": True})
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('english', coalesce(cir_subject, ''))", persisted=True)))
+    circular_no_key = deferred(Column(Text, Computed("lower(regexp_replace(circular_no, '[^[:alnum:]]+', '', 'g'))", persisted=True)))
 
 
     def __repr__(self):
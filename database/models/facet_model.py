@@ -0,0 +1,22 @@
+from sqlalchemy import Column, BigInteger, Text
+from database.db_session import Base
+
+class FacetCount(Base):
+    """
+    SQLAlchemy ORM model for the 'facet_counts' table: the number of records of
+    each table per facet value (e.g. sgst / prod_name / "GST"). Maintained by the
+    ingestion services in the same transaction as the records themselves.
+    """
+    __tablename__ = "facet_counts"
+
+    table_name = Column(Text, primary_key=True)
+    facet = Column(Text, primary_key=True)
+    # Records with no value for the facet are counted under '' (see app.services.facets)
+    value = Column(Text, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        """
+        Provides a developer-friendly representation of the object, useful for debugging.
+        """
+        return f"<FacetCount(table_name='{self.table_name}', facet='{self.facet}', value='{self.value}', count={self.count})>"
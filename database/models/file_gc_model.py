@@ -0,0 +1,24 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, Text
+from database.db_session import Base
+
+class FileGcEntry(Base):
+    """
+    SQLAlchemy ORM model for the 'file_gc_queue' table: JSON files of deleted
+    records, queued in the delete's transaction and unlinked later, in batches,
+    by the background file collector.
+    """
+    __tablename__ = "file_gc_queue"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    table_name = Column(Text, nullable=False)
+    file_path = Column(Text, nullable=False, index=True)
+    enqueued_at = Column(DateTime, nullable=False)
+    # Failed unlink attempts so far, and the last error
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
+
+    def __repr__(self):
+        """
+        Provides a developer-friendly representation of the object, useful for debugging.
+        """
+        return f"<FileGcEntry(id={self.id}, table_name='{self.table_name}', file_path='{self.file_path}')>"
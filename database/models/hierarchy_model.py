@@ -0,0 +1,28 @@
+from sqlalchemy import Column, BigInteger, Text
+from database.db_session import Base
+
+class ProductHierarchy(Base):
+    """
+    SQLAlchemy ORM model for the 'product_hierarchy' table: the distinct
+    prod_id / sub_prod_id / sub_subprod_id paths of each table, with their names
+    and record counts. Maintained by the ingestion services in the same
+    transaction as the records themselves.
+    """
+    __tablename__ = "product_hierarchy"
+
+    table_name = Column(Text, primary_key=True)
+    # Missing ids are stored as '' (see app.services.hierarchy)
+    prod_id = Column(Text, primary_key=True)
+    sub_prod_id = Column(Text, primary_key=True)
+    sub_subprod_id = Column(Text, primary_key=True)
+    # Names as last written for this path
+    prod_name = Column(Text, nullable=True)
+    sub_prod_name = Column(Text, nullable=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        """
+        Provides a developer-friendly representation of the object, useful for debugging.
+        """
+        return (f"<ProductHierarchy(table_name='{self.table_name}', prod_id='{self.prod_id}', "
+                f"sub_prod_id='{self.sub_prod_id}', sub_subprod_id='{self.sub_subprod_id}', count={self.count})>")
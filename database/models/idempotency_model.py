@@ -0,0 +1,30 @@
+from sqlalchemy import Column, DateTime, Integer, Text
+from database.db_session import Base
+
+class IdempotencyKey(Base):
+    """
+    SQLAlchemy ORM model for the 'idempotency_keys' table: the `Idempotency-Key`s
+    sent to the write endpoints and the response each one produced, so a retried
+    request is answered from here instead of being processed again.
+    """
+    __tablename__ = "idempotency_keys"
+
+    # Method and path of the endpoint (e.g. "POST /sgst/upload"); a key is scoped to it
+    scope = Column(Text, primary_key=True)
+    key = Column(Text, primary_key=True)
+    # SHA-256 of the query string and body, to reject a key reused for another request
+    fingerprint = Column(Text, nullable=False)
+    # The process working on the request (host:pid:random), and when it last said it still is
+    owner = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=False)
+    heartbeat_at = Column(DateTime, nullable=False)
+    # NULL while the request is being processed
+    completed_at = Column(DateTime, nullable=True, index=True)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+
+    def __repr__(self):
+        """
+        Provides a developer-friendly representation of the object, useful for debugging.
+        """
+        return f"<IdempotencyKey(scope='{self.scope}', key='{self.key}', status_code={self.status_code})>"
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, BigInteger, Text
+from sqlalchemy.dialects.postgresql import UUID
+from database.db_session import Base
+
+class UniversalIdRegistry(Base):
+    """
+    SQLAlchemy ORM model for the 'universal_id_registry' table: which table (and
+    which row of it) holds each universal_id, so an id can be resolved without
+    probing every table. Maintained by the ingestion services in the same
+    transaction as the records themselves.
+    """
+    __tablename__ = "universal_id_registry"
+
+    # universal_ids are unique per table, not enforced across tables: an id found in
+    # two tables is registered twice rather than rejected
+    universal_id = Column(UUID(as_uuid=True), primary_key=True)
+    table_name = Column(Text, primary_key=True)
+    record_pk = Column(BigInteger, nullable=False)
+    vil_id = Column(BigInteger, nullable=True)
+
+    def __repr__(self):
+        """
+        Provides a developer-friendly representation of the object, useful for debugging.
+        """
+        return f"<UniversalIdRegistry(universal_id='{self.universal_id}', table_name='{self.table_name}', record_pk={self.record_pk})>"
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, BigInteger, DateTime, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, BigInteger, DateTime, Text, Computed, Index, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import deferred
 from database.db_session import Base
 
 class VAT(Base):
@@ -7,6 +8,15 @@ class VAT(Base):
     SQLAlchemy ORM model for the 'vat' table.
     """
     __tablename__ = "vat"
+    __table_args__ = (
+        Index("ix_vat_search_vector", "search_vector", postgresql_using="gin", postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_vat_circular_no_key_trgm", "circular_no_key", postgresql_using="gin", postgresql_ops={"circular_no_key": "gin_trgm_ops"}, postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_vat_case_no_key_trgm", "case_no_key", postgresql_using="gin", postgresql_ops={"case_no_key": "gin_trgm_ops"}, postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_vat_order_no_key_trgm", "order_no_key", postgresql_using="gin", postgresql_ops={"order_no_key": "gin_trgm_ops"}, postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_vat_eq_citation_key_trgm", "eq_citation_key", postgresql_using="gin", postgresql_ops={"eq_citation_key": "gin_trgm_ops"}, postgresql_where=text("deleted_at IS NULL")),
+        # Tombstones only: found by the purge without touching live rows
+        Index("ix_vat_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
 
     case_id = Column(BigInteger, primary_key=True, autoincrement=True)
     universal_id = Column(UUID(as_uuid=True), unique=True, nullable=False, index=True)
@@ -28,8 +38,16 @@ class VAT(Base):
     party_name = Column(Text, nullable=True)
     created_dt = Column(DateTime, nullable=True)
     updated_dt = Column(DateTime, nullable=True)
-    ingestion_dt = Column(DateTime, nullable=False)
+    ingestion_dt = Column(DateTime, nullable=False, index=True)
     file_storage_path = Column(Text, nullable=False)
+    # Set instead of deleting the row when DELETE_MODE is "tombstone"; the row itself
+    # is removed later by the tombstone purge
+    deleted_at = Column(DateTime, nullable=True, info={"internal": True})
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('english', coalesce(cir_subject, ''))", persisted=True)))
+    circular_no_key = deferred(Column(Text, Computed("lower(regexp_replace(circular_no, '[^[:alnum:]]+', '', 'g'))", persisted=True)))
+    case_no_key = deferred(Column(Text, Computed("lower(regexp_replace(case_no, '[^[:alnum:]]+', '', 'g'))", persisted=True)))
+    order_no_key = deferred(Column(Text, Computed("lower(regexp_replace(order_no, '[^[:alnum:]]+', '', 'g'))", persisted=True)))
+    eq_citation_key = deferred(Column(Text, Computed("lower(regexp_replace(eq_citation, '[^[:alnum:]]+', '', 'g'))", persisted=True)))
 
 
     def __repr__(self):
@@ -6,9 +6,34 @@
 # The 'set -e' command ensures that the script will exit immediately if any command fails.
 set -e
 
-# 1. Apply Database Migrations
-echo "Applying database migrations..."
-alembic upgrade head
+# 1. Apply Database Migrations, as chosen by MIGRATION_MODE (default "blocking"):
+#    blocking  apply them, then start the application
+#    deferred  start the application at once; it applies them in a child process it
+#              waits on, logged to $LOGS_DIR/migrations.log, and starts its background
+#              workers once they are done. Only for revisions whose slow steps are
+#              online (database/migration_utils.py) and whose schema changes the
+#              running code already tolerates; GET /health/ready answers 503 until
+#              the database has reached head (details: GET /health/migrations).
+#    skip      do not migrate (another container or a release job does it)
+#
+# Exported: the application reads it too
+export MIGRATION_MODE="${MIGRATION_MODE:-blocking}"
+case "$MIGRATION_MODE" in
+    blocking)
+        echo "Applying database migrations..."
+        alembic upgrade head
+        ;;
+    deferred)
+        echo "Database migrations will be applied by the application in the background."
+        ;;
+    skip)
+        echo "Skipping database migrations (MIGRATION_MODE=skip)."
+        ;;
+    *)
+        echo "Unknown MIGRATION_MODE '$MIGRATION_MODE' (expected blocking, deferred or skip)." >&2
+        exit 1
+        ;;
+esac
 
 # 2. Start the Application
 # The 'exec "$@"' command is a crucial part. It replaces the shell process
@@ -1,8 +1,25 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 from app.routers import (article, budgets_union,
                          ce, cgst, cu, dgft, sgst,
-                         st, vat, features)
+                         st, vat, features, search, dump, resolve, changes)
 from app.core import logging_config
+from app.core.config import settings
+from app.routers.registry import ROUTER_CONFIGS
+from app.core.admission import admission
+from app.core.spool import spool
+from app.core.statement_counter import STATEMENT_COUNT_HEADER, counting_statements
+from app.routers.spool_recovery import resume_in_background
+from app.services.changes import change_feed
+from app.services.file_gc import file_collector
+from app.services.tombstones import tombstone_purger
+from app.services.id_filter import warm_filters_in_background
+from database.db_session import get_migration_status, get_pool_status
 
 logging_config.setup_transaction_logger()
 
@@ -11,11 +28,101 @@ logging_config.setup_transaction_logger()
 # For now, we can call it here for simplicity.
 # db_session.Base.metadata.create_all(bind=db_session.engine)
 
+logger = logging.getLogger(__name__)
+
+
+def start_workers():
+    # Load the known universal_ids of every table in the background; until a table's
+    # filter is ready, /upload confirms every id against the database instead.
+    if settings.ID_FILTER_ENABLED:
+        warm_filters_in_background([config.service for config in ROUTER_CONFIGS.values()])
+    # Finish the /upload and /dump batches a previous run accepted but did not complete
+    if settings.SPOOL_ENABLED:
+        resume_in_background()
+    # Unlink the files of deleted records in batches, off the /delete path
+    if settings.FILE_GC_ENABLED:
+        file_collector.start()
+    # Also runs in "hard" mode, for tombstones left from a period in "tombstone" mode
+    if settings.TOMBSTONE_RETENTION_DAYS > 0:
+        tombstone_purger.start([config.service for config in ROUTER_CONFIGS.values()])
+    # LISTEN for committed changes, so /changes consumers are woken instead of polling
+    if settings.CHANGES_ENABLED:
+        change_feed.start()
+
+
+async def run_migrations():
+    """
+    Runs `alembic upgrade head` as a child process (MIGRATION_MODE=deferred), logged
+    to LOGS_DIR/migrations.log, and waits for it. On shutdown the child is stopped:
+    the online helpers can be re-run, so the next start carries on.
+    """
+    os.makedirs(settings.LOGS_DIR, exist_ok=True)
+    with open(os.path.join(settings.LOGS_DIR, "migrations.log"), "ab") as log:
+        process = await asyncio.create_subprocess_exec("alembic", "upgrade", "head",
+                                                       stdout=log, stderr=asyncio.subprocess.STDOUT)
+        try:
+            returncode = await process.wait()
+        except asyncio.CancelledError:
+            process.terminate()
+            await process.wait()
+            raise
+    if returncode:
+        logger.error(f"alembic upgrade head exited with status {returncode}, see {log.name}")
+
+
+async def wait_for_migrations():
+    """
+    Returns once the database has reached the head revision, checking every
+    MIGRATION_POLL_SECONDS.
+    """
+    while True:
+        try:
+            if (await asyncio.to_thread(get_migration_status))["up_to_date"]:
+                return
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not read the migration status: {str(e).splitlines()[0]}")
+        await asyncio.sleep(settings.MIGRATION_POLL_SECONDS)
+
+
+async def start_workers_when_migrated():
+    """
+    The background workers read and write the current schema (a resumed batch
+    replayed against a half-migrated one would be lost), so they start only once
+    the database is at head.
+    """
+    if settings.MIGRATION_MODE == "deferred":
+        await run_migrations()
+    await wait_for_migrations()
+    start_workers()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup = asyncio.create_task(start_workers_when_migrated())
+    yield
+    startup.cancel()
+    with suppress(asyncio.CancelledError):
+        await startup
+    change_feed.stop()
+    tombstone_purger.stop()
+    file_collector.stop()
+
 app = FastAPI(
     title="LKS X VIL Data Ingestion API",
-    description="API for processing VIL data dump."
+    description="API for processing VIL data dump.",
+    lifespan=lifespan
 )
 
+if settings.SQL_STATEMENT_COUNTER_ENABLED:
+    @app.middleware("http")
+    async def count_sql_statements(request: Request, call_next):
+        # Streamed responses (/changes/stream, exports) only count what ran before the first byte
+        with counting_statements() as counter:
+            response = await call_next(request)
+        response.headers[STATEMENT_COUNT_HEADER] = str(counter.count)
+        return response
+
+
 app.include_router(article.router, prefix="/articles", tags=["Articles"])
 app.include_router(budgets_union.router, prefix="/budgets_union", tags=["Budgets Union"])
 app.include_router(ce.router, prefix="/ce", tags=["Central Excise"])
@@ -26,8 +133,58 @@ app.include_router(sgst.router, prefix="/sgst", tags=["State Goods and Services
 app.include_router(st.router, prefix="/st", tags=["Service Tax"])
 app.include_router(vat.router, prefix="/vat", tags=["Value Added Tax"])
 app.include_router(features.router, prefix="/features", tags=["Features"])
+app.include_router(search.router, prefix="/search", tags=["Search"])
+app.include_router(dump.router, prefix="/dump", tags=["Dump"])
+app.include_router(resolve.router, prefix="/resolve", tags=["Resolve"])
+app.include_router(changes.router, prefix="/changes", tags=["Changes"])
 
 
 @app.get("/", tags=["Root"])
 def read_root():
     return {"message": "Welcome to the LKS X VIL Data Ingestion API"}
+
+
+@app.get("/health/db-pool", tags=["Root"])
+def read_db_pool_status():
+    return get_pool_status()
+
+
+@app.get("/health/admission", tags=["Root"])
+def read_admission_status():
+    return admission.status()
+
+
+@app.get("/health/spool", tags=["Root"])
+def read_spool_status():
+    return spool.status()
+
+
+@app.get("/health/file-gc", tags=["Root"])
+def read_file_gc_status():
+    return file_collector.status()
+
+
+@app.get("/health/changes", tags=["Root"])
+def read_changes_status():
+    return change_feed.status()
+
+
+@app.get("/health/migrations", tags=["Root"])
+def read_migration_status():
+    return get_migration_status()
+
+
+@app.get("/health/ready", tags=["Root"])
+def read_readiness():
+    """
+    Readiness probe: 503 until the database has reached the head revision, so a
+    load balancer keeps traffic away while MIGRATION_MODE=deferred is migrating
+    (or while the database cannot be reached).
+    """
+    try:
+        migrations = get_migration_status()
+    except SQLAlchemyError as e:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            content={"ready": False, "error": str(e).splitlines()[0]})
+    return JSONResponse(status_code=status.HTTP_200_OK if migrations["up_to_date"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+                        content={"ready": migrations["up_to_date"], "migrations": migrations})
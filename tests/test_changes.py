@@ -0,0 +1,129 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.services.changes import change_feed
+from database.crud.change_crud import change_outbox
+from database.db_session import SessionLocal
+from database.models.change_model import ChangeRecord
+
+TABLE = ChangeRecord.__table__
+
+
+def _write_change(db, *, seq=None, changed_at=None):
+    """
+    Writes one change row (with the given seq, or the next one) and returns its seq.
+    """
+    values = {"table_name": "sgst", "universal_id": uuid.uuid4(), "operation": "create",
+              "changed_at": changed_at or datetime.now(timezone.utc).replace(tzinfo=None)}
+    if seq is not None:
+        values["seq"] = seq
+    return db.execute(TABLE.insert().values(values).returning(TABLE.c.seq)).scalar_one()
+
+
+def test_gap_of_a_running_transaction_is_waited_for(db, postgres):
+    with SessionLocal() as running:
+        missing = _write_change(running)
+
+        later = _write_change(db)
+        db.commit()
+
+        changes, last_seq = change_feed.read(db, after_seq=missing - 1, table_names=None, limit=10)
+        assert (changes, last_seq) == ([], missing - 1)
+
+        running.rollback()
+
+    changes, last_seq = change_feed.read(db, after_seq=missing - 1, table_names=None, limit=10)
+    assert [change["seq"] for change in changes][:1] == [later]
+    assert last_seq >= later
+
+
+def test_gap_without_a_horizon_is_passed_after_the_grace(db):
+    base = change_outbox.last_seq(db) + 1000
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    _write_change(db, seq=base + 2, changed_at=now)
+    _write_change(db, seq=base + 4, changed_at=now - timedelta(seconds=change_feed.gap_grace + 60))
+    # Written before the horizon existed
+    db.execute(TABLE.update().where(TABLE.c.seq > base).values(written_at=None))
+    db.commit()
+
+    # The young gap before base + 2 is waited for...
+    assert change_feed.read(db, after_seq=base, table_names=None, limit=10) == ([], base)
+
+    # ...the old one before base + 4 is not
+    changes, last_seq = change_feed.read(db, after_seq=base + 2, table_names=None, limit=10)
+    assert [change["seq"] for change in changes] == [base + 4]
+    assert last_seq == base + 4
+
+    db.execute(TABLE.delete().where(TABLE.c.seq > base))
+    db.commit()
+
+
+def _upload(client, *items):
+    assert client.post("/sgst/upload", json={"name": "casedata_sgst", "data": list(items)}).status_code == 201
+
+
+def test_changes_are_listed_in_order_and_resumed(client, db, sgst_item, monkeypatch):
+    monkeypatch.setattr(settings, "DELETE_MODE", "tombstone")
+    after = change_outbox.last_seq(db)
+    item = sgst_item()
+    _upload(client, item)
+    response = client.post("/sgst/delete", json={"name": "casedata_sgst", "universal_id": [item["universal_id"]]})
+    assert response.status_code == 200
+
+    page = client.get("/changes", params={"after": after, "tables": "sgst"}).json()
+    ours = [change for change in page["changes"] if change["universal_id"] == item["universal_id"]]
+    assert [(change["table"], change["operation"]) for change in ours] == [("sgst", "create"), ("sgst", "delete")]
+    assert [change["seq"] for change in page["changes"]] == sorted(change["seq"] for change in page["changes"])
+    assert page["last_seq"] >= ours[-1]["seq"]
+
+    # Resuming from last_seq returns nothing new; other tables' changes still move last_seq on
+    assert client.get("/changes", params={"after": page["last_seq"]}).json() == {
+        "changes": [], "last_seq": page["last_seq"]}
+    filtered = client.get("/changes", params={"after": after, "tables": "cu"}).json()
+    assert filtered["changes"] == [] and filtered["last_seq"] == page["last_seq"]
+
+    assert client.get("/changes", params={"tables": "no_such_table"}).status_code == 400
+
+
+def test_long_poll_returns_once_a_change_is_committed(client, db, sgst_item, monkeypatch):
+    # Not listening (no lifespan here): waiting consumers re-read every poll_interval
+    monkeypatch.setattr(change_feed, "poll_interval", 0.1)
+    after = change_outbox.last_seq(db)
+    item = sgst_item()
+
+    assert client.get("/changes", params={"after": after, "wait": 0.3}).json() == {"changes": [], "last_seq": after}
+
+    writer = threading.Timer(0.3, _upload, args=(client, item))
+    writer.start()
+    started = time.monotonic()
+    page = client.get("/changes", params={"after": after, "wait": 10}).json()
+    writer.join()
+    assert time.monotonic() - started < 5
+    assert item["universal_id"] in {change["universal_id"] for change in page["changes"]}
+
+
+def test_long_poll_is_woken_by_the_listener(client, db, postgres, sgst_item, monkeypatch):
+    # Polling alone would answer after the 10s wait at the earliest
+    monkeypatch.setattr(change_feed, "poll_interval", 2.0)
+    monkeypatch.setattr(change_feed, "retention_days", 0)
+    change_feed.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not change_feed.listening and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert change_feed.listening
+
+        after = change_outbox.last_seq(db)
+        item = sgst_item()
+        writer = threading.Timer(0.3, _upload, args=(client, item))
+        writer.start()
+        started = time.monotonic()
+        page = client.get("/changes", params={"after": after, "wait": 10}).json()
+        writer.join()
+        assert time.monotonic() - started < 5
+        assert item["universal_id"] in {change["universal_id"] for change in page["changes"]}
+    finally:
+        change_feed.stop()
@@ -0,0 +1,47 @@
+import io
+import json
+import uuid
+import zipfile
+
+from app.core.config import settings
+from app.routers import dump
+
+
+def _dump(*items) -> bytes:
+    return json.dumps([{"name": "casedata_sgst", "data": list(items)}]).encode()
+
+
+def test_dump_json_and_zip(client, sgst_item):
+    response = client.post("/dump", content=_dump(sgst_item(), sgst_item()))
+    assert response.status_code == 201
+    assert response.json()["tables"]["casedata_sgst"]["success"] == 2
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as f:
+        f.writestr("sgst.json", _dump(sgst_item()))
+    response = client.post("/dump", content=archive.getvalue(), headers={"Content-Type": "application/zip"})
+    assert response.status_code == 201
+    assert response.json()["tables"]["casedata_sgst"]["success"] == 1
+
+
+def test_dump_retry_is_replayed_from_the_streamed_body(client, sgst_item):
+    body = _dump(sgst_item())
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    first = client.post("/dump", content=body, headers=headers)
+    assert first.status_code == 201
+
+    retry = client.post("/dump", content=body, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+    assert client.post("/dump", content=body + b" ", headers=headers).status_code == 422
+
+
+def test_dump_over_the_body_limit_is_refused(client, sgst_item, monkeypatch):
+    body = _dump(sgst_item())
+    monkeypatch.setattr(settings, "DUMP_MAX_BODY_BYTES", len(body) - 1)
+    monkeypatch.setattr(dump.DumpRoute, "max_body_bytes", len(body) - 1)
+
+    assert client.post("/dump", content=body).status_code == 413
+    assert client.post("/dump", content=body, headers={"Idempotency-Key": str(uuid.uuid4())}).status_code == 413
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.services.file_gc import FileCollector
+from database.crud.file_gc_crud import file_gc_queue
+from database.db_session import SessionLocal
+from database.models.file_gc_model import FileGcEntry
+
+
+def _queue(db, file_path: str):
+    file_gc_queue.enqueue(db, table_name="sgst", file_path=file_path, now=datetime(2024, 1, 1))
+    db.commit()
+
+
+def _entries(db, file_path: str):
+    db.expire_all()
+    entries = db.execute(select(FileGcEntry).where(FileGcEntry.file_path == file_path)).scalars().all()
+    db.commit()
+    return entries
+
+
+@pytest.fixture
+def queued_file(db):
+    """
+    A file queued for the collector; its entry is removed afterwards, whatever happened.
+    """
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    _queue(db, path)
+    yield path
+    for entry in _entries(db, path):
+        db.delete(entry)
+    db.commit()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def test_collector_removes_files_and_gives_up_on_failures(db, queued_file):
+    # A directory cannot be unlinked
+    directory = tempfile.mkdtemp()
+    _queue(db, directory)
+    collector = FileCollector(batch_size=500, interval=3600, max_attempts=2)
+    try:
+        collector.run_once()
+        assert not os.path.exists(queued_file)
+        assert _entries(db, queued_file) == []
+        entry, = _entries(db, directory)
+        assert entry.attempts == 1 and entry.last_error
+
+        # Given up on after max_attempts: no longer claimed
+        collector.run_once()
+        collector.run_once()
+        assert _entries(db, directory)[0].attempts == 2
+    finally:
+        for entry in _entries(db, directory):
+            db.delete(entry)
+        db.commit()
+        os.rmdir(directory)
+
+
+def test_claimed_entries_are_skipped_by_other_collectors(postgres, queued_file):
+    with SessionLocal() as first, SessionLocal() as second:
+        claimed = file_gc_queue.claim_batch(first, limit=10_000, max_attempts=5)
+        assert queued_file in {entry["file_path"] for entry in claimed}
+        assert queued_file not in {entry["file_path"]
+                                   for entry in file_gc_queue.claim_batch(second, limit=10_000, max_attempts=5)}
+        first.rollback()
+        second.rollback()
+
+
+def test_cancel_waits_for_the_batch_holding_the_entry(postgres, queued_file):
+    cancelled = threading.Event()
+
+    def cancel():
+        with SessionLocal() as db:
+            file_gc_queue.cancel(db, file_path=queued_file)
+            db.commit()
+        cancelled.set()
+
+    with SessionLocal() as collector:
+        file_gc_queue.claim_batch(collector, limit=10_000, max_attempts=5)
+        thread = threading.Thread(target=cancel)
+        thread.start()
+        # The re-upload does not write its file while the collector may still unlink the old one
+        assert not cancelled.wait(0.3)
+        collector.rollback()
+    thread.join(5)
+    assert cancelled.is_set()
+
+
+def test_reuploaded_record_keeps_its_file(client, db, postgres, sgst_item):
+    item = sgst_item()
+    body = {"name": "casedata_sgst", "data": [item]}
+    assert client.post("/sgst/upload", json=body).status_code == 201
+    record = client.get(f"/sgst/{item['universal_id']}", params={"fields": "file_storage_path"}).json()
+    path = record["file_storage_path"]
+    response = client.post("/sgst/delete", json={"name": "casedata_sgst", "universal_id": [item["universal_id"]]})
+    assert response.status_code == 200
+    assert len(_entries(db, path)) == 1
+
+    assert client.post("/sgst/upload", json=body).status_code == 201
+    assert _entries(db, path) == []
+    FileCollector(batch_size=500, interval=3600, max_attempts=5).run_once()
+    assert os.path.exists(path)
@@ -0,0 +1,37 @@
+import os
+import json
+from uuid import UUID
+
+from app.routers.registry import ROUTER_CONFIGS
+from app.services import fsck
+from database import db_session
+
+
+def _stored_path(universal_id):
+    service = ROUTER_CONFIGS["sgst"].service
+    with db_session.SessionLocal() as db:
+        rows = service.crud.get_rows_by_identity(db, universal_ids=[UUID(universal_id)], vil_ids=[],
+                                                 columns=["universal_id", "vil_id", "file_storage_path"])
+    return rows[0]["file_storage_path"]
+
+
+def test_repair_leaves_representational_differences_alone(client, sgst_item):
+    items = [sgst_item(circular_date="2024-03-01T10:00:00+05:30"), sgst_item()]
+    response = client.post("/sgst/upload", json={"name": "casedata_sgst", "data": items})
+    assert response.status_code == 201, response.text
+    offset_path, tampered_path = [_stored_path(item["universal_id"]) for item in items]
+
+    with open(tampered_path, encoding="utf-8") as f:
+        tampered = json.load(f)
+    tampered["cir_subject"] = "Tampered"
+    with open(tampered_path, "w", encoding="utf-8") as f:
+        json.dump(tampered, f)
+    offset_mtime = os.stat(offset_path).st_mtime_ns
+
+    [report] = fsck.check_tables([ROUTER_CONFIGS["sgst"].service], repair=True)
+    mismatched = [entry["path"] for entry in report.mismatched_files]
+    assert tampered_path in mismatched
+    assert offset_path not in mismatched
+    assert os.stat(offset_path).st_mtime_ns == offset_mtime
+    with open(tampered_path, encoding="utf-8") as f:
+        assert json.load(f)["cir_subject"] == items[1]["cir_subject"]
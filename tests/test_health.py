@@ -0,0 +1,32 @@
+import asyncio
+
+import main
+
+
+def _status(current):
+    return lambda: {"current": current, "head": ["d84b2e6f07a3"], "up_to_date": current == ["d84b2e6f07a3"]}
+
+
+def test_ready_only_once_migrated_to_head(client, monkeypatch):
+    monkeypatch.setattr(main, "get_migration_status", _status(["a6d19e4c3b58"]))
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+    monkeypatch.setattr(main, "get_migration_status", _status(["d84b2e6f07a3"]))
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+
+
+def test_workers_start_once_migrated_to_head(monkeypatch):
+    statuses = iter([["a6d19e4c3b58"], ["a6d19e4c3b58"], ["d84b2e6f07a3"]])
+    monkeypatch.setattr(main, "get_migration_status", lambda: _status(next(statuses))())
+    monkeypatch.setattr(main.settings, "MIGRATION_POLL_SECONDS", 0)
+    started = []
+    monkeypatch.setattr(main, "start_workers", lambda: started.append(next(statuses, None)))
+
+    asyncio.run(main.start_workers_when_migrated())
+
+    # Started once, after the third check found head
+    assert started == [None]
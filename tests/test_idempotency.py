@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.idempotency import IdempotencyStore, idempotency_store
+from database.models.idempotency_model import IdempotencyKey
+
+SCOPE = "POST /sgst/upload"
+
+
+def _body(item) -> bytes:
+    return json.dumps({"name": "casedata_sgst", "data": [item]}).encode()
+
+
+def _upload(client, item, key, **params):
+    return client.post("/sgst/upload", params=params, content=_body(item),
+                       headers={"Idempotency-Key": key, "Content-Type": "application/json"})
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _in_progress(db, key, item, heartbeat_at):
+    # Fingerprinted like IdempotentRoute does: query string (none here), newline, body
+    fingerprint = hashlib.sha256(b"\n" + _body(item)).hexdigest()
+    db.add(IdempotencyKey(scope=SCOPE, key=key, fingerprint=fingerprint, owner="gone:1:00000000",
+                          started_at=heartbeat_at, heartbeat_at=heartbeat_at))
+    db.commit()
+
+
+def test_retry_is_replayed(client, sgst_item):
+    item = sgst_item()
+    key = str(uuid.uuid4())
+    first = _upload(client, item, key)
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+
+    retry = _upload(client, item, key)
+    # Processing it again would have reported a duplicate
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+
+def test_key_reused_for_another_request_is_refused(client, sgst_item):
+    item = sgst_item()
+    key = str(uuid.uuid4())
+    assert _upload(client, item, key).status_code == 201
+
+    assert _upload(client, dict(item, cir_subject="Another subject"), key).status_code == 422
+    assert _upload(client, item, key, on_duplicate="first_wins").status_code == 422
+
+
+def test_key_of_a_live_process_is_not_taken_over(client, db, sgst_item):
+    item = sgst_item()
+    key = str(uuid.uuid4())
+    _in_progress(db, key, item, _now())
+
+    response = _upload(client, item, key)
+    assert response.status_code == 409
+    assert "Retry-After" in response.headers
+
+
+def test_key_of_a_dead_process_is_taken_over(client, db, sgst_item):
+    item = sgst_item()
+    key = str(uuid.uuid4())
+    _in_progress(db, key, item, _now() - timedelta(seconds=settings.IDEMPOTENCY_STALE_SECONDS + 1))
+
+    assert _upload(client, item, key).status_code == 201
+    record = db.get(IdempotencyKey, (SCOPE, key))
+    db.refresh(record)
+    assert record.owner == idempotency_store.owner
+    assert record.status_code == 201
+
+
+def test_keys_in_progress_get_heartbeats(db):
+    store = IdempotencyStore(heartbeat_seconds=0.05)
+    key = str(uuid.uuid4())
+    seen = {}
+
+    async def produce():
+        started = db.get(IdempotencyKey, ("test", key)).heartbeat_at
+        await asyncio.sleep(0.3)
+        db.expire_all()
+        seen["beats"] = db.get(IdempotencyKey, ("test", key)).heartbeat_at > started
+        db.rollback()
+        return JSONResponse({"done": True})
+
+    asyncio.run(store.run("test", key, "fingerprint", produce))
+    assert seen["beats"]
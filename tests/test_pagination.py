@@ -0,0 +1,68 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app.core.pagination import encode_cursor
+
+
+def _upload(client, *items):
+    response = client.post("/sgst/upload", json={"name": "casedata_sgst", "data": list(items)})
+    assert response.status_code == 201
+
+
+def _walk(client, cursor, limit):
+    """
+    The items of the listing from `cursor` to the end, page by page.
+    """
+    items = []
+    while True:
+        response = client.get("/sgst", params={"cursor": cursor, "limit": limit, "fields": "circular_no"})
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= limit
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+def _position(item):
+    # Listing order: circular_date ascending with NULLs last, then case_id
+    return item["circular_date"] is None, item["circular_date"] or "", item["case_id"]
+
+
+def test_pages_split_ties_and_reach_the_null_tail(client, sgst_item):
+    # A minute of 2030 that other runs most likely did not use, so the listing starts at our rows
+    start = datetime(2030, 1, 1) + timedelta(minutes=uuid.uuid4().int % 500_000)
+    tied = [sgst_item(circular_date=start.isoformat()) for _ in range(3)]
+    later = sgst_item(circular_date=(start + timedelta(seconds=1)).isoformat())
+    undated = sgst_item(circular_date=None)
+    _upload(client, *tied, later, undated)
+
+    # Pages of 2 split the three rows of one date, and the dated rows from the undated tail
+    cursor = encode_cursor([start - timedelta(seconds=1), 0])
+    items = _walk(client, cursor, 2)
+
+    ids = [item["universal_id"] for item in items]
+    assert len(ids) == len(set(ids))
+    assert items == sorted(items, key=_position)
+    ours = [id_ for id_ in ids if id_ in {item["universal_id"] for item in [*tied, later, undated]}]
+    assert set(ours[:3]) == {item["universal_id"] for item in tied}
+    assert ours[3:] == [later["universal_id"], undated["universal_id"]]
+
+
+def test_last_page_has_no_cursor(client, sgst_item):
+    start = datetime(2030, 1, 1) + timedelta(minutes=uuid.uuid4().int % 500_000)
+    items = [sgst_item(circular_date=(start + timedelta(seconds=n)).isoformat()) for n in range(2)]
+    _upload(client, *items)
+
+    # One page holding exactly the rest of the table ends the listing
+    cursor = encode_cursor([start - timedelta(seconds=1), 0])
+    rest = _walk(client, cursor, 1000)
+    assert client.get("/sgst", params={"cursor": cursor, "limit": len(rest)}).json()["next_cursor"] is None
+    assert client.get("/sgst", params={"cursor": cursor, "limit": len(rest) - 1}).json()["next_cursor"] is not None
+
+
+def test_bad_cursors_and_fields_are_refused(client):
+    for cursor in ["not a cursor", encode_cursor([1]), encode_cursor([1, 2, 3])]:
+        assert client.get("/sgst", params={"cursor": cursor}).status_code == 400
+    assert client.get("/sgst", params={"fields": "no_such_column"}).status_code == 400
@@ -0,0 +1,112 @@
+"""
+The yearly partitions of the case tables and their <table>_keys side table
+(migration 4e9a1c7d2b60). Postgres only; the tests that call the SQL directly
+run in a transaction that is rolled back, so no partition or row is left behind.
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app.services.partitioning import YearPartitions
+
+KEY_COLUMNS = ["universal_id", "vil_id", "circular_no", "html_file_path"]
+
+
+@pytest.fixture
+def connection(postgres):
+    with postgres.connect() as connection:
+        yield connection
+        connection.rollback()
+
+
+def _insert(connection, partition_dt: datetime, **overrides) -> uuid.UUID:
+    key = uuid.uuid4()
+    row = {"universal_id": key, "vil_id": key.int % 2 ** 62, "circular_no": f"CIR-{key.hex[:12]}",
+           "html_file_path": f"sgst/{key.hex}.html", "file_storage_path": f"/tmp/{key.hex}.json",
+           "ingestion_dt": datetime(2024, 1, 1), "circular_date": partition_dt, "partition_dt": partition_dt}
+    row.update(overrides)
+    connection.execute(text(f"INSERT INTO sgst ({', '.join(row)}) VALUES ({', '.join(':' + c for c in row)})"), row)
+    return row["universal_id"]
+
+
+def _partition_of(connection, universal_id) -> str:
+    return connection.execute(text("SELECT tableoid::regclass::text FROM sgst WHERE universal_id = :id"),
+                              {"id": universal_id}).scalar()
+
+
+def _keys(connection, universal_id):
+    return connection.execute(text(f"SELECT {', '.join(KEY_COLUMNS)} FROM sgst_keys WHERE universal_id = :id"),
+                              {"id": universal_id}).all()
+
+
+def _unused_year(connection) -> int:
+    # Far enough ahead that no upload created it
+    for year in range(2500 + uuid.uuid4().int % 400, 3000):
+        if connection.execute(text("SELECT to_regclass(:name)"), {"name": f"sgst_y{year}"}).scalar() is None:
+            return year
+    raise AssertionError("no unused year left")
+
+
+def test_uploads_are_routed_to_the_year_they_store(client, postgres, sgst_item):
+    # An offset that puts the UTC (and most session zones') year before the local one
+    items = [sgst_item(circular_date="2035-06-01T10:00:00"), sgst_item(circular_date="2036-01-01T02:00:00+05:30"),
+             sgst_item(circular_date=None)]
+    response = client.post("/sgst/upload", json={"name": "casedata_sgst", "data": items})
+    assert response.status_code == 201
+
+    with postgres.connect() as connection:
+        for item in items:
+            stored = connection.execute(
+                text("SELECT coalesce(circular_date, ingestion_dt) FROM sgst WHERE universal_id = :id"),
+                {"id": item["universal_id"]}).scalar()
+            assert _partition_of(connection, item["universal_id"]) == f"sgst_y{stored.year}"
+
+
+def test_ensure_year_partition_creates_a_partition_once(connection):
+    year = _unused_year(connection)
+    ensure = text("SELECT vil_ensure_year_partition(CAST('sgst' AS regclass), :value)")
+
+    assert connection.execute(ensure, {"value": datetime(year, 3, 1)}).scalar() == f"sgst_y{year}"
+    assert connection.execute(ensure, {"value": datetime(year, 12, 31)}).scalar() == f"sgst_y{year}"
+    universal_id = _insert(connection, datetime(year, 7, 1))
+    assert _partition_of(connection, universal_id) == f"sgst_y{year}"
+
+
+def test_year_held_by_the_default_partition_is_split_out(connection):
+    year = _unused_year(connection)
+    universal_id = _insert(connection, datetime(year, 7, 1))
+    assert _partition_of(connection, universal_id) == "sgst_default"
+
+    # The new bounds would clash with the row in the default partition
+    ensure = text("SELECT vil_ensure_year_partition(CAST('sgst' AS regclass), :value)")
+    assert connection.execute(ensure, {"value": datetime(year, 1, 1)}).scalar() is None
+
+    partitions = YearPartitions("sgst")
+    assert year in partitions.default_years(connection)
+    assert partitions.split_default(connection, year, KEY_COLUMNS) == 1
+    assert _partition_of(connection, universal_id) == f"sgst_y{year}"
+    assert len(_keys(connection, universal_id)) == 1
+
+
+def test_keys_table_follows_the_rows(connection):
+    first = _insert(connection, datetime(2024, 5, 1))
+    (universal_id, vil_id, circular_no, html_file_path), = _keys(connection, first)
+    assert universal_id == first
+
+    # Unique across partitions, as the unique constraints of the unpartitioned table were
+    with pytest.raises(IntegrityError):
+        with connection.begin_nested():
+            _insert(connection, datetime(2025, 5, 1), circular_no=circular_no)
+
+    # A changed key frees the old value; a row moving to another partition keeps its keys
+    connection.execute(text("UPDATE sgst SET circular_no = :new, partition_dt = :moved WHERE universal_id = :id"),
+                       {"new": f"{circular_no}-2", "moved": datetime(2025, 5, 1), "id": first})
+    assert _keys(connection, first)[0].circular_no == f"{circular_no}-2"
+    second = _insert(connection, datetime(2024, 5, 1), circular_no=circular_no)
+
+    connection.execute(text("DELETE FROM sgst WHERE universal_id = :id"), {"id": first})
+    assert _keys(connection, first) == []
+    assert len(_keys(connection, second)) == 1
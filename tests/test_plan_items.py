@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.core.stored_datetimes import session_time_zone
+from app.routers.registry import ROUTER_CONFIGS
+
+
+def _upload(client, items):
+    response = client.post("/sgst/upload", json={"name": "casedata_sgst", "data": items})
+    assert response.status_code == 201, response.text
+
+
+def _plan(client, items, endpoint="upload"):
+    response = client.post(f"/sgst/{endpoint}?dry_run=true", json={"name": "casedata_sgst", "data": items})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_resent_item_is_unchanged(client, sgst_item):
+    item = sgst_item()
+    _upload(client, [item])
+
+    plan = _plan(client, [item], endpoint="update")
+    assert plan["unchanged"] == [item["universal_id"]]
+
+
+def test_resent_item_with_offset_timestamps_is_unchanged(client, sgst_item):
+    item = sgst_item(circular_date="2024-03-01T10:00:00+05:30", created_dt="2024-03-01T04:30:00Z")
+    _upload(client, [item])
+
+    plan = _plan(client, [item], endpoint="update")
+    assert plan["unchanged"] == [item["universal_id"]]
+
+
+def test_offset_timestamps_match_the_stored_value(client, db, postgres, sgst_item):
+    service = ROUTER_CONFIGS["sgst"].service
+    items = [sgst_item(circular_date="2024-03-01T10:00:00+05:30", created_dt="2024-03-01T04:30:00Z"),
+             sgst_item(circular_date="2024-03-01T10:00:00+05:30")]
+    _upload(client, items)
+
+    # Stored converted to the session time zone, whatever the server's setting
+    instant = datetime(2024, 3, 1, 4, 30, tzinfo=timezone.utc).astimezone(session_time_zone(postgres))
+    stored = service.crud.get_rows_by_identity(db, universal_ids=[UUID(items[0]["universal_id"])], vil_ids=[],
+                                               columns=["universal_id", "vil_id", "circular_date", "created_dt"])
+    assert [(row["circular_date"], row["created_dt"]) for row in stored] == [
+        (instant.replace(tzinfo=None), instant.replace(tzinfo=None))]
+
+    # The same instants written differently are no change; another instant is one
+    resent = [dict(items[0], circular_date="2024-03-01T04:30:00Z", created_dt=instant.isoformat()),
+              dict(items[1], circular_date="2024-03-01T10:00:00Z")]
+    plan = _plan(client, resent, endpoint="update")
+    assert plan["unchanged"] == [items[0]["universal_id"]]
+    assert plan["would_update"] == [items[1]["universal_id"]]
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+from app.core.admission import AdmissionController
+from app.core.spool import spool
+from app.routers import spool_recovery
+from app.routers.registry import ROUTER_CONFIGS
+
+
+def _stored_subject(client, universal_id: str) -> str:
+    return client.get(f"/sgst/{universal_id}").json()["cir_subject"]
+
+
+def test_update_batch_is_spooled_and_discarded(client, postgres, sgst_item):
+    item = sgst_item()
+    response = client.post("/sgst/update", json={"name": ROUTER_CONFIGS["sgst"].vil_table_name, "data": [item]})
+    assert response.status_code == 200
+    assert response.json()["processed_items"] == [f"CREATED: universal_id={item['universal_id']}"]
+    assert spool.pending() == []
+
+
+def test_resumed_update_batch_waits_for_an_ingestion_slot(client, postgres, sgst_item, monkeypatch):
+    config = ROUTER_CONFIGS["sgst"]
+    item = sgst_item()
+    assert client.post("/sgst/upload", json={"name": config.vil_table_name, "data": [item]}).status_code == 201
+
+    job = spool.create(table_name=config.table_name, operation="update", policy="last_wins",
+                       items=[dict(item, cir_subject="Resumed")])
+
+    controller = AdmissionController(max_in_flight=1, max_per_table=1, max_queue=1,
+                                     queue_timeout=0.05, retry_after=0)
+    monkeypatch.setattr(spool_recovery, "admission", controller)
+    asyncio.run(controller.acquire(config.table_name))
+
+    resumed = threading.Thread(target=asyncio.run, args=(spool_recovery.resume_job(job),))
+    resumed.start()
+    resumed.join(0.3)
+    assert resumed.is_alive()
+    assert _stored_subject(client, item["universal_id"]) == item["cir_subject"]
+
+    controller.release(config.table_name)
+    resumed.join(5)
+    assert not resumed.is_alive()
+    job.discard()
+    assert _stored_subject(client, item["universal_id"]) == "Resumed"
+    assert controller.status()["in_flight"] == 0
@@ -0,0 +1,83 @@
+"""
+Round trips per item on the write paths, counted with app.core.statement_counter.
+The update path's UPDATE ... RETURNING reads the previous values from a FROM
+subquery, which SQLite cannot do: its tests need Postgres.
+"""
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.statement_counter import STATEMENT_COUNT_HEADER, counting_statements
+from app.routers.registry import ROUTER_CONFIGS
+
+# file_gc cancel, INSERT ... RETURNING, registry, facet counts, product hierarchy,
+# change outbox, COMMIT
+MAX_STATEMENTS_PER_CREATE = 7
+# UPDATE ... RETURNING, change outbox, COMMIT
+MAX_STATEMENTS_PER_UPDATE = 3
+# ... plus the facet count and product hierarchy deltas when those columns change
+MAX_STATEMENTS_PER_SUMMARY_UPDATE = 5
+# Reads a request makes once for the whole batch (duplicate pre-screen, ...)
+MAX_STATEMENTS_PER_BATCH = 2
+
+
+@pytest.fixture
+def service():
+    return ROUTER_CONFIGS["sgst"].service
+
+
+def _create(service, db, data):
+    item = service.schema(**data)
+    with counting_statements() as counter:
+        asyncio.run(service.process_and_create_item(db, item, datetime.now(timezone.utc)))
+    return counter.count
+
+
+def _update(service, db, data):
+    item = service.schema(**data)
+    with counting_statements() as counter:
+        assert asyncio.run(service.process_update_item(db, item, datetime.now(timezone.utc))) is not None
+    return counter.count
+
+
+def test_create_statements(service, db, sgst_item):
+    # The first item of a process also fills the caches and creates the year's partition
+    _create(service, db, sgst_item())
+
+    count = _create(service, db, sgst_item())
+    assert 0 < count <= MAX_STATEMENTS_PER_CREATE
+
+
+def test_update_statements(service, db, postgres, sgst_item):
+    data = sgst_item()
+    _create(service, db, data)
+
+    count = _update(service, db, dict(data, cir_subject="Refund of input tax credit, revised"))
+    assert 0 < count <= MAX_STATEMENTS_PER_UPDATE
+
+    count = _update(service, db, dict(data, prod_name="Customs", sub_prod_name="Baggage"))
+    assert 0 < count <= MAX_STATEMENTS_PER_SUMMARY_UPDATE
+
+
+def test_statement_count_header(client, sgst_item):
+    items = [sgst_item() for _ in range(3)]
+    response = client.post("/sgst/upload", json={"name": "casedata_sgst", "data": items})
+    assert response.status_code == 201, response.text
+    assert 0 < int(response.headers[STATEMENT_COUNT_HEADER]) <= (
+        MAX_STATEMENTS_PER_BATCH + len(items) * MAX_STATEMENTS_PER_CREATE)
+
+    # Requests that do not touch the database report it too
+    assert client.get("/").headers[STATEMENT_COUNT_HEADER] == "0"
+
+
+def test_statement_count_header_of_updates(client, postgres, sgst_item):
+    items = [sgst_item() for _ in range(3)]
+    response = client.post("/sgst/upload", json={"name": "casedata_sgst", "data": items})
+    assert response.status_code == 201, response.text
+
+    response = client.post("/sgst/update", json={
+        "name": "casedata_sgst", "data": [dict(item, cir_subject="Revised") for item in items]})
+    assert response.status_code == 200, response.text
+    assert 0 < int(response.headers[STATEMENT_COUNT_HEADER]) <= (
+        MAX_STATEMENTS_PER_BATCH + len(items) * MAX_STATEMENTS_PER_UPDATE)
@@ -0,0 +1,55 @@
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.routers.generic_router_factory import DELETED_ERROR_MESSAGE
+from app.routers.registry import ROUTER_CONFIGS
+from app.services.tombstones import TombstonePurger
+from database.models.file_gc_model import FileGcEntry
+
+
+def _upload(client, *items):
+    return client.post("/sgst/upload", json={"name": "casedata_sgst", "data": list(items)})
+
+
+def _row(db, universal_id):
+    # Tombstoned or not: reads of the service leave tombstones out
+    table = ROUTER_CONFIGS["sgst"].service.crud.model.__table__
+    db.expire_all()
+    return db.execute(select(table.c.deleted_at, table.c.file_storage_path)
+                      .where(table.c.universal_id == UUID(universal_id))).first()
+
+
+def test_tombstones_are_purged_after_the_retention(client, db, sgst_item, monkeypatch):
+    monkeypatch.setattr(settings, "DELETE_MODE", "tombstone")
+    items = [sgst_item(), sgst_item()]
+    assert _upload(client, *items).status_code == 201
+    ids = [item["universal_id"] for item in items]
+
+    response = client.post("/sgst/delete", json={"name": "casedata_sgst", "universal_id": ids})
+    assert response.status_code == 200
+    assert client.get(f"/sgst/{ids[0]}").status_code == 404
+    rows = [_row(db, universal_id) for universal_id in ids]
+    assert all(row.deleted_at is not None for row in rows)
+
+    # Until it is purged, the id cannot come back
+    response = _upload(client, items[0])
+    assert response.status_code == 422
+    assert response.json()["failed_items"][0]["reason"] == DELETED_ERROR_MESSAGE
+
+    purger = TombstonePurger(retention_days=1, interval=3600, batch_size=1)
+    purger.services = [ROUTER_CONFIGS["sgst"].service]
+    purger.run_once()
+    assert all(_row(db, universal_id) is not None for universal_id in ids)
+
+    # Batches of one row: the purge goes on until no expired tombstone is left
+    purger.retention_days = 0
+    assert purger.run_once()["sgst"] >= 2
+    assert all(_row(db, universal_id) is None for universal_id in ids)
+    queued = set(db.execute(select(FileGcEntry.file_path)).scalars())
+    assert {row.file_storage_path for row in rows} <= queued
+
+    # Purged, the id is free again, and its file is taken off the collector's queue
+    assert _upload(client, items[0]).status_code == 201
+    assert rows[0].file_storage_path not in set(db.execute(select(FileGcEntry.file_path)).scalars())
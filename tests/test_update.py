@@ -0,0 +1,35 @@
+import asyncio
+import glob
+import json
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.routers.registry import ROUTER_CONFIGS
+
+
+def _process(process, db, data):
+    return asyncio.run(process(db, ROUTER_CONFIGS["sgst"].service.schema(**data), datetime.now(timezone.utc)))
+
+
+def test_file_is_replaced_only_once_the_update_commits(db, postgres, sgst_item, monkeypatch):
+    service = ROUTER_CONFIGS["sgst"].service
+    data = sgst_item()
+    path = _process(service.process_and_create_item, db, data).file_storage_path
+
+    def failing_commit():
+        raise OperationalError("COMMIT", {}, Exception("connection lost"))
+
+    with monkeypatch.context() as patch:
+        patch.setattr(db, "commit", failing_commit)
+        with pytest.raises(OperationalError):
+            _process(service.process_update_item, db, dict(data, cir_subject="Not committed"))
+    with open(path) as f:
+        assert json.load(f)["cir_subject"] == data["cir_subject"]
+    assert glob.glob(f"{path}.*") == []
+
+    _process(service.process_update_item, db, dict(data, cir_subject="Committed"))
+    with open(path) as f:
+        assert json.load(f)["cir_subject"] == "Committed"
+    assert glob.glob(f"{path}.*") == []
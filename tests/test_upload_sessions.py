@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+import threading
+from uuid import UUID
+
+import pytest
+
+from app.core.upload_sessions import UploadSessionStore
+
+
+async def _stream(*pieces: bytes):
+    for piece in pieces:
+        yield piece
+
+
+@pytest.fixture
+def store(tmp_path):
+    return UploadSessionStore(str(tmp_path), ttl_hours=1, max_chunk_bytes=1024, max_bytes=4096)
+
+
+def _open(store, *chunks: bytes):
+    upload_id = UUID(store.create("sgst", total_chunks=len(chunks))["upload_id"])
+    for number, chunk in enumerate(chunks):
+        asyncio.run(store.put_chunk(upload_id, "sgst", number, _stream(chunk)))
+    return upload_id
+
+
+def test_only_one_finalize_gets_the_session(store):
+    upload_id = _open(store, b"ab", b"cd")
+
+    assert store.begin_finalize(upload_id, "sgst") == b"abcd"
+    assert store.begin_finalize(upload_id, "sgst") is None
+    # Nor can a chunk still arrive once the session is finalizing
+    assert asyncio.run(store.put_chunk(upload_id, "sgst", 0, _stream(b"zz"))) is None
+
+    # A failed finalize reopens the session; a successful one closes it
+    store.end_finalize(upload_id, succeeded=False)
+    assert store.begin_finalize(upload_id, "sgst") == b"abcd"
+    store.end_finalize(upload_id, succeeded=True)
+    assert store.status(upload_id, "sgst") is None
+    assert os.listdir(store.root) == []
+
+
+def test_concurrent_finalizes_assemble_the_payload_once(store):
+    upload_id = _open(store, b"ab", b"cd")
+    barrier = threading.Barrier(4)
+    results = []
+
+    def finalize():
+        barrier.wait()
+        results.append(store.begin_finalize(upload_id, "sgst"))
+
+    threads = [threading.Thread(target=finalize) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results, key=lambda data: data is None) == [b"abcd", None, None, None]
+
+
+def test_chunk_replaced_just_before_finalize_is_read_whole(store, monkeypatch):
+    upload_id = _open(store, b"ab", b"cd")
+    status = store.status
+
+    def status_then_replace(*args):
+        # The missing-chunk check has seen the old sizes when the larger chunk lands
+        state = status(*args)
+        asyncio.run(store.put_chunk(upload_id, "sgst", 0, _stream(b"longer ")))
+        return state
+
+    monkeypatch.setattr(store, "status", status_then_replace)
+    assert store.begin_finalize(upload_id, "sgst") == b"longer cd"
+
+
+def test_finalize_waits_for_missing_chunks(store):
+    upload_id = UUID(store.create("sgst", total_chunks=2)["upload_id"])
+    asyncio.run(store.put_chunk(upload_id, "sgst", 1, _stream(b"cd")))
+
+    with pytest.raises(ValueError):
+        store.begin_finalize(upload_id, "sgst")
+    assert store.status(upload_id, "sgst")["missing"] == [0]
+
+
+def test_payload_that_cannot_be_processed_can_be_fixed_and_finalized(client, sgst_item):
+    payload = json.dumps({"name": "casedata_sgst", "data": [sgst_item()]}).encode()
+    upload_id = client.post("/sgst/uploads", params={"total_chunks": 2}).json()["upload_id"]
+    client.put(f"/sgst/uploads/{upload_id}/chunks/0", content=payload[:10])
+    client.put(f"/sgst/uploads/{upload_id}/chunks/1", content=b"not the rest")
+
+    assert client.post(f"/sgst/uploads/{upload_id}/finalize").status_code == 400
+    client.put(f"/sgst/uploads/{upload_id}/chunks/1", content=payload[10:])
+    assert client.post(f"/sgst/uploads/{upload_id}/finalize").status_code == 201
+    assert client.post(f"/sgst/uploads/{upload_id}/finalize").status_code == 404